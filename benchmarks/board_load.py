@@ -0,0 +1,194 @@
+"""Time to first usable index of a Notion board loaded at startup.
+
+Runs offline against a fake Notion client with simulated request latency and deterministic
+embeddings with a simulated latency per 100 texts. Three loads of the same board are compared:
+
+* `n_plus_one` queries the database for page summaries, retrieves every page on its own and
+  indexes the board in one batch, as the startup load did with the LangChain Notion loader;
+* `paginated` reads the tasks from the query results and indexes them once every page is
+  downloaded;
+* `streamed` indexes every query page while the next one downloads.
+
+The time to first index is the time until the first batch of tasks is embedded and searchable,
+the total time the time until the whole board is indexed.
+
+    python -m benchmarks.board_load --board-sizes 500 2000 --output board_load.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from benchmarks.fakes import DeterministicEmbeddings, make_tasks
+from todo_assistant.api_clients.notion import NotionDatabaseTaskAPIClient
+from todo_assistant.api_clients.scheduler import RequestScheduler
+from todo_assistant.entities.task import Task
+from todo_assistant.task_index import TaskIndex
+from todo_assistant.vectorstores import FlatVectorStore
+
+_LAST_EDITED_TIME = '2024-01-01T00:00:00.000Z'
+_SCENARIOS = ('n_plus_one', 'paginated', 'streamed')
+
+
+class _FakeNotionDatabases:
+    def __init__(self, pages: list[dict[str, Any]], latency: float):
+        self._pages = pages
+        self._latency = latency
+
+    def query(
+        self, database_id: str, page_size: int = 100, start_cursor: str | None = None
+    ) -> dict[str, Any]:
+        time.sleep(self._latency)
+        start = int(start_cursor or 0)
+        end = start + page_size
+        has_more = end < len(self._pages)
+        return {
+            'results': self._pages[start:end],
+            'has_more': has_more,
+            'next_cursor': str(end) if has_more else None,
+        }
+
+
+class _FakeNotionPages:
+    def __init__(self, pages: list[dict[str, Any]], latency: float):
+        self._pages = {page['id']: page for page in pages}
+        self._latency = latency
+
+    def retrieve(self, page_id: str) -> dict[str, Any]:
+        time.sleep(self._latency)
+        return self._pages[page_id]
+
+
+class _FakeNotionClient:
+    def __init__(self, pages: list[dict[str, Any]], latency: float):
+        self.databases = _FakeNotionDatabases(pages, latency=latency)
+        self.pages = _FakeNotionPages(pages, latency=latency)
+
+
+class _SlowEmbeddings(DeterministicEmbeddings):
+    """Embeddings taking `latency` per 100 texts, recording when the first batch was embedded."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self._latency = latency
+        self.first_batch_at: float | None = None
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(self._latency * len(texts) / 100)
+        embeddings = super().embed_documents(texts)
+        if self.first_batch_at is None:
+            self.first_batch_at = time.perf_counter()
+        return embeddings
+
+
+def measure_board_load(
+    scenario: str, board_size: int, request_latency: float, embedding_latency: float
+) -> dict[str, float]:
+    pages = [_notion_page(task) for task in make_tasks(board_size)]
+    task_api_client = NotionDatabaseTaskAPIClient(
+        api_key='benchmark',
+        database_id='benchmark',
+        # Only the request latency is measured, not the rate limit of the Notion API.
+        scheduler=RequestScheduler(rate=1_000_000, burst=1_000_000),
+    )
+    task_api_client._client = _FakeNotionClient(pages, latency=request_latency)  # type: ignore
+    embeddings = _SlowEmbeddings(latency=embedding_latency)
+    task_index = TaskIndex(vectorstore=FlatVectorStore(embedding=embeddings))
+
+    start = time.perf_counter()
+    _LOADS[scenario](task_api_client, task_index)
+    total = time.perf_counter() - start
+
+    return {
+        'time_to_first_index_s': (embeddings.first_batch_at or start) - start,
+        'total_s': total,
+        'requests': task_api_client.scheduler.stats.requests,
+    }
+
+
+def _load_n_plus_one(task_api_client: NotionDatabaseTaskAPIClient, task_index: TaskIndex) -> None:
+    page_versions = {
+        task.id: last_edited_time
+        for page in task_api_client.iter_task_pages()
+        for task, last_edited_time in page
+    }
+    tasks = [task_api_client.get_by_id(task_id) for task_id in page_versions]
+    task_index.sync([[(task, page_versions[task.id]) for task in tasks]])
+
+
+def _load_paginated(task_api_client: NotionDatabaseTaskAPIClient, task_index: TaskIndex) -> None:
+    task_index.sync(list(task_api_client.iter_task_pages()))
+
+
+def _load_streamed(task_api_client: NotionDatabaseTaskAPIClient, task_index: TaskIndex) -> None:
+    task_index.sync(task_api_client.iter_task_pages())
+
+
+_LOADS: dict[str, Callable[[NotionDatabaseTaskAPIClient, TaskIndex], None]] = {
+    'n_plus_one': _load_n_plus_one,
+    'paginated': _load_paginated,
+    'streamed': _load_streamed,
+}
+
+
+def _notion_page(task: Task) -> dict[str, Any]:
+    return {
+        'id': task.id,
+        'last_edited_time': _LAST_EDITED_TIME,
+        'properties': {
+            'Name': {'title': [{'plain_text': task.title}]},
+            'Priority': {'select': {'name': task.priority.value}},
+            'Work estimation': {'number': task.work_estimation},
+            'Status': {'status': {'name': task.status.value}},
+        },
+    }
+
+
+def run_benchmark(
+    board_sizes: list[int], request_latency: float, embedding_latency: float
+) -> dict[str, Any]:
+    return {
+        str(board_size): {
+            scenario: measure_board_load(
+                scenario,
+                board_size,
+                request_latency=request_latency,
+                embedding_latency=embedding_latency,
+            )
+            for scenario in _SCENARIOS
+        }
+        for board_size in board_sizes
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--board-sizes', type=int, nargs='+', default=[500, 2_000])
+    parser.add_argument('--request-latency', type=float, default=0.01)
+    parser.add_argument('--embedding-latency', type=float, default=0.05)
+    parser.add_argument('--output', type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        args.board_sizes,
+        request_latency=args.request_latency,
+        embedding_latency=args.embedding_latency,
+    )
+    for board_size, scenarios in results.items():
+        print(f"{board_size} tasks")
+        for scenario, metrics in scenarios.items():
+            print(
+                f"  {scenario:<12}",
+                "  ".join(f"{name}={value:.3f}" for name, value in metrics.items()),
+            )
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
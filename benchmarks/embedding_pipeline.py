@@ -0,0 +1,118 @@
+"""Rebuild throughput of the task index by embedding concurrency.
+
+Rebuilds the index of a board from scratch with deterministic embeddings taking a simulated
+latency per request, as the OpenAI embeddings endpoint does, for every concurrency level. A share
+of the embedding requests can be made to fail once, so the cost of retrying failed batches on
+their own shows in the throughput.
+
+    python -m benchmarks.embedding_pipeline --board-size 5000 --concurrency 1 2 4 8
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.fakes import DeterministicEmbeddings, make_tasks
+from todo_assistant.task_index import EmbeddingPipeline, TaskIndex
+from todo_assistant.vectorstores import FlatVectorStore
+
+
+class _RemoteEmbeddings(DeterministicEmbeddings):
+    """Embeddings taking `latency` per request, failing a `failure_rate` share of requests."""
+
+    def __init__(self, latency: float, failure_rate: float, seed: int = 0):
+        super().__init__()
+        self._latency = latency
+        self._failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(self._latency)
+        with self._lock:
+            failed = self._random.random() < self._failure_rate
+        if failed:
+            raise ConnectionError("Simulated embedding request failure")
+        return super().embed_documents(texts)
+
+
+def measure_rebuild(
+    board_size: int, batch_size: int, concurrency: int, latency: float, failure_rate: float
+) -> dict[str, float]:
+    tasks = make_tasks(board_size)
+    pages = [
+        [(task, '2024-01-01T00:00:00.000Z') for task in tasks[start : start + 100]]
+        for start in range(0, board_size, 100)
+    ]
+    embeddings = _RemoteEmbeddings(latency=latency, failure_rate=failure_rate)
+    pipeline = EmbeddingPipeline(
+        embeddings, batch_size=batch_size, concurrency=concurrency, backoff_base=latency
+    )
+    task_index = TaskIndex(
+        vectorstore=FlatVectorStore(embedding=embeddings), embedding_pipeline=pipeline
+    )
+
+    summary = task_index.sync(pages)
+    return {
+        'rebuild_s': summary.duration,
+        'first_batch_s': summary.first_batch_duration or 0.0,
+        'tasks_per_s': summary.added / summary.duration if summary.duration else 0.0,
+        'failed': summary.failed,
+    }
+
+
+def run_benchmark(
+    board_size: int,
+    batch_size: int,
+    concurrency_levels: list[int],
+    latency: float,
+    failure_rate: float,
+) -> dict[str, Any]:
+    return {
+        str(concurrency): measure_rebuild(
+            board_size,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            latency=latency,
+            failure_rate=failure_rate,
+        )
+        for concurrency in concurrency_levels
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--board-size', type=int, default=5_000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--failure-rate', type=float, default=0.05)
+    parser.add_argument('--output', type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        args.board_size,
+        batch_size=args.batch_size,
+        concurrency_levels=args.concurrency,
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+    )
+    print(f"{args.board_size} tasks, batches of {args.batch_size}")
+    for concurrency, metrics in results.items():
+        print(
+            f"  concurrency={concurrency:<3}",
+            "  ".join(f"{name}={value:.3f}" for name, value in metrics.items()),
+        )
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
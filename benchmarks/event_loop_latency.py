@@ -0,0 +1,207 @@
+"""Event loop latency of concurrent assistant sessions sharing one compiled graph.
+
+Runs the TODO assistant graph offline with scripted chat models and measures how late a probe
+coroutine wakes up while many sessions run on one event loop. The `legacy` mode restores how a
+step ran before graph nodes got native coroutines: graph nodes, agents and tools fall back to the
+default `Runnable.ainvoke`/`astream` bouncing every node to the default executor, and the step
+consumes `astream_events` instead of a streaming callback handler.
+
+    python -m benchmarks.event_loop_latency --sessions 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import statistics
+import time
+from typing import Any, Iterator
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+from langgraph.pregel import Pregel
+
+from benchmarks.fakes import (
+    InMemoryTaskAPIClient,
+    ScriptedChatModel,
+    todo_api_assistant_script,
+    todo_assistant_script,
+)
+from todo_assistant.agents.todo_api import TODOAPIAgent
+from todo_assistant.agents.todo_api_assistant import TODOAPIAssistantAgent
+from todo_assistant.agents.todo_assistant import TODOAssistantAgent
+from todo_assistant.assistant.assistant import TODOAssistant
+from todo_assistant.assistant.callbacks import BaseAssistantResponseCallback
+from todo_assistant.assistant.response import TODOAssistantResponse
+from todo_assistant.graphs.base import BaseNode
+from todo_assistant.graphs.todo_api import TODOApiGraphBuilder
+from todo_assistant.graphs.todo_assistant import TODOAssistantGraphBuilder
+from todo_assistant.task_index import TaskNameIndex, TaskTable
+from todo_assistant.tools.aggregate import TaskAggregateTool
+from todo_assistant.tools.api_calls.add import AddTaskTool
+from todo_assistant.tools.api_calls.delete import DeleteTaskTool
+from todo_assistant.tools.api_calls.update import UpdateTaskTool
+from todo_assistant.tools.retrieval import TODORetrievalTool
+from todo_assistant.tools.search_task_id_by_name import SearchTaskIDByNameTool
+
+_PROBE_INTERVAL = 0.005
+
+
+class SilentResponseCallback(BaseAssistantResponseCallback):
+    def on_stream_new_token(self, token: str) -> None:
+        pass
+
+    def on_stream_finish(self) -> None:
+        pass
+
+    def on_response(self, final_response: TODOAssistantResponse) -> None:
+        pass
+
+
+def build_graph(llm_latency: float, api_latency: float) -> Pregel:
+    task_api_client = InMemoryTaskAPIClient(latency=api_latency)
+    api_call_tools: list[BaseTool] = [
+        AddTaskTool(task_api_client=task_api_client),
+        DeleteTaskTool(task_api_client=task_api_client),
+        UpdateTaskTool(task_api_client=task_api_client),
+    ]
+    search_tool = SearchTaskIDByNameTool(task_name_index=TaskNameIndex())
+
+    api_assistant_agent = TODOAPIAssistantAgent.from_llm_and_tools(
+        llm=ScriptedChatModel(script=todo_api_assistant_script(), latency=llm_latency),
+        api_call_tools=api_call_tools,
+        search_task_id_by_name_tool=search_tool,
+    )
+    api_graph = TODOApiGraphBuilder(
+        todo_api_assistant_agent=api_assistant_agent,
+        api_call_tools=api_call_tools,
+        search_task_id_by_name_tool=search_tool,
+    ).build_graph()
+
+    retrieval_llm = ScriptedChatModel(
+        script=lambda messages: todo_assistant_script()(messages[-1:]), latency=llm_latency
+    )
+    retrieval_tool = TODORetrievalTool(
+        retrieval_chain=ChatPromptTemplate.from_template("{question}")
+        | retrieval_llm
+        | StrOutputParser()
+    )
+
+    return TODOAssistantGraphBuilder(
+        todo_assistant_agent=TODOAssistantAgent.from_llm(
+            ScriptedChatModel(script=todo_assistant_script(), latency=llm_latency)
+        ),
+        todo_api_agent=TODOAPIAgent.from_graph_builder(api_graph),
+        retrieval_tool=retrieval_tool,
+        aggregate_tool=TaskAggregateTool(task_table=TaskTable()),
+    ).build_graph()
+
+
+async def _legacy_astep(
+    self: TODOAssistant,
+    human_input: str,
+    new_token_callback: BaseAssistantResponseCallback | None = None,
+) -> TODOAssistantResponse:
+    callback = new_token_callback or SilentResponseCallback()
+    async for event in self._agent.astream_events({"input": human_input}, version="v1"):
+        if event["event"] == "on_chain_end" and event["name"] == "TODOAssistant":
+            if final_output := event['data']['output']:
+                response = self._handle_raw_response(final_output)
+                callback.on_response(response)
+                return response
+
+    return TODOAssistantResponse.create_final()
+
+
+@contextlib.contextmanager
+def legacy_execution() -> Iterator[None]:
+    """Temporarily fall back to the executor based `Runnable` async defaults."""
+    patched: dict[tuple[type, str], Any] = {(TODOAssistant, 'astep'): TODOAssistant.astep}
+    patched |= {
+        (cls, name): cls.__dict__[name]
+        for cls in (BaseNode, TODOAPIAgent, TODOAPIAssistantAgent, TODOAssistantAgent)
+        for name in ('ainvoke', 'astream')
+    }
+    patched |= {
+        (cls, '_arun'): cls.__dict__['_arun']
+        for cls in (AddTaskTool, DeleteTaskTool, UpdateTaskTool, SearchTaskIDByNameTool)
+    }
+    try:
+        for (cls, name), _ in patched.items():
+            if name == 'astep':
+                setattr(cls, name, _legacy_astep)
+            else:
+                setattr(cls, name, getattr(BaseTool if name == '_arun' else Runnable, name))
+        yield
+    finally:
+        for (cls, name), method in patched.items():
+            setattr(cls, name, method)
+
+
+async def _run_session(graph: Pregel, turns: int, latencies: list[float]) -> None:
+    assistant = TODOAssistant(agent=graph)
+    for turn in range(turns):
+        start = time.perf_counter()
+        await assistant.astep(
+            human_input=f"Add task number {turn}", new_token_callback=SilentResponseCallback()
+        )
+        latencies.append(time.perf_counter() - start)
+
+
+async def _probe(lags: list[float], done: asyncio.Event) -> None:
+    while not done.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(_PROBE_INTERVAL)
+        lags.append(time.perf_counter() - start - _PROBE_INTERVAL)
+
+
+async def measure(graph: Pregel, sessions: int, turns: int) -> dict[str, float]:
+    lags: list[float] = []
+    turn_latencies: list[float] = []
+    done = asyncio.Event()
+    probe = asyncio.create_task(_probe(lags, done))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_run_session(graph, turns, turn_latencies) for _ in range(sessions)))
+    wall_time = time.perf_counter() - start
+    done.set()
+    await probe
+
+    return {
+        'wall_time_s': wall_time,
+        'turn_p50_ms': _percentile(turn_latencies, 50) * 1000,
+        'turn_p99_ms': _percentile(turn_latencies, 99) * 1000,
+        'loop_lag_p50_ms': _percentile(lags, 50) * 1000,
+        'loop_lag_p99_ms': _percentile(lags, 99) * 1000,
+        'loop_lag_max_ms': max(lags) * 1000,
+    }
+
+
+def _percentile(values: list[float], percentile: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method='inclusive')[percentile - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--turns', type=int, default=3)
+    parser.add_argument('--llm-latency', type=float, default=0.05)
+    parser.add_argument('--api-latency', type=float, default=0.02)
+    parser.add_argument('--mode', choices=['native', 'legacy', 'both'], default='both')
+    args = parser.parse_args()
+
+    graph = build_graph(llm_latency=args.llm_latency, api_latency=args.api_latency)
+    modes = ['legacy', 'native'] if args.mode == 'both' else [args.mode]
+
+    for mode in modes:
+        with legacy_execution() if mode == 'legacy' else contextlib.nullcontext():
+            results = asyncio.run(measure(graph, sessions=args.sessions, turns=args.turns))
+        print(f"{mode:>6}: " + " ".join(f"{key}={value:.1f}" for key, value in results.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import re
+import time
+from typing import Any, Callable
+from uuid import NAMESPACE_URL, uuid4, uuid5
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, FunctionMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from todo_assistant.api_clients.base import BaseTaskAPIClient
+from todo_assistant.entities.task import CreateTaskRequest, Task, TaskPriority, TaskStatus
+
+_WORD = re.compile(r"\w+")
+_TASK_VERBS = ('Write', 'Review', 'Fix', 'Plan', 'Deploy', 'Test', 'Refactor', 'Document')
+_TASK_SUBJECTS = ('report', 'login page', 'release notes', 'database migration', 'budget', 'API')
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model answering with messages chosen by a script from the conversation so far.
+
+    Latency is simulated with `time.sleep` for sync calls and `asyncio.sleep` for async ones,
+    which keeps the cost of a call visible in event loop measurements.
+    """
+
+    script: Callable[[list[BaseMessage]], AIMessage]
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-chat-model"
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self.script(messages))])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self.script(messages))])
+
+
+def function_call_message(name: str, arguments: dict[str, Any]) -> AIMessage:
+    return AIMessage(
+        content='',
+        additional_kwargs={'function_call': {'name': name, 'arguments': json.dumps(arguments)}},
+    )
+
+
+def todo_assistant_script(
+    tool: str = 'todo_api_call', parallel_calls: int = 1
+) -> Callable[[list[BaseMessage]], AIMessage]:
+    """Planner calling `tool` for every human message and responding after its results.
+
+    With `parallel_calls` above one the planner makes that many independent calls at once.
+    """
+
+    def script(messages: list[BaseMessage]) -> AIMessage:
+        last_message = messages[-1]
+        if isinstance(last_message, HumanMessage):
+            if parallel_calls > 1:
+                calls = [
+                    {'tool': tool, 'tool_input': f"{last_message.content} ({number})"}
+                    for number in range(parallel_calls)
+                ]
+                return function_call_message('parallel_tool_calls', {'calls': calls})
+            return function_call_message(
+                'tool_call', {'tool': tool, 'tool_input': str(last_message.content)}
+            )
+        if isinstance(last_message, FunctionMessage):
+            return AIMessage(content=f"Done: {last_message.content}")
+        return AIMessage(content="How can I help?")
+
+    return script
+
+
+def todo_api_assistant_script(
+    task_name: str = 'Benchmark task',
+) -> Callable[[list[BaseMessage]], AIMessage]:
+    """API agent adding a task named `task_name`."""
+
+    def script(messages: list[BaseMessage]) -> AIMessage:
+        return function_call_message('add_task', {'task_name': task_name, 'task_params': '{}'})
+
+    return script
+
+
+class InMemoryTaskAPIClient(BaseTaskAPIClient):
+    def __init__(self, tasks: list[Task] | None = None, latency: float = 0.0):
+        self._tasks = {task.id: task for task in tasks or []}
+        self._latency = latency
+
+    def get_by_id(self, id: str) -> Task:
+        self._sleep()
+        return self._tasks[id].copy()
+
+    def add(self, task_to_create: CreateTaskRequest) -> Task:
+        self._sleep()
+        task = Task(id=str(uuid4()), **task_to_create.dict())
+        self._tasks[task.id] = task
+        return task.copy()
+
+    def update(self, task: Task) -> Task:
+        self._sleep()
+        self._tasks[task.id] = task.copy()
+        return task.copy()
+
+    def delete(self, task_id: str) -> Task:
+        self._sleep()
+        return self._tasks.pop(task_id)
+
+    async def aget_by_id(self, id: str) -> Task:
+        await self._asleep()
+        return self._tasks[id].copy()
+
+    async def aadd(self, task_to_create: CreateTaskRequest) -> Task:
+        await self._asleep()
+        task = Task(id=str(uuid4()), **task_to_create.dict())
+        self._tasks[task.id] = task
+        return task.copy()
+
+    async def aupdate(self, task: Task) -> Task:
+        await self._asleep()
+        self._tasks[task.id] = task.copy()
+        return task.copy()
+
+    async def adelete(self, task_id: str) -> Task:
+        await self._asleep()
+        return self._tasks.pop(task_id)
+
+    def _sleep(self) -> None:
+        if self._latency:
+            time.sleep(self._latency)
+
+    async def _asleep(self) -> None:
+        if self._latency:
+            await asyncio.sleep(self._latency)
+
+
+class DeterministicEmbeddings(Embeddings):
+    """Hashed bag of words embeddings, texts sharing words get similar vectors without a model."""
+
+    def __init__(self, size: int = 64):
+        self._size = size
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+    def _embed(self, text: str) -> list[float]:
+        vector = [0.0] * self._size
+        for word in _WORD.findall(text.lower()):
+            digest = int.from_bytes(
+                hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'big'
+            )
+            vector[digest % self._size] += 1.0 if digest & (1 << 63) else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+
+def make_tasks(count: int) -> list[Task]:
+    """Board of `count` tasks, the same for every run."""
+    priorities, statuses = list(TaskPriority), list(TaskStatus)
+    return [
+        Task(
+            id=str(uuid5(NAMESPACE_URL, f"benchmark-task-{number}")),
+            title=(
+                f"{_TASK_VERBS[number % len(_TASK_VERBS)]}"
+                f" {_TASK_SUBJECTS[number % len(_TASK_SUBJECTS)]} {number}"
+            ),
+            priority=priorities[number % len(priorities)],
+            work_estimation=number % 13 + 1,
+            status=statuses[number % len(statuses)],
+        )
+        for number in range(count)
+    ]
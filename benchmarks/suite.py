@@ -0,0 +1,330 @@
+"""Offline benchmark suite of the TODO assistant.
+
+Runs without network access on scripted chat models, the in-memory task backend and
+deterministic embeddings, and measures the end-to-end latency of `TODOAssistant.step` and
+`astep`, the overhead added by every graph node on top of its model and tool calls, the cost of
+the output parsers and the index build time of boards of growing size. Results are written as
+JSON, a previous results file passed as `--baseline` is compared against the new run.
+
+    python -m benchmarks.suite --output benchmark.json
+    python -m benchmarks.suite --baseline benchmark.json --output benchmark-new.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator
+from uuid import UUID, uuid4
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from langchain_core.runnables import Runnable
+from langgraph.pregel import Pregel
+
+from benchmarks.event_loop_latency import SilentResponseCallback, _percentile, build_graph
+from benchmarks.fakes import DeterministicEmbeddings, function_call_message, make_tasks
+from todo_assistant.agents.todo_api_assistant.output_parser import APICallOutputParser
+from todo_assistant.agents.todo_assistant.output_parser import TODOAssistantOutputParser
+from todo_assistant.assistant.assistant import TODOAssistant
+from todo_assistant.task_index import TaskIndex, TaskNameIndex
+
+_HIDDEN_TAG = 'langsmith:hidden'
+_GRAPH_STEP_TAG = 'graph:step:'
+_TURNS_PER_SESSION = 5
+
+
+class NodeTimingCallback(BaseCallbackHandler):
+    """Times graph nodes and the model and tool calls made inside them.
+
+    The overhead of a node is its duration minus the time spent in the nodes, models and tools it
+    runs directly, what remains is the cost of the graph machinery, prompts and parsing.
+    """
+
+    def __init__(self) -> None:
+        self.durations: defaultdict[str, list[float]] = defaultdict(list)
+        self.overheads: defaultdict[str, list[float]] = defaultdict(list)
+        self._parents: dict[UUID, UUID | None] = {}
+        self._timed_runs: dict[UUID, tuple[str | None, float]] = {}
+        self._nested_time: defaultdict[UUID, float] = defaultdict(float)
+
+    def on_chain_start(
+        self,
+        serialized: dict[str, Any],
+        inputs: dict[str, Any],
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        tags: list[str] | None = None,
+        name: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        tags = tags or []
+        is_node = _HIDDEN_TAG not in tags and any(tag.startswith(_GRAPH_STEP_TAG) for tag in tags)
+        self._start(run_id, parent_run_id, name if is_node else None, timed=is_node)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[Any]],
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self._start(run_id, parent_run_id, None, timed=True)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_tool_start(
+        self,
+        serialized: dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self._start(run_id, parent_run_id, None, timed=True)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def _start(
+        self, run_id: UUID, parent_run_id: UUID | None, node_name: str | None, timed: bool
+    ) -> None:
+        self._parents[run_id] = parent_run_id
+        if timed:
+            self._timed_runs[run_id] = (node_name, time.perf_counter())
+
+    def _end(self, run_id: UUID) -> None:
+        timed_run = self._timed_runs.pop(run_id, None)
+        if timed_run is None:
+            self._parents.pop(run_id, None)
+            return
+
+        node_name, started_at = timed_run
+        duration = time.perf_counter() - started_at
+        nested_time = self._nested_time.pop(run_id, 0.0)
+        if node_name is not None:
+            self.durations[node_name].append(duration)
+            self.overheads[node_name].append(duration - nested_time)
+
+        if (timed_parent := self._timed_parent(run_id)) is not None:
+            self._nested_time[timed_parent] += duration
+        self._parents.pop(run_id, None)
+
+    def _timed_parent(self, run_id: UUID) -> UUID | None:
+        parent_run_id = self._parents.get(run_id)
+        while parent_run_id is not None and parent_run_id not in self._timed_runs:
+            parent_run_id = self._parents.get(parent_run_id)
+        return parent_run_id
+
+
+def measure_step_latency(graph: Pregel, turns: int) -> dict[str, float]:
+    sync_latencies = []
+    for assistant, text in _turns(graph, turns):
+        start = time.perf_counter()
+        assistant.step(text)
+        sync_latencies.append(time.perf_counter() - start)
+
+    async def run_async_turns() -> list[float]:
+        latencies = []
+        for assistant, text in _turns(graph, turns):
+            start = time.perf_counter()
+            await assistant.astep(text, new_token_callback=SilentResponseCallback())
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    async_latencies = asyncio.run(run_async_turns())
+    return {
+        'step_p50_ms': _percentile(sync_latencies, 50) * 1000,
+        'step_p99_ms': _percentile(sync_latencies, 99) * 1000,
+        'astep_p50_ms': _percentile(async_latencies, 50) * 1000,
+        'astep_p99_ms': _percentile(async_latencies, 99) * 1000,
+    }
+
+
+def measure_node_overhead(graph: Pregel, turns: int) -> dict[str, dict[str, float]]:
+    callback = NodeTimingCallback()
+    for assistant, text in _turns(graph.with_config(callbacks=[callback]), turns):
+        assistant.step(text)
+
+    return {
+        node_name: {
+            'calls': len(durations),
+            'duration_p50_ms': _percentile(durations, 50) * 1000,
+            'overhead_p50_ms': _percentile(callback.overheads[node_name], 50) * 1000,
+            'overhead_p99_ms': _percentile(callback.overheads[node_name], 99) * 1000,
+        }
+        for node_name, durations in sorted(callback.durations.items())
+    }
+
+
+def measure_parsers(iterations: int) -> dict[str, float]:
+    assistant_call = function_call_message(
+        'tool_call', {'tool': 'todo_api_call', 'tool_input': 'Add task Write report'}
+    )
+    api_call = function_call_message(
+        'add_task', {'task_name': 'Write report', 'task_params': '{"priority": "High"}'}
+    )
+    plain_answer = AIMessage(content="The board has 3 tasks in progress.")
+
+    cases: dict[str, tuple[Callable[..., Any], AIMessage]] = {
+        'todo_assistant_function_call_us': (
+            TODOAssistantOutputParser().parse_result,
+            assistant_call,
+        ),
+        'todo_assistant_answer_us': (TODOAssistantOutputParser().parse_result, plain_answer),
+        'api_call_function_call_us': (APICallOutputParser().parse_result, api_call),
+    }
+    results = {}
+    for case, (parse_result, message) in cases.items():
+        generations = [ChatGeneration(message=message)]
+        start = time.perf_counter()
+        for _ in range(iterations):
+            parse_result(generations)
+        results[case] = (time.perf_counter() - start) / iterations * 1_000_000
+    return results
+
+
+def measure_index_build(board_size: int, searches: int = 100) -> dict[str, float]:
+    from chromadb.config import Settings as ChromaSettings
+    from langchain_community.vectorstores.chroma import Chroma
+
+    tasks = make_tasks(board_size)
+    board = [(task, '2024-01-01T00:00:00.000Z') for task in tasks]
+    pages = [board[start : start + 100] for start in range(0, board_size, 100)]
+    vectorstore = Chroma(
+        collection_name=f"benchmark-{uuid4().hex}",
+        embedding_function=DeterministicEmbeddings(),
+        client_settings=ChromaSettings(anonymized_telemetry=False),
+    )
+    task_index = TaskIndex(vectorstore=vectorstore)
+
+    build = task_index.sync(pages)
+    resync = task_index.sync(pages)
+    name_index_build = _timed(lambda: _build_name_index(tasks))
+
+    queries = [tasks[number * board_size // searches].title for number in range(searches)]
+    name_search = _timed(lambda: [task_index.name_index.search(query) for query in queries])
+    vector_search = _timed(
+        lambda: [vectorstore.similarity_search(query, k=4) for query in queries[:10]]
+    )
+    vectorstore.delete_collection()
+
+    return {
+        'index_build_s': build.duration,
+        'index_resync_s': resync.duration,
+        'name_index_build_s': name_index_build,
+        'name_search_ms': name_search / len(queries) * 1000,
+        'vector_search_ms': vector_search / min(len(queries), 10) * 1000,
+    }
+
+
+def run_suite(turns: int, parser_iterations: int, board_sizes: list[int]) -> dict[str, Any]:
+    graph = build_graph(llm_latency=0.0, api_latency=0.0)
+    # Compiles the graph and imports lazily loaded modules outside of the measured turns.
+    TODOAssistant(agent=graph).step("Warm up")
+
+    return {
+        'metadata': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'turns': turns,
+            'parser_iterations': parser_iterations,
+        },
+        'step': measure_step_latency(graph, turns),
+        'nodes': measure_node_overhead(graph, turns),
+        'parsers': measure_parsers(parser_iterations),
+        'index': {str(board_size): measure_index_build(board_size) for board_size in board_sizes},
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    """Lines comparing every metric of `results` present in `baseline`, lower is better."""
+    baseline_metrics = _flatten(baseline)
+    lines = []
+    for metric, value in _flatten(results).items():
+        if (baseline_value := baseline_metrics.get(metric)) is None or metric.endswith('.calls'):
+            continue
+        change = (value - baseline_value) / baseline_value * 100 if baseline_value else 0.0
+        lines.append(f"{metric:<56} {baseline_value:>12.3f} -> {value:>12.3f} ({change:+.1f}%)")
+    return lines
+
+
+def _turns(agent: Runnable, turns: int) -> Iterator[tuple[TODOAssistant, str]]:
+    """Yields an assistant and the input of each turn, starting a new session every few turns."""
+    for turn in range(turns):
+        if turn % _TURNS_PER_SESSION == 0:
+            assistant = TODOAssistant(agent=agent)
+        yield assistant, f"Add task number {turn}"
+
+
+def _build_name_index(tasks: list[Any]) -> TaskNameIndex:
+    name_index = TaskNameIndex()
+    for task in tasks:
+        name_index.add(task.id, task.title)
+    return name_index
+
+
+def _timed(function: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def _flatten(results: dict[str, Any], prefix: str = '') -> dict[str, float]:
+    metrics: dict[str, float] = {}
+    for key, value in results.items():
+        if key == 'metadata':
+            continue
+        if isinstance(value, dict):
+            metrics |= _flatten(value, prefix=f"{prefix}{key}.")
+        elif isinstance(value, (int, float)):
+            metrics[f"{prefix}{key}"] = float(value)
+    return metrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--turns', type=int, default=100)
+    parser.add_argument('--parser-iterations', type=int, default=10_000)
+    parser.add_argument('--board-sizes', type=int, nargs='+', default=[100, 1_000, 10_000])
+    parser.add_argument('--output', type=Path, default=Path('benchmark.json'))
+    parser.add_argument('--baseline', type=Path)
+    args = parser.parse_args()
+
+    results = run_suite(
+        turns=args.turns, parser_iterations=args.parser_iterations, board_sizes=args.board_sizes
+    )
+    args.output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print(f"Results written to {args.output}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        print("\n".join(compare(results, baseline)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""Benchmark of the flat NumPy vector store against Chroma.
+
+Every store is measured in a freshly spawned process, so import time and memory are not shared
+between them. Embeddings are computed up front by deterministic fake embeddings of the size of
+the OpenAI embeddings, only the store work is timed: importing the store, building the index of
+a board, reopening it from disk and answering plain and metadata filtered top-4 searches. Memory
+is the growth of the resident set from before the import to after the searches.
+
+    python -m benchmarks.vector_stores --board-sizes 1000 10000 --output vector_stores.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from benchmarks.fakes import DeterministicEmbeddings, make_tasks
+
+_STORES = ('chroma', 'flat')
+
+
+class _PrecomputedEmbeddings(Embeddings):
+    """Looks embeddings up in a matrix filled before the measurements start."""
+
+    def __init__(self, texts: list[str], dimensions: int):
+        self._rows = {text: row for row, text in enumerate(texts)}
+        self._vectors = np.asarray(
+            DeterministicEmbeddings(size=dimensions).embed_documents(texts), dtype=np.float32
+        )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._vectors[[self._rows[text] for text in texts]].tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._vectors[self._rows[text]].tolist()
+
+
+def measure_store(store: str, board_size: int, dimensions: int, searches: int) -> dict[str, float]:
+    tasks = make_tasks(board_size)
+    texts = [task.as_text() for task in tasks]
+    metadatas = [task.as_metadata() for task in tasks]
+    queries = [texts[number * board_size // searches] for number in range(searches)]
+    embeddings = _PrecomputedEmbeddings(texts, dimensions=dimensions)
+
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    create_store = _import_store(store)
+    import_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        vectorstore = create_store(embeddings, directory)
+        vectorstore.add_texts(texts, metadatas=metadatas, ids=[task.id for task in tasks])
+        build_time = time.perf_counter() - start
+
+        del vectorstore
+        start = time.perf_counter()
+        vectorstore = create_store(embeddings, directory)
+        vectorstore.similarity_search(queries[0], k=4)
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for query in queries:
+            vectorstore.similarity_search(query, k=4)
+        search_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for query in queries:
+            vectorstore.similarity_search(query, k=4, filter={'status': 'Done'})
+        filtered_search_time = time.perf_counter() - start
+        rss = _rss_mb() - rss_before
+
+    return {
+        'import_s': import_time,
+        'build_s': build_time,
+        'load_s': load_time,
+        'search_ms': search_time / searches * 1000,
+        'filtered_search_ms': filtered_search_time / searches * 1000,
+        'rss_mb': rss,
+    }
+
+
+def run_benchmark(board_sizes: list[int], dimensions: int, searches: int) -> dict[str, Any]:
+    context = multiprocessing.get_context('spawn')
+    results: dict[str, Any] = {}
+    for board_size in board_sizes:
+        for store in _STORES:
+            with context.Pool(processes=1) as pool:
+                results.setdefault(str(board_size), {})[store] = pool.apply(
+                    measure_store, (store, board_size, dimensions, searches)
+                )
+    return results
+
+
+def _import_store(store: str) -> Any:
+    if store == 'flat':
+        from todo_assistant.vectorstores import FlatVectorStore
+
+        return lambda embeddings, directory: FlatVectorStore(
+            embedding=embeddings, persist_directory=directory
+        )
+
+    from chromadb.api.client import SharedSystemClient
+    from chromadb.config import Settings as ChromaSettings
+    from langchain_community.vectorstores.chroma import Chroma
+
+    def create_store(embeddings: Embeddings, directory: str) -> Chroma:
+        # Chroma reuses the client of a directory within a process, reopening must start cold.
+        SharedSystemClient.clear_system_cache()
+        return Chroma(
+            collection_name="benchmark",
+            embedding_function=embeddings,
+            persist_directory=directory,
+            client_settings=ChromaSettings(anonymized_telemetry=False, is_persistent=True),
+        )
+
+    return create_store
+
+
+def _rss_mb() -> float:
+    try:
+        resident_pages = int(Path('/proc/self/statm').read_text().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except OSError:
+        # No procfs, the peak resident set is the closest measure.
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Reported in kilobytes on Linux and in bytes on macOS.
+        return peak_rss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--board-sizes', type=int, nargs='+', default=[1_000, 10_000])
+    parser.add_argument('--dimensions', type=int, default=1536)
+    parser.add_argument('--searches', type=int, default=100)
+    parser.add_argument('--output', type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.board_sizes, dimensions=args.dimensions, searches=args.searches)
+    for board_size, stores in results.items():
+        print(f"{board_size} tasks")
+        for store, metrics in stores.items():
+            print(
+                f"  {store:<8}", "  ".join(f"{name}={value:.3f}" for name, value in metrics.items())
+            )
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,15 @@
+import argparse
 import asyncio
+from pathlib import Path
+from typing import Callable
 
 from dependency_injector.wiring import Provide, inject
-from langchain.globals import set_debug, set_verbose
+from langchain_core.globals import set_debug, set_verbose
 from langsmith import traceable
 
 from todo_assistant.assistant.assistant import TODOAssistant
 from todo_assistant.di_containers.application import Application
+from todo_assistant.profiling import StartupProfiler, profile_imports
 from todo_assistant.settings import Settings
 
 
@@ -15,8 +19,13 @@ from todo_assistant.settings import Settings
 )
 @inject
 async def _run(
-    todo_assistant: TODOAssistant = Provide[Application.todo_assistant], max_steps: int = 10
+    session_id: str,
+    todo_assistant_factory: Callable[..., TODOAssistant] = Provide[
+        Application.todo_assistant.provider
+    ],
+    max_steps: int = 10,
 ) -> None:
+    todo_assistant = todo_assistant_factory(session_id=session_id)
     current_step = 0
     await todo_assistant.ainit()
     print("=" * 10)
@@ -37,16 +46,48 @@ async def _run(
     print("Maximum number of turns reached - ending the conversation.")
 
 
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Chat with the TODO assistant.")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print an import time and initialization breakdown before the conversation starts.",
+    )
+    parser.add_argument(
+        "--session-id",
+        default="cli",
+        help="Conversation to continue, persisted sessions are kept under this id across runs.",
+    )
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
-    application = Application()
-    application.config.from_pydantic(Settings())
-    application.init_resources()
-    application.wire(modules=[__name__])
+    args = _parse_args()
+    profiler = StartupProfiler()
+
+    with profiler.phase("configuration"):
+        application = Application()
+        application.config.from_pydantic(Settings())
+    with profiler.phase("resources"):
+        application.init_resources()
+        application.wire(modules=[__name__])
 
     set_debug(application.config.DEBUG())
     set_verbose(application.config.VERBOSE())
-    asyncio.run(
-        _run(
-            max_steps=application.config.MAX_STEPS(),
+
+    if args.profile_startup:
+        with profiler.phase("task index", before_first_notion_call=False):
+            application.task_index()
+        with profiler.phase("graph", before_first_notion_call=False):
+            application.todo_assistant_graph()
+        print(profiler.report(profile_imports("run", cwd=Path(__file__).parent)))
+
+    try:
+        asyncio.run(
+            _run(
+                session_id=args.session_id,
+                max_steps=application.config.MAX_STEPS(),
+            )
         )
-    )
+    finally:
+        application.shutdown_resources()
@@ -0,0 +1,54 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import uvicorn
+from fastapi import FastAPI
+from langchain_core.globals import set_debug, set_verbose
+
+from todo_assistant.api_clients.notion import NotionDatabaseTaskAPIClient
+from todo_assistant.di_containers.application import Application
+from todo_assistant.server.app import create_app
+from todo_assistant.settings import Settings
+
+
+def _create_app(application: Application) -> FastAPI:
+    app = create_app(
+        assistant_pool=application.assistant_pool(),
+        session_store=application.session_store(),
+        llm_response_cache=application.llm_response_cache(),
+        metrics=application.metrics(),
+    )
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        # The board is loaded and the graph compiled once, before the first session arrives.
+        await asyncio.to_thread(application.todo_assistant_graph)
+        change_feed_sync = application.change_feed_sync()
+        if change_feed_sync is not None:
+            change_feed_sync.start()
+        yield
+        if change_feed_sync is not None:
+            await change_feed_sync.stop()
+        # The async connection pool is bound to the server loop and closed while it runs.
+        task_api_client = application.api_clients.backend_task_api_client()
+        if isinstance(task_api_client, NotionDatabaseTaskAPIClient):
+            await task_api_client.aclose()
+        application.shutdown_resources()
+
+    app.router.lifespan_context = lifespan
+    return app
+
+
+if __name__ == '__main__':
+    application = Application()
+    application.config.from_pydantic(Settings())
+    application.init_resources()
+
+    set_debug(application.config.DEBUG())
+    set_verbose(application.config.VERBOSE())
+    uvicorn.run(
+        _create_app(application),
+        host=application.config.SERVER_HOST(),
+        port=application.config.SERVER_PORT(),
+    )
@@ -1,4 +1,5 @@
 import asyncio
+from uuid import uuid4
 
 import streamlit as st
 from streamlit.delta_generator import DeltaGenerator
@@ -9,6 +10,13 @@ from todo_assistant.di_containers.application import Application
 from todo_assistant.settings import Settings
 
 
+def get_session_id() -> str:
+    # Kept in the URL, a reloaded page continues its persisted session instead of starting a new one.
+    if not (session_id := st.query_params.get("session_id")):
+        session_id = st.query_params["session_id"] = uuid4().hex
+    return session_id
+
+
 def mark_assistant_processing():
     st.session_state["assistant_processing"] = True
 
@@ -36,6 +44,23 @@ class StreamlitAssistantResponseCallback(BaseAssistantResponseCallback):
         st.rerun()
 
 
+@st.cache_resource(show_spinner=False)
+def _get_application(
+    openai_api_key: str, notion_api_key: str, notion_database_id: str
+) -> Application:
+    # Browser sessions with the same credentials share the graph, LLM client and task index.
+    settings = Settings(
+        OPENAI_API_KEY=openai_api_key,
+        NOTION_API_KEY=notion_api_key,
+        NOTION_DATABASE_ID=notion_database_id,
+    )
+    application = Application()
+    application.config.from_pydantic(settings)
+    application.init_resources()
+    application.wire(modules=[__name__])
+    return application
+
+
 async def main():
     st.title("🧠 TODO Assistant")
     st.subheader("📝 A Notion TODO Board assistant powered by OpenAI LLM")
@@ -64,17 +89,10 @@ async def main():
         (openai_api_key, notion_api_key, notion_database_id)
     ):
         with st.spinner("Todo assistant initializing"):
-            settings = Settings(
-                OPENAI_API_KEY=openai_api_key,
-                NOTION_API_KEY=notion_api_key,
-                NOTION_DATABASE_ID=notion_database_id,
+            application = _get_application(openai_api_key, notion_api_key, notion_database_id)
+            st.session_state.todo_assistant = application.todo_assistant(
+                session_id=get_session_id()
             )
-            application = Application()
-            application.config.from_pydantic(settings)
-            application.init_resources()
-            application.wire(modules=[__name__])
-
-            st.session_state.todo_assistant = application.todo_assistant()
             ai_response = st.session_state.todo_assistant.init()
             st.session_state.is_final = ai_response.is_final_response
             st.session_state.assistant_processing = False
@@ -0,0 +1,248 @@
+from typing import Sequence
+
+import pytest
+
+from benchmarks.fakes import InMemoryTaskAPIClient, make_tasks
+from todo_assistant.api_clients.base import BaseTaskAPIClient
+from todo_assistant.api_clients.cached import CachedTaskAPIClient
+from todo_assistant.api_clients.sqlite import SQLiteTaskAPIClient
+from todo_assistant.api_clients.version import BoardVersion
+from todo_assistant.entities.task import (
+    CreateTaskRequest,
+    Task,
+    TaskOperationResult,
+    TaskPriority,
+    TaskStatus,
+)
+from todo_assistant.tools.api_calls.update import UpdateTaskTool
+
+
+class _CountingTaskAPIClient(InMemoryTaskAPIClient):
+    def __init__(self, tasks: list[Task]):
+        super().__init__(tasks)
+        self.reads = 0
+
+    def get_by_id(self, id: str) -> Task:
+        self.reads += 1
+        return super().get_by_id(id)
+
+
+class _RecordingTaskAPIClient(BaseTaskAPIClient):
+    def __init__(self, task_api_client: BaseTaskAPIClient):
+        self._task_api_client = task_api_client
+        self.calls: list[str] = []
+
+    def get_by_id(self, id: str) -> Task:
+        self.calls.append('get_by_id')
+        return self._task_api_client.get_by_id(id)
+
+    def add(self, task_to_create: CreateTaskRequest) -> Task:
+        self.calls.append('add')
+        return self._task_api_client.add(task_to_create)
+
+    def update(self, task: Task) -> Task:
+        self.calls.append('update')
+        return self._task_api_client.update(task)
+
+    def delete(self, task_id: str) -> Task:
+        self.calls.append('delete')
+        return self._task_api_client.delete(task_id)
+
+    def get_many(self, ids: Sequence[str]) -> list[TaskOperationResult]:
+        self.calls.append('get_many')
+        return self._task_api_client.get_many(ids)
+
+    def update_many(self, tasks: Sequence[Task]) -> list[TaskOperationResult]:
+        self.calls.append('update_many')
+        return self._task_api_client.update_many(tasks)
+
+
+def _create_request(title: str) -> CreateTaskRequest:
+    return CreateTaskRequest(
+        title=title, priority=TaskPriority.LOW, work_estimation=1, status=TaskStatus.NOT_STARTED
+    )
+
+
+@pytest.fixture
+def backend() -> SQLiteTaskAPIClient:
+    return SQLiteTaskAPIClient()
+
+
+def test_primed_tasks_are_served_as_copies():
+    task = make_tasks(1)[0]
+    backend = _CountingTaskAPIClient([task])
+    cache = CachedTaskAPIClient(backend)
+    cache.prime(task, last_edited_time="v1")
+
+    served = cache.get_by_id(task.id)
+    served.title = "Changed by the caller"
+
+    assert cache.get_by_id(task.id).title == task.title
+    assert backend.reads == 0
+    assert (cache.stats.hits, cache.stats.misses) == (2, 0)
+
+
+def test_expired_tasks_are_read_again():
+    task = make_tasks(1)[0]
+    backend = _CountingTaskAPIClient([task])
+    cache = CachedTaskAPIClient(backend, ttl=0.0)
+    cache.prime(task)
+
+    cache.get_by_id(task.id)
+
+    assert backend.reads == 1
+    assert cache.stats.expired == 1
+
+
+def test_only_tasks_changed_in_the_backend_are_invalidated():
+    first, second, third = make_tasks(3)
+    backend = _CountingTaskAPIClient([first, second, third])
+    cache = CachedTaskAPIClient(backend)
+    for task in (first, second, third):
+        cache.prime(task, last_edited_time="v1")
+
+    invalidated = cache.invalidate_changed({first.id: "v1", second.id: "v2", third.id: None})
+
+    assert invalidated == 2
+    assert cache.stats.invalidated == 2
+    for task in (first, second, third):
+        cache.get_by_id(task.id)
+    assert backend.reads == 2
+
+
+def test_deletes_invalidate_and_mutations_bump_the_board_version():
+    task = make_tasks(1)[0]
+    board_version = BoardVersion()
+    cache = CachedTaskAPIClient(InMemoryTaskAPIClient([task]), board_version=board_version)
+    cache.prime(task)
+    version = board_version.value
+
+    cache.delete(task.id)
+
+    assert board_version.value != version
+    with pytest.raises(KeyError):
+        cache.get_by_id(task.id)
+
+
+def test_update_of_an_outdated_task_keeps_changes_made_in_the_backend(backend):
+    task = backend.add(_create_request("Write report"))
+    cache = CachedTaskAPIClient(backend)
+    cache.prime(task, last_edited_time=task.last_edited_time)
+
+    served = cache.get_by_id(task.id)
+    edited = backend.update(served.copy(update={'priority': TaskPriority.HIGH}))
+    # The change feed primes the cache with the edited task.
+    cache.prime(edited, last_edited_time=edited.last_edited_time)
+    served.status = TaskStatus.DONE
+    updated = cache.update(served)
+
+    assert (updated.priority, updated.status) == (TaskPriority.HIGH, TaskStatus.DONE)
+    assert backend.get_by_id(task.id).priority == TaskPriority.HIGH
+    assert cache.stats.rebased == 1
+
+
+def test_update_of_an_invalidated_task_reads_the_current_version(backend):
+    task = backend.add(_create_request("Write report"))
+    recording = _RecordingTaskAPIClient(backend)
+    cache = CachedTaskAPIClient(recording)
+    cache.prime(task, last_edited_time=task.last_edited_time)
+
+    served = cache.get_by_id(task.id)
+    edited = backend.update(served.copy(update={'priority': TaskPriority.HIGH}))
+    cache.invalidate_changed({task.id: edited.last_edited_time})
+    served.status = TaskStatus.DONE
+    updated = cache.update(served)
+
+    assert (updated.priority, updated.status) == (TaskPriority.HIGH, TaskStatus.DONE)
+    assert recording.calls == ['get_by_id', 'update']
+    assert cache.stats.rebased == 1
+
+
+def test_cached_get_then_update_makes_one_backend_call(backend):
+    task = backend.add(_create_request("Write report"))
+    recording = _RecordingTaskAPIClient(backend)
+    cache = CachedTaskAPIClient(recording)
+    cache.prime(task, last_edited_time=task.last_edited_time)
+
+    UpdateTaskTool(task_api_client=cache).run(
+        {'task_id': task.id, 'task_params': '{"status": "Done"}'}
+    )
+
+    assert recording.calls == ['update']
+    assert backend.get_by_id(task.id).status == TaskStatus.DONE
+
+
+def test_update_of_a_current_task_is_written_as_is(backend):
+    task = backend.add(_create_request("Write report"))
+    cache = CachedTaskAPIClient(backend)
+    cache.prime(task, last_edited_time=task.last_edited_time)
+
+    served = cache.get_by_id(task.id)
+    served.title = "Write the report"
+    updated = cache.update(served)
+
+    assert updated.title == "Write the report"
+    assert updated.last_edited_time != task.last_edited_time
+    assert cache.stats.rebased == 0
+    # The response is cached with its new version.
+    assert cache.get_by_id(task.id).last_edited_time == updated.last_edited_time
+
+
+def test_update_many_rebases_only_outdated_tasks(backend):
+    outdated, current = (
+        result.task
+        for result in backend.add_many([_create_request("Plan budget"), _create_request("Fix API")])
+    )
+    assert outdated is not None and current is not None
+    cache = CachedTaskAPIClient(backend)
+    for task in (outdated, current):
+        cache.prime(task, last_edited_time=task.last_edited_time)
+
+    served = [cache.get_by_id(outdated.id), cache.get_by_id(current.id)]
+    edited = backend.update(outdated.copy(update={'title': "Plan the budget"}))
+    cache.invalidate_changed({outdated.id: edited.last_edited_time})
+    for task in served:
+        task.work_estimation = 8
+    results = cache.update_many(served)
+
+    tasks = [result.task for result in results if result.task is not None]
+    assert [(task.title, task.work_estimation) for task in tasks] == [
+        ("Plan the budget", 8),
+        ("Fix API", 8),
+    ]
+    assert cache.stats.rebased == 1
+
+
+async def test_async_update_of_an_outdated_task_keeps_changes_made_in_the_backend(backend):
+    task = await backend.aadd(_create_request("Write report"))
+    cache = CachedTaskAPIClient(backend)
+    cache.prime(task, last_edited_time=task.last_edited_time)
+
+    served = await cache.aget_by_id(task.id)
+    edited = await backend.aupdate(served.copy(update={'work_estimation': 5}))
+    cache.invalidate_changed({task.id: edited.last_edited_time})
+    served.title = "Write the report"
+    updated = await cache.aupdate(served)
+
+    assert (updated.title, updated.work_estimation) == ("Write the report", 5)
+    assert cache.stats.rebased == 1
+
+
+def test_cached_bulk_update_makes_one_backend_call(backend):
+    tasks = [
+        result.task
+        for result in backend.add_many([_create_request("Plan budget"), _create_request("Fix API")])
+        if result.task is not None
+    ]
+    recording = _RecordingTaskAPIClient(backend)
+    cache = CachedTaskAPIClient(recording)
+    for task in tasks:
+        cache.prime(task, last_edited_time=task.last_edited_time)
+
+    served = [result.task for result in cache.get_many([task.id for task in tasks]) if result.task]
+    for task in served:
+        task.status = TaskStatus.DONE
+    results = cache.update_many(served)
+
+    assert recording.calls == ['update_many']
+    assert all(result.task and result.task.status == TaskStatus.DONE for result in results)
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from benchmarks.fakes import DeterministicEmbeddings
+from todo_assistant.vectorstores import FlatVectorStore
+
+
+def _unit(*values: float) -> list[float]:
+    vector = np.asarray(values, dtype=np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+@pytest.fixture
+def store() -> FlatVectorStore:
+    store = FlatVectorStore(embedding=DeterministicEmbeddings(size=3))
+    store.add_embeddings(
+        [
+            ("east", _unit(1, 0, 0)),
+            ("north-east", _unit(1, 1, 0)),
+            ("north", _unit(0, 1, 0)),
+            ("up", _unit(0, 0, 1)),
+            ("west", _unit(-1, 0, 0)),
+        ],
+        metadatas=[
+            {'status': "Done"},
+            {'status': "In progress"},
+            {'status': "Done"},
+            {'status': "Not started"},
+            {'status': "In progress"},
+        ],
+        ids=["e", "ne", "n", "u", "w"],
+    )
+    return store
+
+
+def test_top_k_by_cosine_similarity(store):
+    results = store.similarity_search_by_vector_with_score([2, 0.5, 0], k=3)
+
+    assert [document.page_content for document, _ in results] == ["east", "north-east", "north"]
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] == pytest.approx(float(np.dot(_unit(2, 0.5, 0), _unit(1, 0, 0))))
+
+
+def test_k_beyond_the_store_returns_every_row(store):
+    results = store.similarity_search_by_vector_with_score([1, 0, 0], k=10)
+
+    assert len(results) == 5
+    assert results[-1][0].page_content == "west"
+    assert results[-1][1] == pytest.approx(-1.0)
+
+
+def test_filters_keep_rows_matching_any_listed_value(store):
+    results = store.similarity_search_by_vector_with_score(
+        [1, 0, 0], k=2, filter={'status': ["Done", "Not started"]}
+    )
+
+    assert [document.page_content for document, _ in results] == ["east", "north"]
+    assert all(document.metadata['status'] != "In progress" for document, _ in results)
+
+
+def test_deleted_rows_are_not_returned(store):
+    store.delete(["e", "unknown"])
+
+    results = store.similarity_search_by_vector_with_score([1, 0, 0], k=1)
+
+    assert [document.page_content for document, _ in results] == ["north-east"]
+    assert len(store) == 4
+
+
+def test_rows_with_a_known_id_are_replaced(store):
+    store.add_embeddings([("east again", _unit(0, 0, -1))], ids=["e"])
+
+    results = store.similarity_search_by_vector_with_score([0, 0, -1], k=1)
+
+    assert [document.page_content for document, _ in results] == ["east again"]
+    assert len(store) == 5
+
+
+def test_saved_store_is_loaded_read_only(tmp_path):
+    persisted = FlatVectorStore(embedding=DeterministicEmbeddings(), persist_directory=tmp_path)
+    persisted.add_texts(["Write report", "Plan budget"], ids=["a", "b"])
+
+    reopened = FlatVectorStore(
+        embedding=DeterministicEmbeddings(), persist_directory=tmp_path, read_only=True
+    )
+
+    assert [document.page_content for document in reopened.similarity_search("budget", k=1)] == [
+        "Plan budget"
+    ]
+    with pytest.raises(PermissionError):
+        reopened.delete(["a"])
+
+
+def test_changes_are_saved_on_flush_without_autosave(tmp_path):
+    store = FlatVectorStore(
+        embedding=DeterministicEmbeddings(), persist_directory=tmp_path, autosave=False
+    )
+    store.add_texts(["Write report"], ids=["a"])
+
+    assert (
+        len(FlatVectorStore(embedding=DeterministicEmbeddings(), persist_directory=tmp_path)) == 0
+    )
+    store.flush()
+    assert (
+        len(FlatVectorStore(embedding=DeterministicEmbeddings(), persist_directory=tmp_path)) == 1
+    )
@@ -0,0 +1,93 @@
+from langchain_core.documents import Document
+
+from benchmarks.fakes import DeterministicEmbeddings
+from todo_assistant.task_index import BM25Index, HybridTaskRetriever
+from todo_assistant.vectorstores import FlatVectorStore
+
+
+class _UnavailableEmbeddings(DeterministicEmbeddings):
+    def embed_query(self, text: str) -> list[float]:
+        raise AssertionError("The embedding model must not be called")
+
+
+def _documents(*ids: str) -> list[Document]:
+    return [Document(page_content=f"Task {id}", metadata={'id': id}) for id in ids]
+
+
+def _retriever(**kwargs) -> HybridTaskRetriever:
+    return HybridTaskRetriever(
+        lexical_index=BM25Index(),
+        vectorstore=FlatVectorStore(embedding=DeterministicEmbeddings()),
+        **kwargs,
+    )
+
+
+def test_bm25_ranks_rare_terms_higher():
+    index = BM25Index()
+    index.add("a", "Write report for the budget")
+    index.add("b", "Write release notes")
+    index.add("c", "Write login page")
+
+    results = index.search("write budget", k=3)
+
+    assert [document.page_content for document, _ in results][0] == "Write report for the budget"
+    assert results[0][1] > results[1][1] > 0.0
+
+
+def test_bm25_updates_postings_in_place():
+    index = BM25Index()
+    index.add("a", "Fix login page", metadata={'id': "a"})
+    index.add("b", "Plan budget", metadata={'id': "b"})
+
+    index.add("a", "Fix database migration", metadata={'id': "a"})
+    index.remove("b")
+
+    assert index.search("login") == []
+    assert index.search("budget") == []
+    ((document, _),) = index.search("migration")
+    assert document.metadata == {'id': "a"}
+    assert len(index) == 1
+
+
+def test_reciprocal_rank_fusion_favours_documents_ranked_by_both():
+    retriever = _retriever(k=3, rrf_k=60)
+
+    fused = retriever._fuse(_documents("a", "b", "c"), _documents("c", "d", "a"))
+
+    # a: 1/61 + 1/63, c: 1/63 + 1/61, ties keep the lexical order, b and d are ranked once.
+    assert [document.metadata['id'] for document in fused] == ["a", "c", "b"]
+
+
+def test_reciprocal_rank_fusion_cuts_to_k():
+    retriever = _retriever(k=2)
+
+    fused = retriever._fuse(_documents("a", "b"), _documents("c", "b"))
+
+    assert [document.metadata['id'] for document in fused] == ["b", "a"]
+
+
+def test_hybrid_retrieval_finds_tasks_by_words_and_vectors():
+    retriever = _retriever(k=2)
+    texts = {"a": "Deploy API", "b": "Review budget", "c": "Plan budget review"}
+    for id, text in texts.items():
+        retriever.lexical_index.add(id, text, metadata={'id': id})
+    retriever.vectorstore.add_texts(
+        list(texts.values()), metadatas=[{'id': id} for id in texts], ids=list(texts)
+    )
+
+    documents = retriever.invoke("budget review")
+
+    assert {document.metadata['id'] for document in documents} == {"b", "c"}
+
+
+def test_lexical_mode_never_embeds_the_query():
+    retriever = HybridTaskRetriever(
+        lexical_index=BM25Index(),
+        vectorstore=FlatVectorStore(embedding=_UnavailableEmbeddings()),
+        k=1,
+        mode='lexical',
+    )
+    retriever.lexical_index.add("a", "Deploy API", metadata={'id': "a"})
+    retriever.lexical_index.add("b", "Review budget", metadata={'id': "b"})
+
+    assert [document.metadata['id'] for document in retriever.invoke("budget")] == ["b"]
@@ -0,0 +1,141 @@
+import asyncio
+from typing import Callable
+
+import httpx
+import pytest
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+from todo_assistant.api_clients.scheduler import RequestScheduler, current_session_id
+
+
+def _failing_once(error: Exception) -> tuple[list[int], Callable[[], str]]:
+    attempts: list[int] = []
+
+    def request() -> str:
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            raise error
+        return "ok"
+
+    return attempts, request
+
+
+def _scheduler() -> RequestScheduler:
+    return RequestScheduler(rate=1_000, burst=1_000, max_retries=2, backoff_base=0.0)
+
+
+async def test_sessions_are_served_round_robin() -> None:
+    scheduler = RequestScheduler(rate=20, burst=1)
+    served: list[str] = []
+
+    async def noop() -> None:
+        pass
+
+    # Takes the only token, the requests below queue until the bucket refills.
+    await scheduler.acall(noop)
+
+    async def request(session_id: str) -> None:
+        async def record() -> None:
+            served.append(session_id)
+
+        current_session_id.set(session_id)
+        await scheduler.acall(record)
+
+    await asyncio.gather(
+        request("bulk"), request("bulk"), request("bulk"), request("chat"), request("bulk")
+    )
+
+    assert served == ["bulk", "chat", "bulk", "bulk", "bulk"]
+    assert scheduler.stats.requests == 6
+    assert scheduler.stats.max_queue_depth >= 5
+
+
+@pytest.mark.parametrize('status', [409, 429, 500, 503])
+def test_idempotent_requests_are_retried_on_transient_errors(status):
+    scheduler = _scheduler()
+    attempts, request = _failing_once(HTTPResponseError(httpx.Response(status)))
+
+    assert scheduler.call(request) == "ok"
+    assert len(attempts) == 2
+    assert scheduler.stats.retries == 1
+    assert scheduler.stats.rate_limited == (1 if status == 429 else 0)
+
+
+def test_idempotent_requests_are_retried_on_timeouts():
+    scheduler = _scheduler()
+    attempts, request = _failing_once(RequestTimeoutError())
+
+    assert scheduler.call(request) == "ok"
+    assert len(attempts) == 2
+
+
+@pytest.mark.parametrize('status', [400, 404])
+def test_client_errors_are_not_retried(status):
+    scheduler = _scheduler()
+    attempts, request = _failing_once(HTTPResponseError(httpx.Response(status)))
+
+    with pytest.raises(HTTPResponseError):
+        scheduler.call(request)
+    assert len(attempts) == 1
+    assert scheduler.stats.retries == 0
+
+
+def test_non_idempotent_requests_are_retried_only_when_rate_limited():
+    scheduler = _scheduler()
+
+    attempts, request = _failing_once(HTTPResponseError(httpx.Response(429)))
+    assert scheduler.call(request, idempotent=False) == "ok"
+    assert len(attempts) == 2
+
+    for error in (HTTPResponseError(httpx.Response(502)), RequestTimeoutError()):
+        attempts, request = _failing_once(error)
+        with pytest.raises(type(error)):
+            scheduler.call(request, idempotent=False)
+        assert len(attempts) == 1
+
+
+async def test_non_idempotent_async_requests_are_not_retried_on_timeouts():
+    scheduler = _scheduler()
+    attempts = 0
+
+    async def request() -> str:
+        nonlocal attempts
+        attempts += 1
+        raise RequestTimeoutError()
+
+    with pytest.raises(RequestTimeoutError):
+        await scheduler.acall(request, idempotent=False)
+    assert attempts == 1
+
+
+def test_retries_stop_after_max_retries():
+    scheduler = _scheduler()
+    attempts = 0
+
+    def request() -> str:
+        nonlocal attempts
+        attempts += 1
+        raise HTTPResponseError(httpx.Response(503))
+
+    with pytest.raises(HTTPResponseError):
+        scheduler.call(request)
+    assert attempts == 3
+
+
+async def test_identical_concurrent_reads_are_coalesced():
+    scheduler = _scheduler()
+    calls = 0
+
+    async def request() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "page"
+
+    results = await asyncio.gather(
+        *(scheduler.acall(request, coalesce_key=('page', '1')) for _ in range(3))
+    )
+
+    assert results == ["page"] * 3
+    assert calls == 1
+    assert scheduler.stats.coalesced == 2
@@ -0,0 +1,97 @@
+from todo_assistant.task_index import TaskNameIndex
+
+
+def _index(*names: str) -> TaskNameIndex:
+    index = TaskNameIndex()
+    for number, name in enumerate(names):
+        index.add(f"task-{number}", name)
+    return index
+
+
+def test_exact_match_ignores_case_quotes_and_whitespace():
+    index = _index("Write report", "Review report")
+
+    matches = index.search("  \"write   REPORT\" ")
+
+    assert [(match.task_id, match.name, match.score) for match in matches] == [
+        ("task-0", "Write report", 1.0)
+    ]
+
+
+def test_tasks_sharing_a_name_are_all_exact_matches():
+    index = _index("Write report", "write report", "Write reports")
+
+    assert [(match.task_id, match.score) for match in index.search("Write report")] == [
+        ("task-0", 1.0),
+        ("task-1", 1.0),
+    ]
+
+
+def test_prefix_matches_score_by_covered_share():
+    index = _index("Deploy database migration", "Deploy API")
+
+    matches = index.search("deploy")
+
+    assert [match.task_id for match in matches] == ["task-1", "task-0"]
+    assert all(0.0 < match.score < 1.0 for match in matches)
+
+
+def test_fuzzy_match_within_edit_distance():
+    index = _index("Refactor login page", "Plan budget")
+
+    (match,) = index.search("Refactr login pgae")
+
+    assert match.task_id == "task-0"
+    # Three edits out of 19 characters.
+    assert match.score == 1.0 - 3 / 19
+
+
+def test_names_beyond_the_edit_distance_bound_are_not_matched():
+    index = _index("Plan budget")
+
+    # A quarter of the query length bounds the distance, four edits exceed the bound of two.
+    assert index.search("Plan bxxxxt") == []
+    assert [match.task_id for match in index.search("Plan bxdget")] == ["task-0"]
+
+
+def test_single_character_typo_in_short_name_is_matched():
+    index = _index("Fix API")
+
+    assert [match.task_id for match in index.search("Fix APO")] == ["task-0"]
+
+
+def test_renamed_and_removed_tasks_leave_the_index():
+    index = _index("Write report", "Review report")
+
+    index.add("task-0", "Write summary")
+    index.remove("task-1")
+
+    assert index.search("Write report") == []
+    assert index.search("Review report") == []
+    assert [match.task_id for match in index.search("write summary")] == ["task-0"]
+    assert len(index) == 1
+
+
+def test_empty_query_matches_nothing():
+    assert _index("Write report").search("  ") == []
+
+
+def test_fuzzy_matches_are_ranked_by_distance_then_name():
+    index = _index("Write report 3", "Write report 1", "Write report 2", "Review report 2")
+
+    matches = index.search("Write reprt 2", limit=3)
+
+    assert [(match.name, match.score) for match in matches] == [
+        ("Write report 2", 1.0 - 1 / 14),
+        ("Write report 1", 1.0 - 2 / 14),
+        ("Write report 3", 1.0 - 2 / 14),
+    ]
+
+
+def test_fuzzy_lookups_follow_renamed_names():
+    index = _index("Plan budget")
+
+    index.add("task-0", "Fix API")
+
+    assert index.search("Plan budgte") == []
+    assert [match.name for match in index.search("Fix AP1")] == ["Fix API"]
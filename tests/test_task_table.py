@@ -0,0 +1,90 @@
+import pytest
+
+from todo_assistant.entities.task import Task, TaskPriority, TaskStatus
+from todo_assistant.task_index import TaskAggregateQuery, TaskTable
+
+
+def _task(id: str, status: TaskStatus, priority: TaskPriority, work_estimation: int) -> Task:
+    return Task(id=id, title=id, status=status, priority=priority, work_estimation=work_estimation)
+
+
+@pytest.fixture
+def table() -> TaskTable:
+    table = TaskTable()
+    table.upsert_many(
+        [
+            _task("a", TaskStatus.DONE, TaskPriority.HIGH, 3),
+            _task("b", TaskStatus.DONE, TaskPriority.LOW, 5),
+            _task("c", TaskStatus.IN_PROGRESS, TaskPriority.HIGH, 8),
+            _task("d", TaskStatus.NOT_STARTED, TaskPriority.MEDIUM, 1),
+        ]
+    )
+    return table
+
+
+def test_count_of_all_tasks(table):
+    result = table.aggregate(TaskAggregateQuery())
+
+    assert [(group.key, group.count, group.value) for group in result.groups] == [({}, 4, None)]
+    assert str(result) == "count of tasks: 4"
+
+
+@pytest.mark.parametrize('operation, value', [('sum', 17), ('avg', 4.25), ('min', 1), ('max', 8)])
+def test_work_estimation_aggregates(table, operation, value):
+    (group,) = table.aggregate(TaskAggregateQuery(operation=operation)).groups
+
+    assert group.count == 4
+    assert group.value == value
+
+
+def test_filters_are_combined(table):
+    query = TaskAggregateQuery(
+        operation='sum',
+        status=[TaskStatus.DONE, TaskStatus.IN_PROGRESS],
+        priority=[TaskPriority.HIGH],
+        min_work_estimation=4,
+    )
+
+    (group,) = table.aggregate(query).groups
+
+    assert (group.count, group.value) == (1, 8)
+
+
+def test_groups_include_empty_combinations_allowed_by_filters(table):
+    query = TaskAggregateQuery(
+        operation='avg', group_by=['status'], priority=[TaskPriority.HIGH, TaskPriority.LOW]
+    )
+
+    groups = table.aggregate(query).groups
+
+    assert [(group.key, group.count, group.value) for group in groups] == [
+        ({'status': 'Not started'}, 0, None),
+        ({'status': 'In progress'}, 1, 8),
+        ({'status': 'Done'}, 2, 4),
+    ]
+
+
+def test_groups_by_several_columns(table):
+    query = TaskAggregateQuery(group_by=['status', 'priority'], status=[TaskStatus.DONE])
+
+    groups = table.aggregate(query).groups
+
+    assert {tuple(group.key.values()): group.count for group in groups} == {
+        ('Done', 'Low'): 1,
+        ('Done', 'Medium'): 0,
+        ('Done', 'High'): 1,
+    }
+
+
+def test_upserts_replace_rows_and_removals_keep_the_columns_dense(table):
+    table.upsert(_task("a", TaskStatus.NOT_STARTED, TaskPriority.HIGH, 2))
+    table.remove("b")
+    table.remove("unknown")
+
+    query = TaskAggregateQuery(operation='sum', group_by=['status'])
+    groups = {
+        group.key['status']: (group.count, group.value) for group in table.aggregate(query).groups
+    }
+
+    assert len(table) == 3
+    assert groups == {'Not started': (2, 3), 'In progress': (1, 8), 'Done': (0, 0)}
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+
+from benchmarks.fakes import function_call_message
+from todo_assistant.agents.todo_assistant.output_parser import (
+    PARALLEL_TOOL_CALLS,
+    TASK_AGGREGATE,
+    TODOAssistantAgentOutput,
+    TODOAssistantOutputParser,
+    TODOAssistantToolCall,
+)
+
+
+def _parse(message: AIMessage) -> TODOAssistantAgentOutput:
+    return TODOAssistantOutputParser().parse_result([ChatGeneration(message=message)])
+
+
+def test_single_tool_call():
+    output = _parse(
+        function_call_message('tool_call', {'tool': 'todo_query', 'tool_input': "open tasks"})
+    )
+
+    assert output == TODOAssistantAgentOutput(next='todo_query', input="open tasks")
+
+
+def test_parallel_tool_calls_are_kept_in_order():
+    calls = [
+        {'tool': 'todo_api_call', 'tool_input': "add task Write report"},
+        {'tool': 'todo_query', 'tool_input': "tasks about the budget"},
+    ]
+
+    output = _parse(function_call_message(PARALLEL_TOOL_CALLS, {'calls': calls}))
+
+    assert output.next == PARALLEL_TOOL_CALLS
+    assert output.input is None
+    assert output.calls == [TODOAssistantToolCall.parse_obj(call) for call in calls]
+
+
+def test_single_parallel_tool_call_runs_as_a_plain_tool_call():
+    calls = [{'tool': 'todo_query', 'tool_input': "open tasks"}]
+
+    output = _parse(function_call_message(PARALLEL_TOOL_CALLS, {'calls': calls}))
+
+    assert output == TODOAssistantAgentOutput(next='todo_query', input="open tasks")
+
+
+def test_parallel_tool_calls_without_calls_are_rejected():
+    with pytest.raises(OutputParserException):
+        _parse(function_call_message(PARALLEL_TOOL_CALLS, {'calls': []}))
+
+
+def test_aggregate_queries_are_passed_on_as_json():
+    query = {'operation': 'sum', 'group_by': ['status'], 'priority': ['High']}
+
+    output = _parse(function_call_message(TASK_AGGREGATE, query))
+
+    assert output.next == TASK_AGGREGATE
+    assert output.input is not None and json.loads(output.input) == query
+    assert output.calls == []
+
+
+def test_messages_without_function_call_are_responses():
+    assert _parse(AIMessage(content="All done.")) == TODOAssistantAgentOutput(
+        next="RESPOND", input="All done."
+    )
+
+
+def test_only_ai_messages_are_parsed():
+    with pytest.raises(TypeError):
+        TODOAssistantOutputParser().parse_result(
+            [ChatGeneration(message=HumanMessage(content="Hi"))]
+        )
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables import Runnable, RunnableConfig
@@ -31,6 +31,22 @@ class TODOAPIAgent(BaseAgent[TODOAPIAgentInput, TODOAPIAgentOutput]):
         last_message = results['messages'][-1]
         return TODOAPIAgentOutput(output=last_message.content)
 
+    async def ainvoke(
+        self, input: TODOAPIAgentInput, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> TODOAPIAgentOutput:
+        results = await self._agent.ainvoke(input=input.input, config=config)
+        last_message = results['messages'][-1]
+        return TODOAPIAgentOutput(output=last_message.content)
+
+    async def astream(
+        self,
+        input: TODOAPIAgentInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Optional[Any],
+    ) -> AsyncIterator[TODOAPIAgentOutput]:
+        # Graph stream chunks are per node updates, only the final state carries the output.
+        yield await self.ainvoke(input, config)
+
 
 def _enter_chain(input_message: str):
     results = {
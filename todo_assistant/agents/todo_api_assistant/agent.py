@@ -1,11 +1,15 @@
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
-from langchain.prompts import ChatPromptTemplate, PromptTemplate, SystemMessagePromptTemplate
-from langchain.tools import BaseTool
-from langchain_community.chat_models import ChatLiteLLM
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import BaseMessage
-from langchain_core.prompts import MessagesPlaceholder
+from langchain_core.prompts import (
+    ChatPromptTemplate,
+    MessagesPlaceholder,
+    PromptTemplate,
+    SystemMessagePromptTemplate,
+)
 from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.tools import BaseTool
 from langchain_core.utils.function_calling import convert_to_openai_function
 from pydantic import BaseModel
 
@@ -29,7 +33,7 @@ class TODOAPIAssistantAgent(BaseAgent[TODOAPIAssistantAgentInput, TODOAPIAssista
     @classmethod
     def from_llm_and_tools(
         cls,
-        llm: ChatLiteLLM,
+        llm: BaseChatModel,
         api_call_tools: list[BaseTool],
         search_task_id_by_name_tool: SearchTaskIDByNameTool,
     ):
@@ -44,7 +48,9 @@ class TODOAPIAssistantAgent(BaseAgent[TODOAPIAssistantAgentInput, TODOAPIAssista
             ]
         )
         all_tools = api_call_tools + [search_task_id_by_name_tool]
-        llm_with_tools = llm.bind(functions=[convert_to_openai_function(t) for t in all_tools])
+        llm_with_tools = llm.with_config({"run_name": "TODOAPIAssistant_llm"}).bind(
+            functions=[convert_to_openai_function(t) for t in all_tools]
+        )
         agent = prompt | llm_with_tools | APICallOutputParser()
         return cls(agent=agent)
 
@@ -52,3 +58,20 @@ class TODOAPIAssistantAgent(BaseAgent[TODOAPIAssistantAgentInput, TODOAPIAssista
         self, input: TODOAPIAssistantAgentInput, config: Optional[RunnableConfig] = None
     ) -> TODOAPIAssistantAgentOutput:
         return self._agent.invoke(input={'messages': input.messages}, config=config)
+
+    async def ainvoke(
+        self,
+        input: TODOAPIAssistantAgentInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> TODOAPIAssistantAgentOutput:
+        return await self._agent.ainvoke(input={'messages': input.messages}, config=config)
+
+    async def astream(
+        self,
+        input: TODOAPIAssistantAgentInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Optional[Any],
+    ) -> AsyncIterator[TODOAPIAssistantAgentOutput]:
+        async for output in self._agent.astream(input={'messages': input.messages}, config=config):
+            yield output
@@ -1,4 +1,16 @@
 from todo_assistant.agents.todo_assistant.agent import TODOAssistantAgent, TODOAssistantAgentInput
-from todo_assistant.agents.todo_assistant.output_parser import TODOAssistantAgentOutput
+from todo_assistant.agents.todo_assistant.output_parser import (
+    PARALLEL_TOOL_CALLS,
+    TASK_AGGREGATE,
+    TODOAssistantAgentOutput,
+    TODOAssistantToolCall,
+)
 
-__all__ = ['TODOAssistantAgent', 'TODOAssistantAgentOutput', 'TODOAssistantAgentInput']
+__all__ = [
+    'PARALLEL_TOOL_CALLS',
+    'TASK_AGGREGATE',
+    'TODOAssistantAgent',
+    'TODOAssistantAgentOutput',
+    'TODOAssistantAgentInput',
+    'TODOAssistantToolCall',
+]
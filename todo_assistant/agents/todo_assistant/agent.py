@@ -1,22 +1,26 @@
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
-from langchain.prompts import (
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import (
     ChatPromptTemplate,
     MessagesPlaceholder,
     PromptTemplate,
     SystemMessagePromptTemplate,
 )
-from langchain_community.chat_models import ChatLiteLLM
-from langchain_core.messages import BaseMessage
 from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.utils.function_calling import convert_to_openai_function
 from pydantic import BaseModel
 
 from todo_assistant.agents.base import BaseAgent
 from todo_assistant.agents.todo_assistant.output_parser import (
+    PARALLEL_TOOL_CALLS,
+    TASK_AGGREGATE,
     TODOAssistantAgentOutput,
     TODOAssistantOutputParser,
 )
 from todo_assistant.prompts import TODO_ASSISTANT_AGENT_PROMPT
+from todo_assistant.task_index import TaskAggregateQuery
 
 _TOOL_NAMES = ['todo_api_call', 'todo_query']
 
@@ -30,7 +34,7 @@ class TODOAssistantAgent(BaseAgent[TODOAssistantAgentInput, TODOAssistantAgentOu
         self._agent = agent
 
     @classmethod
-    def from_llm(cls, llm: ChatLiteLLM):
+    def from_llm(cls, llm: BaseChatModel):
         prompt = ChatPromptTemplate.from_messages(
             messages=[
                 SystemMessagePromptTemplate(
@@ -40,28 +44,51 @@ class TODOAssistantAgent(BaseAgent[TODOAssistantAgentInput, TODOAssistantAgentOu
             ]
         )
 
+        tool_call_schema = {
+            "title": "Tool call",
+            "type": "object",
+            "properties": {
+                "tool": {
+                    "title": "Tool",
+                    "anyOf": [
+                        {"enum": _TOOL_NAMES},
+                    ],
+                },
+                "tool_input": {"title": "Tool input", "type": "string"},
+            },
+            "required": ["tool", "tool_input"],
+        }
         function_schema = {
             "name": "tool_call",
             "description": "Select tool to call",
+            "parameters": tool_call_schema,
+        }
+        parallel_function_schema = {
+            "name": PARALLEL_TOOL_CALLS,
+            "description": "Call tools several times at once with independent inputs",
             "parameters": {
-                "title": "Tool call",
+                "title": "Parallel tool calls",
                 "type": "object",
                 "properties": {
-                    "tool": {
-                        "title": "Tool",
-                        "anyOf": [
-                            {"enum": _TOOL_NAMES},
-                        ],
-                    },
-                    "tool_input": {"title": "Tool input", "type": "string"},
+                    "calls": {"title": "Calls", "type": "array", "items": tool_call_schema},
                 },
-                "required": ["tool", "tool_input"],
+                "required": ["calls"],
             },
         }
+        aggregate_function_schema = {
+            **convert_to_openai_function(TaskAggregateQuery),
+            "name": TASK_AGGREGATE,
+            "description": (
+                "Exact count, total, average, minimum or maximum of work estimation over all board"
+                " tasks matching the filters, optionally grouped by status or priority"
+            ),
+        }
         prompt = prompt.partial(tool_names='\n'.join(_TOOL_NAMES))
         agent = (
             prompt
-            | llm.with_config({"run_name": "TODOAssistant_llm"}).bind(functions=[function_schema])
+            | llm.with_config({"run_name": "TODOAssistant_llm"}).bind(
+                functions=[function_schema, parallel_function_schema, aggregate_function_schema]
+            )
             | TODOAssistantOutputParser()
         )
 
@@ -72,3 +99,23 @@ class TODOAssistantAgent(BaseAgent[TODOAssistantAgentInput, TODOAssistantAgentOu
     ) -> TODOAssistantAgentOutput:
         result_dict = self._agent.invoke(input={'messages': input.messages}, config=config)
         return TODOAssistantAgentOutput.parse_obj(result_dict)
+
+    async def ainvoke(
+        self,
+        input: TODOAssistantAgentInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> TODOAssistantAgentOutput:
+        result_dict = await self._agent.ainvoke(input={'messages': input.messages}, config=config)
+        return TODOAssistantAgentOutput.parse_obj(result_dict)
+
+    async def astream(
+        self,
+        input: TODOAssistantAgentInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Optional[Any],
+    ) -> AsyncIterator[TODOAssistantAgentOutput]:
+        async for result_dict in self._agent.astream(
+            input={'messages': input.messages}, config=config
+        ):
+            yield TODOAssistantAgentOutput.parse_obj(result_dict)
@@ -1,14 +1,26 @@
 import json
 
+from langchain_core.exceptions import OutputParserException
 from langchain_core.messages import AIMessage, BaseMessage
 from langchain_core.output_parsers import BaseOutputParser
 from langchain_core.outputs import ChatGeneration, Generation
 from pydantic import BaseModel
 
+PARALLEL_TOOL_CALLS = "parallel_tool_calls"
+TASK_AGGREGATE = "todo_aggregate"
+
+
+class TODOAssistantToolCall(BaseModel):
+    tool: str
+    tool_input: str | None = None
+
 
 class TODOAssistantAgentOutput(BaseModel):
     next: str
     input: str | None = None
+    # Independent tool calls requested at once, run concurrently when `next` is
+    # `PARALLEL_TOOL_CALLS`.
+    calls: list[TODOAssistantToolCall] = []
 
 
 class TODOAssistantOutputParser(BaseOutputParser[TODOAssistantAgentOutput]):
@@ -25,6 +37,16 @@ class TODOAssistantOutputParser(BaseOutputParser[TODOAssistantAgentOutput]):
         function_call = message.additional_kwargs.get("function_call", {})
         if function_call:
             arguments = json.loads(function_call["arguments"], strict=False)
+            if function_call["name"] == TASK_AGGREGATE:
+                # Structured query arguments are passed on to the aggregate tool as they are.
+                return TODOAssistantAgentOutput(next=TASK_AGGREGATE, input=json.dumps(arguments))
+            if function_call["name"] == PARALLEL_TOOL_CALLS:
+                calls = [TODOAssistantToolCall.parse_obj(call) for call in arguments["calls"]]
+                if not calls:
+                    raise OutputParserException("Parallel tool calls without any call")
+                if len(calls) > 1:
+                    return TODOAssistantAgentOutput(next=PARALLEL_TOOL_CALLS, calls=calls)
+                arguments = calls[0].dict()
 
             return TODOAssistantAgentOutput(
                 next=arguments["tool"],
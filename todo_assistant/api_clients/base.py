@@ -1,9 +1,20 @@
+import asyncio
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Awaitable, Callable, Sequence, TypeVar
 
-from todo_assistant.entities.task import CreateTaskRequest, Task
+from langchain_core.runnables.config import run_in_executor
+
+from todo_assistant.entities.task import CreateTaskRequest, Task, TaskOperationResult
+
+_Item = TypeVar('_Item')
 
 
 class BaseTaskAPIClient(ABC):
+    # Number of requests a bulk operation keeps in flight, clients backed by a remote API raise it.
+    bulk_concurrency: int = 1
+
     @abstractmethod
     def get_by_id(self, id: str) -> Task:
         pass
@@ -19,3 +30,91 @@ class BaseTaskAPIClient(ABC):
     @abstractmethod
     def delete(self, task_id: str) -> Task:
         pass
+
+    async def aget_by_id(self, id: str) -> Task:
+        return await run_in_executor(None, self.get_by_id, id)
+
+    async def aadd(self, task_to_create: CreateTaskRequest) -> Task:
+        return await run_in_executor(None, self.add, task_to_create)
+
+    async def aupdate(self, task: Task) -> Task:
+        return await run_in_executor(None, self.update, task)
+
+    async def adelete(self, task_id: str) -> Task:
+        return await run_in_executor(None, self.delete, task_id)
+
+    def get_many(self, ids: Sequence[str]) -> list[TaskOperationResult]:
+        return self._run_many(self.get_by_id, ids, targets=ids)
+
+    def add_many(self, tasks_to_create: Sequence[CreateTaskRequest]) -> list[TaskOperationResult]:
+        return self._run_many(
+            self.add, tasks_to_create, targets=[task.title for task in tasks_to_create]
+        )
+
+    def update_many(self, tasks: Sequence[Task]) -> list[TaskOperationResult]:
+        return self._run_many(self.update, tasks, targets=[task.id for task in tasks])
+
+    def delete_many(self, task_ids: Sequence[str]) -> list[TaskOperationResult]:
+        return self._run_many(self.delete, task_ids, targets=task_ids)
+
+    async def aget_many(self, ids: Sequence[str]) -> list[TaskOperationResult]:
+        return await self._arun_many(self.aget_by_id, ids, targets=ids)
+
+    async def aadd_many(
+        self, tasks_to_create: Sequence[CreateTaskRequest]
+    ) -> list[TaskOperationResult]:
+        return await self._arun_many(
+            self.aadd, tasks_to_create, targets=[task.title for task in tasks_to_create]
+        )
+
+    async def aupdate_many(self, tasks: Sequence[Task]) -> list[TaskOperationResult]:
+        return await self._arun_many(self.aupdate, tasks, targets=[task.id for task in tasks])
+
+    async def adelete_many(self, task_ids: Sequence[str]) -> list[TaskOperationResult]:
+        return await self._arun_many(self.adelete, task_ids, targets=task_ids)
+
+    def _run_many(
+        self,
+        operation: Callable[[_Item], Task],
+        items: Sequence[_Item],
+        targets: Sequence[str],
+    ) -> list[TaskOperationResult]:
+        def run(item: _Item, target: str) -> TaskOperationResult:
+            try:
+                return TaskOperationResult(target=target, task=operation(item))
+            except Exception as error:
+                return TaskOperationResult(target=target, error=_describe_error(error))
+
+        if self.bulk_concurrency <= 1 or len(items) <= 1:
+            return [run(item, target) for item, target in zip(items, targets)]
+
+        with ThreadPoolExecutor(max_workers=min(self.bulk_concurrency, len(items))) as executor:
+            # Workers keep the context of the caller, e.g. the session requests are scheduled for.
+            futures = [
+                executor.submit(copy_context().run, run, item, target)
+                for item, target in zip(items, targets)
+            ]
+            return [future.result() for future in futures]
+
+    async def _arun_many(
+        self,
+        operation: Callable[[_Item], Awaitable[Task]],
+        items: Sequence[_Item],
+        targets: Sequence[str],
+    ) -> list[TaskOperationResult]:
+        semaphore = asyncio.Semaphore(self.bulk_concurrency)
+
+        async def run(item: _Item, target: str) -> TaskOperationResult:
+            async with semaphore:
+                try:
+                    return TaskOperationResult(target=target, task=await operation(item))
+                except Exception as error:
+                    return TaskOperationResult(target=target, error=_describe_error(error))
+
+        return list(
+            await asyncio.gather(*(run(item, target) for item, target in zip(items, targets)))
+        )
+
+
+def _describe_error(error: Exception) -> str:
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
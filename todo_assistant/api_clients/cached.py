@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Mapping, NamedTuple, Sequence
+
+from pydantic import BaseModel
+
+from todo_assistant.api_clients.base import BaseTaskAPIClient
+from todo_assistant.api_clients.version import BoardVersion
+from todo_assistant.entities.task import CreateTaskRequest, Task, TaskOperationResult
+
+
+class TaskCacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    invalidated: int = 0
+    rebased: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _CacheEntry(NamedTuple):
+    task: Task
+    last_edited_time: str | None
+    cached_at: float
+
+
+class CachedTaskAPIClient(BaseTaskAPIClient):
+    """Write-through cache of tasks in front of a task API client.
+
+    Tasks are kept by id with their `last_edited_time`, filled from the board load through
+    `prime` and from the responses of `add` and `update`, and served to reads until they are older
+    than `ttl` seconds or the backend reports a different `last_edited_time` to
+    `invalidate_changed`. Tasks are copied in and out of the cache as callers mutate the tasks they
+    get. The version every task was last served as is kept, so an update of a task changed since
+    it was served, e.g. primed with a newer version or invalidated by the change feed, applies only
+    the properties the caller changed to the current version instead of writing back outdated
+    ones. The current version is read again only when it's no longer cached, updates of tasks
+    unchanged since they were served cost the update alone. Every mutation bumps the optional
+    `board_version`.
+    """
+
+    def __init__(
+        self,
+        task_api_client: BaseTaskAPIClient,
+        ttl: float | None = 300.0,
+        board_version: BoardVersion | None = None,
+    ):
+        self._task_api_client = task_api_client
+        self._ttl = ttl
+        self._board_version = board_version
+        self._entries: dict[str, _CacheEntry] = {}
+        self._served: dict[str, Task] = {}
+        self._lock = threading.Lock()
+        self.stats = TaskCacheStats()
+
+    def prime(self, task: Task, last_edited_time: str | None = None) -> None:
+        with self._lock:
+            self._store(task, last_edited_time=last_edited_time)
+
+    def invalidate(self, task_id: str) -> None:
+        with self._lock:
+            self._entries.pop(task_id, None)
+            self._served.pop(task_id, None)
+
+    def invalidate_changed(self, page_versions: Mapping[str, str | None]) -> int:
+        """Drop cached tasks whose `last_edited_time` differs from the one of the backend."""
+        with self._lock:
+            stale_ids = [
+                task_id
+                for task_id, last_edited_time in page_versions.items()
+                if task_id in self._entries
+                and (
+                    last_edited_time is None
+                    or self._entries[task_id].last_edited_time != last_edited_time
+                )
+            ]
+            for task_id in stale_ids:
+                del self._entries[task_id]
+            self.stats.invalidated += len(stale_ids)
+            return len(stale_ids)
+
+    def get_by_id(self, id: str) -> Task:
+        if (task := self._lookup(id)) is not None:
+            return task
+        return self._serve(self._store_response(self._task_api_client.get_by_id(id)))
+
+    def add(self, task_to_create: CreateTaskRequest) -> Task:
+        with self._mutation():
+            return self._store_response(self._task_api_client.add(task_to_create))
+
+    def update(self, task: Task) -> Task:
+        with self._mutation():
+            if (outdated := self._outdated_base(task)) is not None:
+                base, current = outdated
+                if current is None:
+                    current = self._task_api_client.get_by_id(task.id)
+                task = self._rebase(task, base, current)
+            return self._store_response(self._task_api_client.update(task))
+
+    def delete(self, task_id: str) -> Task:
+        self.invalidate(task_id)
+        with self._mutation():
+            return self._task_api_client.delete(task_id)
+
+    async def aget_by_id(self, id: str) -> Task:
+        if (task := self._lookup(id)) is not None:
+            return task
+        return self._serve(self._store_response(await self._task_api_client.aget_by_id(id)))
+
+    async def aadd(self, task_to_create: CreateTaskRequest) -> Task:
+        with self._mutation():
+            return self._store_response(await self._task_api_client.aadd(task_to_create))
+
+    async def aupdate(self, task: Task) -> Task:
+        with self._mutation():
+            if (outdated := self._outdated_base(task)) is not None:
+                base, current = outdated
+                if current is None:
+                    current = await self._task_api_client.aget_by_id(task.id)
+                task = self._rebase(task, base, current)
+            return self._store_response(await self._task_api_client.aupdate(task))
+
+    async def adelete(self, task_id: str) -> Task:
+        self.invalidate(task_id)
+        with self._mutation():
+            return await self._task_api_client.adelete(task_id)
+
+    def get_many(self, ids: Sequence[str]) -> list[TaskOperationResult]:
+        cached = self._lookup_many(ids)
+        uncached = [id for id in ids if id not in cached]
+        fetched = self._task_api_client.get_many(uncached) if uncached else []
+        return self._merge_results(ids, cached, self._serve_results(self._store_results(fetched)))
+
+    def add_many(self, tasks_to_create: Sequence[CreateTaskRequest]) -> list[TaskOperationResult]:
+        with self._mutation():
+            return self._store_results(self._task_api_client.add_many(tasks_to_create))
+
+    def update_many(self, tasks: Sequence[Task]) -> list[TaskOperationResult]:
+        with self._mutation():
+            outdated = self._outdated_bases(tasks)
+            uncached = [id for id, (_, current) in outdated.items() if current is None]
+            fetched = self._task_api_client.get_many(uncached) if uncached else []
+            tasks = self._rebase_many(tasks, outdated, fetched)
+            return self._store_results(self._task_api_client.update_many(tasks))
+
+    def delete_many(self, task_ids: Sequence[str]) -> list[TaskOperationResult]:
+        for task_id in task_ids:
+            self.invalidate(task_id)
+        with self._mutation():
+            return self._task_api_client.delete_many(task_ids)
+
+    async def aget_many(self, ids: Sequence[str]) -> list[TaskOperationResult]:
+        cached = self._lookup_many(ids)
+        uncached = [id for id in ids if id not in cached]
+        fetched = await self._task_api_client.aget_many(uncached) if uncached else []
+        return self._merge_results(ids, cached, self._serve_results(self._store_results(fetched)))
+
+    async def aadd_many(
+        self, tasks_to_create: Sequence[CreateTaskRequest]
+    ) -> list[TaskOperationResult]:
+        with self._mutation():
+            return self._store_results(await self._task_api_client.aadd_many(tasks_to_create))
+
+    async def aupdate_many(self, tasks: Sequence[Task]) -> list[TaskOperationResult]:
+        with self._mutation():
+            outdated = self._outdated_bases(tasks)
+            uncached = [id for id, (_, current) in outdated.items() if current is None]
+            fetched = await self._task_api_client.aget_many(uncached) if uncached else []
+            tasks = self._rebase_many(tasks, outdated, fetched)
+            return self._store_results(await self._task_api_client.aupdate_many(tasks))
+
+    async def adelete_many(self, task_ids: Sequence[str]) -> list[TaskOperationResult]:
+        for task_id in task_ids:
+            self.invalidate(task_id)
+        with self._mutation():
+            return await self._task_api_client.adelete_many(task_ids)
+
+    @contextmanager
+    def _mutation(self) -> Iterator[None]:
+        # Bumped even when the mutation fails, it may have been applied before the error.
+        try:
+            yield
+        finally:
+            if self._board_version is not None:
+                self._board_version.bump()
+
+    def _lookup(self, task_id: str) -> Task | None:
+        with self._lock:
+            entry = self._entries.get(task_id)
+            if entry is not None and self._expired(entry):
+                del self._entries[task_id]
+                self.stats.expired += 1
+                entry = None
+
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            self.stats.hits += 1
+            self._served[task_id] = entry.task
+            return entry.task.copy()
+
+    def _expired(self, entry: _CacheEntry) -> bool:
+        return self._ttl is not None and time.monotonic() - entry.cached_at > self._ttl
+
+    def _serve(self, task: Task) -> Task:
+        with self._lock:
+            self._served[task.id] = task.copy()
+        return task
+
+    def _serve_results(self, results: list[TaskOperationResult]) -> list[TaskOperationResult]:
+        for result in results:
+            if result.task is not None:
+                self._serve(result.task)
+        return results
+
+    def _lookup_many(self, ids: Sequence[str]) -> dict[str, Task]:
+        return {id: task for id in ids if (task := self._lookup(id)) is not None}
+
+    def _store(self, task: Task, last_edited_time: str | None) -> None:
+        self._entries[task.id] = _CacheEntry(
+            task=task.with_last_edited_time(last_edited_time),
+            last_edited_time=last_edited_time,
+            cached_at=time.monotonic(),
+        )
+
+    def _store_response(self, task: Task) -> Task:
+        with self._lock:
+            self._store(task, last_edited_time=task.last_edited_time)
+        return task
+
+    def _store_results(self, results: list[TaskOperationResult]) -> list[TaskOperationResult]:
+        with self._lock:
+            for result in results:
+                if result.task is not None:
+                    self._store(result.task, last_edited_time=result.task.last_edited_time)
+        return results
+
+    def _outdated_base(self, task: Task) -> tuple[Task, Task | None] | None:
+        """The version `task` was served as and the cached current one, when it changed since.
+
+        The current version is None when it's no longer cached and has to be read again.
+        """
+        with self._lock:
+            base = self._served.pop(task.id, None)
+            # A task not read through the cache can't be told apart from its changes.
+            if base is None or base.last_edited_time != task.last_edited_time:
+                return None
+            entry = self._entries.get(task.id)
+            if entry is None or self._expired(entry):
+                return base, None
+            if entry.last_edited_time == base.last_edited_time:
+                return None
+            return base, entry.task.copy()
+
+    def _outdated_bases(self, tasks: Sequence[Task]) -> dict[str, tuple[Task, Task | None]]:
+        return {
+            task.id: outdated
+            for task in tasks
+            if (outdated := self._outdated_base(task)) is not None
+        }
+
+    def _rebase(self, task: Task, base: Task, current: Task) -> Task:
+        """Apply the changes made to the served `base` to the `current` version of the task."""
+        if (
+            current.last_edited_time is not None
+            and current.last_edited_time == base.last_edited_time
+        ):
+            return task
+        with self._lock:
+            self.stats.rebased += 1
+        changes = {
+            name: value for name, value in task.dict().items() if getattr(base, name) != value
+        }
+        return current.copy(update=changes)
+
+    def _rebase_many(
+        self,
+        tasks: Sequence[Task],
+        outdated: Mapping[str, tuple[Task, Task | None]],
+        fetched: list[TaskOperationResult],
+    ) -> list[Task]:
+        current_by_id = {id: current for id, (_, current) in outdated.items() if current}
+        current_by_id.update((result.target, result.task) for result in fetched if result.task)
+        return [
+            self._rebase(task, outdated[task.id][0], current_by_id[task.id])
+            if task.id in outdated and task.id in current_by_id
+            else task
+            for task in tasks
+        ]
+
+    @staticmethod
+    def _merge_results(
+        ids: Sequence[str], cached: Mapping[str, Task], fetched: list[TaskOperationResult]
+    ) -> list[TaskOperationResult]:
+        fetched_by_id = {result.target: result for result in fetched}
+        return [
+            TaskOperationResult(target=id, task=cached[id]) if id in cached else fetched_by_id[id]
+            for id in ids
+        ]
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Sequence
+
+from pydantic import BaseModel
+
+from todo_assistant.api_clients.cached import CachedTaskAPIClient
+from todo_assistant.api_clients.notion import NotionDatabaseTaskAPIClient
+from todo_assistant.api_clients.sqlite import SQLiteTaskAPIClient
+from todo_assistant.api_clients.version import BoardVersion
+from todo_assistant.entities.task import Task
+from todo_assistant.metrics.registry import MetricsRegistry
+from todo_assistant.task_index import IndexSyncSummary, TaskIndex
+
+logger = logging.getLogger(__name__)
+
+# Edits reach the index after up to one poll interval, buckets reach far beyond the default ones.
+_PROPAGATION_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+
+class ChangeFeedStats(BaseModel):
+    polls: int = 0
+    failed_polls: int = 0
+    reconciliations: int = 0
+    changed_tasks: int = 0
+    removed_tasks: int = 0
+    interval: float = 0.0
+    watermark: str | None = None
+
+
+class ChangeFeedSync:
+    """Applies changes made to the board outside of the assistant, e.g. directly in Notion.
+
+    A background asyncio task polls the backend for tasks edited at or after the watermark, the
+    latest `last_edited_time` indexed so far, and applies them to the task index and the task
+    cache. Changes bump the board version, which invalidates cached LLM responses. The poll
+    interval starts at `min_interval`, doubles after every poll without changes up to
+    `max_interval` and drops back after a change. Deleted tasks never show up as changes, every
+    `reconcile_interval` seconds the whole board is synced instead. `metrics` get the freshness
+    lag, the seconds since the index was last known to match the backend, and the delay between
+    an edit and its poll.
+    """
+
+    def __init__(
+        self,
+        task_api_client: NotionDatabaseTaskAPIClient | SQLiteTaskAPIClient,
+        task_index: TaskIndex,
+        task_cache: CachedTaskAPIClient,
+        board_version: BoardVersion | None = None,
+        min_interval: float = 5.0,
+        max_interval: float = 60.0,
+        reconcile_interval: float | None = 3600.0,
+        metrics: MetricsRegistry | None = None,
+    ):
+        self._task_api_client = task_api_client
+        self._task_index = task_index
+        self._task_cache = task_cache
+        self._board_version = board_version
+        self._min_interval = min_interval
+        self._max_interval = max(min_interval, max_interval)
+        self._reconcile_interval = reconcile_interval
+        self._interval = min_interval
+        self._watermark: str | None = None
+        # The index matches the backend as of the board load that created it.
+        self._synced_at = self._reconciled_at = time.monotonic()
+        self._task: asyncio.Task[None] | None = None
+        self.stats = ChangeFeedStats(interval=min_interval)
+
+        if metrics is not None:
+            metrics.gauge(
+                "task_index_freshness_lag_seconds",
+                "Seconds since the task index was last known to match the task backend.",
+            ).set_function(lambda: time.monotonic() - self._synced_at)
+        self._polls = (
+            metrics.counter("change_feed_polls", "Polls of the task backend.", ['result'])
+            if metrics is not None
+            else None
+        )
+        self._propagation_delay = (
+            metrics.histogram(
+                "change_feed_propagation_seconds",
+                "Delay between an edit in the task backend and its poll.",
+                buckets=_PROPAGATION_BUCKETS,
+            )
+            if metrics is not None
+            else None
+        )
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    def start(self) -> None:
+        """Start polling in a task of the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def poll(self) -> bool:
+        """Apply the changes made since the last poll, or sync the whole board when it's due.
+
+        Returns whether the board changed.
+        """
+        started_at = time.monotonic()
+        if (
+            self._reconcile_interval is not None
+            and started_at - self._reconciled_at >= self._reconcile_interval
+        ):
+            return self._reconcile(started_at)
+
+        watermark = self._watermark or _latest(self._task_index.last_edited_times().values())
+        if watermark is None:
+            # Nothing to compare edit times with, e.g. the board was empty.
+            return self._reconcile(started_at)
+
+        edited_at: list[str] = []
+
+        def changed_pages() -> Iterator[Sequence[tuple[Task, str | None]]]:
+            for page in self._task_api_client.iter_task_pages(edited_since=watermark):
+                for task, last_edited_time in page:
+                    self._task_cache.prime(task, last_edited_time=last_edited_time)
+                    if last_edited_time is not None and last_edited_time > watermark:
+                        edited_at.append(last_edited_time)
+                yield page
+
+        summary = self._task_index.sync(changed_pages(), remove_missing=False)
+        self._observe_propagation(edited_at)
+        # Tasks of failed embedding batches are polled again with the same watermark.
+        if summary.failed == 0:
+            self._watermark = _latest([watermark, *edited_at])
+        return self._record(summary, started_at)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                changed = await asyncio.to_thread(self.poll)
+            except Exception:
+                logger.exception("Polling the task backend for changes failed")
+                self.stats.failed_polls += 1
+                if self._polls is not None:
+                    self._polls.inc(result='failed')
+                changed = False
+            # Quiet boards are polled less and less often, edits are picked up quickly again.
+            self._interval = (
+                self._min_interval if changed else min(self._max_interval, self._interval * 2)
+            )
+            self.stats.interval = self._interval
+
+    def _reconcile(self, started_at: float) -> bool:
+        indexed_ids = set(self._task_index.last_edited_times())
+        page_versions: dict[str, str | None] = {}
+
+        def board_pages() -> Iterator[Sequence[tuple[Task, str | None]]]:
+            for page in self._task_api_client.iter_task_pages():
+                page_versions.update((task.id, last_edited_time) for task, last_edited_time in page)
+                yield page
+
+        summary = self._task_index.sync(board_pages())
+        # Cached tasks edited since they were cached are read again on their next use.
+        self._task_cache.invalidate_changed(page_versions)
+        for task_id in indexed_ids - page_versions.keys():
+            self._task_cache.invalidate(task_id)
+        if summary.failed == 0:
+            self._watermark = _latest(self._task_index.last_edited_times().values())
+        self._reconciled_at = started_at
+        self.stats.reconciliations += 1
+        return self._record(summary, started_at)
+
+    def _record(self, summary: IndexSyncSummary, started_at: float) -> bool:
+        self._synced_at = started_at
+        changed = summary.added + summary.updated + summary.removed > 0
+        self.stats.polls += 1
+        self.stats.changed_tasks += summary.added + summary.updated
+        self.stats.removed_tasks += summary.removed
+        self.stats.watermark = self._watermark
+        if self._polls is not None:
+            self._polls.inc(result='changed' if changed else 'unchanged')
+        if changed:
+            logger.info("Applied board changes: %s", summary)
+            if self._board_version is not None:
+                self._board_version.bump()
+        return changed
+
+    def _observe_propagation(self, edited_at: list[str]) -> None:
+        if self._propagation_delay is None:
+            return
+        now = datetime.now(timezone.utc)
+        for last_edited_time in edited_at:
+            try:
+                edited = datetime.fromisoformat(last_edited_time)
+            except ValueError:
+                continue
+            self._propagation_delay.observe(max(0.0, (now - edited).total_seconds()))
+
+
+def _latest(last_edited_times: Iterable[str | None]) -> str | None:
+    # Timestamps of one backend share their format, the latest sorts last.
+    return max(
+        (last_edited_time for last_edited_time in last_edited_times if last_edited_time),
+        default=None,
+    )
@@ -0,0 +1,112 @@
+import logging
+from typing import Sequence
+
+from langchain_core.runnables.config import run_in_executor
+
+from todo_assistant.api_clients.base import BaseTaskAPIClient
+from todo_assistant.entities.task import CreateTaskRequest, Task, TaskOperationResult
+from todo_assistant.task_index import EmbeddingPipelineError, TaskIndex
+
+logger = logging.getLogger(__name__)
+
+
+class IndexedTaskAPIClient(BaseTaskAPIClient):
+    """Task API client writing every mutation through to the shared task index.
+
+    Tasks whose embedding fails are logged and left for the next sync of the index, the backend
+    write succeeded and failing the call would make the caller retry it, e.g. add the task twice.
+    """
+
+    def __init__(self, task_api_client: BaseTaskAPIClient, task_index: TaskIndex):
+        self._task_api_client = task_api_client
+        self._task_index = task_index
+
+    def get_by_id(self, id: str) -> Task:
+        return self._task_api_client.get_by_id(id)
+
+    def add(self, task_to_create: CreateTaskRequest) -> Task:
+        task = self._task_api_client.add(task_to_create)
+        self._index([task])
+        return task
+
+    def update(self, task: Task) -> Task:
+        task = self._task_api_client.update(task)
+        self._index([task])
+        return task
+
+    def delete(self, task_id: str) -> Task:
+        task = self._task_api_client.delete(task_id)
+        self._task_index.remove(task_id)
+        return task
+
+    async def aget_by_id(self, id: str) -> Task:
+        return await self._task_api_client.aget_by_id(id)
+
+    async def aadd(self, task_to_create: CreateTaskRequest) -> Task:
+        task = await self._task_api_client.aadd(task_to_create)
+        await run_in_executor(None, self._index, [task])
+        return task
+
+    async def aupdate(self, task: Task) -> Task:
+        task = await self._task_api_client.aupdate(task)
+        await run_in_executor(None, self._index, [task])
+        return task
+
+    async def adelete(self, task_id: str) -> Task:
+        task = await self._task_api_client.adelete(task_id)
+        await run_in_executor(None, self._task_index.remove, task_id)
+        return task
+
+    def get_many(self, ids: Sequence[str]) -> list[TaskOperationResult]:
+        return self._task_api_client.get_many(ids)
+
+    def add_many(self, tasks_to_create: Sequence[CreateTaskRequest]) -> list[TaskOperationResult]:
+        results = self._task_api_client.add_many(tasks_to_create)
+        self._index(_succeeded_tasks(results))
+        return results
+
+    def update_many(self, tasks: Sequence[Task]) -> list[TaskOperationResult]:
+        results = self._task_api_client.update_many(tasks)
+        self._index(_succeeded_tasks(results))
+        return results
+
+    def delete_many(self, task_ids: Sequence[str]) -> list[TaskOperationResult]:
+        results = self._task_api_client.delete_many(task_ids)
+        self._task_index.remove_many(task.id for task in _succeeded_tasks(results))
+        return results
+
+    async def aget_many(self, ids: Sequence[str]) -> list[TaskOperationResult]:
+        return await self._task_api_client.aget_many(ids)
+
+    async def aadd_many(
+        self, tasks_to_create: Sequence[CreateTaskRequest]
+    ) -> list[TaskOperationResult]:
+        results = await self._task_api_client.aadd_many(tasks_to_create)
+        await run_in_executor(None, self._index, _succeeded_tasks(results))
+        return results
+
+    async def aupdate_many(self, tasks: Sequence[Task]) -> list[TaskOperationResult]:
+        results = await self._task_api_client.aupdate_many(tasks)
+        await run_in_executor(None, self._index, _succeeded_tasks(results))
+        return results
+
+    async def adelete_many(self, task_ids: Sequence[str]) -> list[TaskOperationResult]:
+        results = await self._task_api_client.adelete_many(task_ids)
+        await run_in_executor(
+            None, self._task_index.remove_many, [task.id for task in _succeeded_tasks(results)]
+        )
+        return results
+
+    def _index(self, tasks: Sequence[Task]) -> None:
+        try:
+            self._task_index.upsert_many(tasks)
+        except EmbeddingPipelineError:
+            logger.warning(
+                "Indexing %d written tasks failed, the next sync indexes them",
+                len(tasks),
+                exc_info=True,
+            )
+
+
+def _succeeded_tasks(results: Sequence[TaskOperationResult]) -> list[Task]:
+    return [result.task for result in results if result.task is not None]
@@ -1,57 +1,214 @@
+import asyncio
+import logging
 import typing
-from typing import Any
+from typing import Any, Iterable, Iterator
 
-from notion_client import Client
+import httpx
+from notion_client import AsyncClient, Client
 
 from todo_assistant.api_clients.base import BaseTaskAPIClient
+from todo_assistant.api_clients.scheduler import RequestScheduler
 from todo_assistant.entities.task import CreateTaskRequest, Task, TaskPriority, TaskStatus
 
+logger = logging.getLogger(__name__)
+
+_MAX_PAGE_SIZE = 100
+
 
 class NotionDatabaseTaskAPIClient(BaseTaskAPIClient):
     def __init__(
         self,
         api_key: str,
         database_id: str,
+        max_connections: int = 10,
+        scheduler: RequestScheduler | None = None,
     ):
+        self._api_key = api_key
         self._client = Client(auth=api_key)
         self._database_id = database_id
+        self._max_connections = max_connections
+        self.bulk_concurrency = max_connections
+        self._scheduler = scheduler or RequestScheduler()
+        self._async_client: AsyncClient | None = None
+        self._async_client_loop: asyncio.AbstractEventLoop | None = None
+        self._closing: set[asyncio.Task[None]] = set()
+
+    @property
+    def scheduler(self) -> RequestScheduler:
+        return self._scheduler
 
     def get_by_id(self, id: str) -> Task:
-        response = self._client.pages.retrieve(page_id=id)
-        return self._create_task_from_response(response=typing.cast(dict[str, Any], response))
+        response = self._scheduler.call(
+            lambda: self._client.pages.retrieve(page_id=id),
+            coalesce_key=('pages.retrieve', id),
+            operation='pages.retrieve',
+        )
+        return self.task_from_page(typing.cast(dict[str, Any], response))
 
     def add(self, task_to_create: CreateTaskRequest) -> Task:
-        response = self._client.pages.create(
-            parent={
+        request = self._create_page_request(task_to_create)
+        response = self._scheduler.call(
+            lambda: self._client.pages.create(**request),
+            operation='pages.create',
+            idempotent=False,
+        )
+        return self.task_from_page(typing.cast(dict[str, Any], response))
+
+    def update(self, task: Task) -> Task:
+        request = self._update_page_request(task)
+        response = self._scheduler.call(
+            lambda: self._client.pages.update(**request), operation='pages.update'
+        )
+        return self.task_from_page(typing.cast(dict[str, Any], response))
+
+    def delete(self, task_id: str) -> Task:
+        response = self._scheduler.call(
+            lambda: self._client.pages.update(page_id=task_id, archived=True),
+            operation='pages.archive',
+        )
+        return self.task_from_page(typing.cast(dict[str, Any], response))
+
+    def iter_task_pages(
+        self, page_size: int = _MAX_PAGE_SIZE, edited_since: str | None = None
+    ) -> Iterator[list[tuple[Task, str | None]]]:
+        """Tasks of the board with their `last_edited_time`, one list per database query page.
+
+        Pages are queried lazily as the iterator advances. Query results carry all task
+        properties, no page is retrieved on its own. With `edited_since` only tasks edited at or
+        after that `last_edited_time` are queried, Notion rounds it to the minute.
+        """
+        query: dict[str, Any] = {'database_id': self._database_id, 'page_size': page_size}
+        if edited_since is not None:
+            query['filter'] = {
+                'timestamp': 'last_edited_time',
+                'last_edited_time': {'on_or_after': edited_since},
+            }
+        while True:
+            response = typing.cast(
+                dict[str, Any],
+                self._scheduler.call(
+                    lambda: self._client.databases.query(**query),
+                    operation='databases.query',
+                ),
+            )
+            yield list(self.tasks_from_pages(response['results']))
+            if not response.get('has_more') or not response.get('next_cursor'):
+                return
+            query['start_cursor'] = response['next_cursor']
+
+    async def aget_by_id(self, id: str) -> Task:
+        client = self._get_async_client()
+        response = await self._scheduler.acall(
+            lambda: client.pages.retrieve(page_id=id),
+            coalesce_key=('pages.retrieve', id),
+            operation='pages.retrieve',
+        )
+        return self.task_from_page(typing.cast(dict[str, Any], response))
+
+    async def aadd(self, task_to_create: CreateTaskRequest) -> Task:
+        client, request = self._get_async_client(), self._create_page_request(task_to_create)
+        response = await self._scheduler.acall(
+            lambda: client.pages.create(**request),
+            operation='pages.create',
+            idempotent=False,
+        )
+        return self.task_from_page(typing.cast(dict[str, Any], response))
+
+    async def aupdate(self, task: Task) -> Task:
+        client, request = self._get_async_client(), self._update_page_request(task)
+        response = await self._scheduler.acall(
+            lambda: client.pages.update(**request), operation='pages.update'
+        )
+        return self.task_from_page(typing.cast(dict[str, Any], response))
+
+    async def adelete(self, task_id: str) -> Task:
+        client = self._get_async_client()
+        response = await self._scheduler.acall(
+            lambda: client.pages.update(page_id=task_id, archived=True),
+            operation='pages.archive',
+        )
+        return self.task_from_page(typing.cast(dict[str, Any], response))
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_client_loop = None
+
+    def close(self) -> None:
+        """Close the connection pools, the async one only outside of a running event loop.
+
+        In a running loop the async pool is closed by `aclose`.
+        """
+        self._client.close()
+        if self._async_client is None:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(_aclose_quietly(self._async_client))
+            self._async_client = None
+            self._async_client_loop = None
+
+    def _get_async_client(self) -> AsyncClient:
+        # Pooled connections are bound to the event loop they were opened on, so a client is
+        # shared by all coroutines of a loop and replaced when the loop changes.
+        loop = asyncio.get_running_loop()
+        if self._async_client is not None and self._async_client_loop is not loop:
+            self._close_async_client(loop)
+        if self._async_client is None:
+            self._async_client = AsyncClient(
+                auth=self._api_key,
+                client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self._max_connections,
+                        max_keepalive_connections=self._max_connections,
+                    ),
+                ),
+            )
+            self._async_client_loop = loop
+        return self._async_client
+
+    def _close_async_client(self, loop: asyncio.AbstractEventLoop) -> None:
+        client, client_loop = self._async_client, self._async_client_loop
+        self._async_client = None
+        self._async_client_loop = None
+        if client is None:
+            return
+        if client_loop is not None and client_loop.is_running():
+            # Connections are closed on the loop they were opened on, e.g. in another thread.
+            asyncio.run_coroutine_threadsafe(_aclose_quietly(client), client_loop)
+            return
+        # The loop is gone, e.g. a finished `asyncio.run` of a Streamlit rerun, so the pool is
+        # released on the current one instead of leaking with every new loop.
+        closing = loop.create_task(_aclose_quietly(client))
+        self._closing.add(closing)
+        closing.add_done_callback(self._closing.discard)
+
+    def _create_page_request(self, task_to_create: CreateTaskRequest) -> dict[str, Any]:
+        return {
+            'parent': {
                 'database_id': self._database_id,
             },
-            properties=self._create_request_properties_from_task_properties(
+            'properties': self._create_request_properties_from_task_properties(
                 title=task_to_create.title,
                 priority=task_to_create.priority,
                 status=task_to_create.status,
                 work_estimation=task_to_create.work_estimation,
             ),
-        )
-        return self._create_task_from_response(response=typing.cast(dict[str, Any], response))
+        }
 
-    def update(self, task: Task) -> Task:
-        response = self._client.pages.update(
-            page_id=task.id,
-            properties=self._create_request_properties_from_task_properties(
+    @classmethod
+    def _update_page_request(cls, task: Task) -> dict[str, Any]:
+        return {
+            'page_id': task.id,
+            'properties': cls._create_request_properties_from_task_properties(
                 title=task.title,
                 priority=task.priority,
                 status=task.status,
                 work_estimation=task.work_estimation,
             ),
-        )
-        return self._create_task_from_response(response=typing.cast(dict[str, Any], response))
-
-    def delete(self, task_id: str) -> Task:
-        response = self._client.pages.update(
-            page_id=task_id,
-            archived=True,
-        )
-        return self._create_task_from_response(response=typing.cast(dict[str, Any], response))
+        }
 
     @staticmethod
     def _create_request_properties_from_task_properties(
@@ -67,12 +224,33 @@ class NotionDatabaseTaskAPIClient(BaseTaskAPIClient):
             "Status": {"status": {"name": status.value}},
         }
 
+    @classmethod
+    def tasks_from_pages(cls, pages: Iterable[dict[str, Any]]) -> Iterator[tuple[Task, str | None]]:
+        """Tasks with their `last_edited_time` of database pages, incomplete pages are skipped."""
+        for page in pages:
+            try:
+                task = cls.task_from_page(page)
+            except (KeyError, IndexError, TypeError, ValueError):
+                logger.warning(
+                    "Skipping incomplete task page %s, it's left out of the index", page.get('id')
+                )
+                continue
+            yield task, page.get('last_edited_time')
+
     @staticmethod
-    def _create_task_from_response(response: dict[str, Any]) -> Task:
+    def task_from_page(page: dict[str, Any]) -> Task:
         return Task(
-            id=response['id'],
-            title=response['properties']['Name']['title'][0]['plain_text'],
-            priority=TaskPriority(response['properties']['Priority']['select']['name']),
-            work_estimation=response['properties']['Work estimation']['number'],
-            status=TaskStatus(response['properties']['Status']['status']['name']),
-        )
+            id=page['id'],
+            title=page['properties']['Name']['title'][0]['plain_text'],
+            priority=TaskPriority(page['properties']['Priority']['select']['name']),
+            work_estimation=page['properties']['Work estimation']['number'],
+            status=TaskStatus(page['properties']['Status']['status']['name']),
+        ).with_last_edited_time(page.get('last_edited_time'))
+
+
+async def _aclose_quietly(client: AsyncClient) -> None:
+    try:
+        await client.aclose()
+    except Exception:
+        # Connections of a closed event loop may fail to close, they are dropped either way.
+        logger.debug("Closing the async Notion client failed", exc_info=True)
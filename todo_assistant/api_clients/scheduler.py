@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import email.utils
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+from pydantic import BaseModel
+
+from todo_assistant.metrics.registry import MetricsRegistry
+
+_T = TypeVar('_T')
+
+_DEFAULT_SESSION_ID = "default"
+_RATE_LIMITED_STATUS = 429
+_RETRYABLE_STATUSES = {409, _RATE_LIMITED_STATUS, 500, 502, 503, 504}
+
+current_session_id: ContextVar[str | None] = ContextVar('current_session_id', default=None)
+
+
+class RequestSchedulerStats(BaseModel):
+    requests: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    coalesced: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    total_wait_time: float = 0.0
+    max_wait_time: float = 0.0
+
+    @property
+    def average_wait_time(self) -> float:
+        return self.total_wait_time / self.requests if self.requests else 0.0
+
+
+class RequestScheduler:
+    """Rate limited scheduler for requests sharing one Notion integration.
+
+    Every attempt of a request takes a token from a bucket refilled at `rate` tokens per second.
+    Waiting requests are queued per session, the session being read from `current_session_id`, and
+    sessions are served round robin so one bulk edit can't starve the other conversations.
+    Rate limited and transient failures are retried with jittered exponential backoff, a
+    `Retry-After` header pauses the whole bucket. Requests which aren't `idempotent`, e.g. page
+    creations, are only retried when rate limited, a timed out or failed create may have been
+    applied and retrying it could duplicate the page. Identical concurrent reads passed with the same
+    `coalesce_key` share a single request. The latency and errors of every attempt are recorded
+    per `operation` in the optional `metrics`.
+    """
+
+    def __init__(
+        self,
+        rate: float = 3.0,
+        burst: int = 3,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        metrics: MetricsRegistry | None = None,
+    ):
+        self._bucket = _TokenBucket(rate=rate, capacity=burst)
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._backoff_cap = backoff_cap
+        self._queues: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._condition = threading.Condition()
+        self._dispatcher: threading.Thread | None = None
+        self._inflight: dict[Hashable, concurrent.futures.Future] = {}
+        self._ainflight: dict[tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Task] = {}
+        self.stats = RequestSchedulerStats()
+        self._request_duration = (
+            metrics.histogram(
+                "notion_request_duration_seconds",
+                "Duration of Notion request attempts.",
+                ['operation'],
+            )
+            if metrics is not None
+            else None
+        )
+        self._request_errors = (
+            metrics.counter(
+                "notion_request_errors", "Failed Notion request attempts.", ['operation', 'error']
+            )
+            if metrics is not None
+            else None
+        )
+
+    def call(
+        self,
+        request: Callable[[], _T],
+        coalesce_key: Hashable | None = None,
+        operation: str = "request",
+        idempotent: bool = True,
+    ) -> _T:
+        if coalesce_key is None:
+            return self._call_with_retries(request, operation, idempotent)
+
+        with self._condition:
+            inflight = self._inflight.get(coalesce_key)
+            if inflight is None:
+                future: concurrent.futures.Future = concurrent.futures.Future()
+                self._inflight[coalesce_key] = future
+            else:
+                self.stats.coalesced += 1
+        if inflight is not None:
+            return inflight.result()
+
+        try:
+            result = self._call_with_retries(request, operation, idempotent)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._condition:
+                del self._inflight[coalesce_key]
+
+    async def acall(
+        self,
+        request: Callable[[], Awaitable[_T]],
+        coalesce_key: Hashable | None = None,
+        operation: str = "request",
+        idempotent: bool = True,
+    ) -> _T:
+        if coalesce_key is None:
+            return await self._acall_with_retries(request, operation, idempotent)
+
+        loop = asyncio.get_running_loop()
+        key = (loop, coalesce_key)
+        task = self._ainflight.get(key)
+        if task is not None:
+            self.stats.coalesced += 1
+        else:
+            task = self._ainflight[key] = loop.create_task(
+                self._acall_with_retries(request, operation, idempotent)
+            )
+            task.add_done_callback(lambda _: self._ainflight.pop(key, None))
+        # One caller giving up must not cancel the request the others are waiting for.
+        return await asyncio.shield(task)
+
+    def _call_with_retries(self, request: Callable[[], _T], operation: str, idempotent: bool) -> _T:
+        attempt = 0
+        while True:
+            self._acquire()
+            started_at = time.perf_counter()
+            try:
+                result = request()
+            except Exception as error:
+                self._record(operation, started_at, error)
+                if (delay := self._retry_delay(error, attempt, idempotent)) is None:
+                    raise
+            else:
+                self._record(operation, started_at)
+                return result
+            time.sleep(delay)
+            attempt += 1
+
+    async def _acall_with_retries(
+        self, request: Callable[[], Awaitable[_T]], operation: str, idempotent: bool
+    ) -> _T:
+        attempt = 0
+        while True:
+            await self._aacquire()
+            started_at = time.perf_counter()
+            try:
+                result = await request()
+            except Exception as error:
+                self._record(operation, started_at, error)
+                if (delay := self._retry_delay(error, attempt, idempotent)) is None:
+                    raise
+            else:
+                self._record(operation, started_at)
+                return result
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _record(self, operation: str, started_at: float, error: Exception | None = None) -> None:
+        if self._request_duration is not None:
+            self._request_duration.observe(time.perf_counter() - started_at, operation=operation)
+        if error is not None and self._request_errors is not None:
+            error_name = (
+                str(error.status) if isinstance(error, HTTPResponseError) else type(error).__name__
+            )
+            self._request_errors.inc(operation=operation, error=error_name)
+
+    def _retry_delay(self, error: Exception, attempt: int, idempotent: bool) -> float | None:
+        if attempt >= self._max_retries:
+            return None
+        if isinstance(error, HTTPResponseError):
+            retryable = _RETRYABLE_STATUSES if idempotent else {_RATE_LIMITED_STATUS}
+            if error.status not in retryable:
+                return None
+            retry_after = _parse_retry_after(error.headers.get('retry-after'))
+        elif isinstance(error, RequestTimeoutError) and idempotent:
+            retry_after = None
+        else:
+            return None
+
+        with self._condition:
+            self.stats.retries += 1
+            if isinstance(error, HTTPResponseError) and error.status == _RATE_LIMITED_STATUS:
+                self.stats.rate_limited += 1
+            if retry_after is not None:
+                # Every session waits out the limit, not only the request which hit it.
+                self._bucket.pause(retry_after)
+                self._condition.notify_all()
+
+        if retry_after is not None:
+            return random.uniform(0, self._backoff_base)
+        return random.uniform(0, min(self._backoff_cap, self._backoff_base * 2**attempt))
+
+    def _acquire(self) -> None:
+        waiter = _ThreadWaiter()
+        self._enqueue(waiter)
+        waiter.wait()
+
+    async def _aacquire(self) -> None:
+        waiter = _AsyncWaiter(asyncio.get_running_loop())
+        self._enqueue(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            self._discard(waiter)
+            raise
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        session_id = current_session_id.get() or _DEFAULT_SESSION_ID
+        with self._condition:
+            self._queues.setdefault(session_id, deque()).append(waiter)
+            self.stats.queue_depth += 1
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.stats.queue_depth)
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch, name="notion-request-scheduler", daemon=True
+                )
+                self._dispatcher.start()
+            self._condition.notify_all()
+
+    def _discard(self, waiter: _Waiter) -> None:
+        with self._condition:
+            for session_id, queue in self._queues.items():
+                if waiter in queue:
+                    queue.remove(waiter)
+                    self.stats.queue_depth -= 1
+                    if not queue:
+                        del self._queues[session_id]
+                    return
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._condition:
+                if not self._queues:
+                    self._condition.wait()
+                    continue
+                if (delay := self._bucket.delay()) > 0:
+                    self._condition.wait(delay)
+                    continue
+
+                # The served session moves to the end of the queue order, round robin.
+                session_id, queue = self._queues.popitem(last=False)
+                waiter = queue.popleft()
+                if queue:
+                    self._queues[session_id] = queue
+
+                self._bucket.take()
+                wait_time = time.monotonic() - waiter.enqueued_at
+                self.stats.queue_depth -= 1
+                self.stats.requests += 1
+                self.stats.total_wait_time += wait_time
+                self.stats.max_wait_time = max(self.stats.max_wait_time, wait_time)
+
+            waiter.grant()
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+
+    def delay(self) -> float:
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self._rate
+
+    def take(self) -> None:
+        self._tokens -= 1
+
+    def pause(self, duration: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + duration)
+        self._tokens = 0.0
+        self._updated_at = self._paused_until
+
+
+class _Waiter(ABC):
+    def __init__(self) -> None:
+        self.enqueued_at = time.monotonic()
+
+    @abstractmethod
+    def grant(self) -> None:
+        pass
+
+
+class _ThreadWaiter(_Waiter):
+    def __init__(self) -> None:
+        super().__init__()
+        self._event = threading.Event()
+
+    def wait(self) -> None:
+        self._event.wait()
+
+    def grant(self) -> None:
+        self._event.set()
+
+
+class _AsyncWaiter(_Waiter):
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        super().__init__()
+        self._loop = loop
+        self.future: asyncio.Future[None] = loop.create_future()
+
+    def grant(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._set_result)
+        except RuntimeError:
+            # The loop was closed while the request waited, nobody is left to resume.
+            pass
+
+    def _set_result(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
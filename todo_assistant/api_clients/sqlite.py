@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import csv
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Sequence, TypeVar
+from uuid import uuid4
+
+from todo_assistant.api_clients.base import BaseTaskAPIClient
+from todo_assistant.api_clients.notion import NotionDatabaseTaskAPIClient
+from todo_assistant.entities.task import (
+    CreateTaskRequest,
+    Task,
+    TaskOperationResult,
+    TaskPriority,
+    TaskStatus,
+)
+
+_Item = TypeVar('_Item')
+
+_COLUMNS = "id, title, priority, work_estimation, status"
+# Column names of a Notion CSV export mapped to task fields.
+_CSV_FIELDS = {
+    'name': 'title',
+    'title': 'title',
+    'priority': 'priority',
+    'status': 'status',
+    'work estimation': 'work_estimation',
+    'work_estimation': 'work_estimation',
+    'id': 'id',
+}
+
+
+class SQLiteTaskAPIClient(BaseTaskAPIClient):
+    """Task API client keeping the board in a local SQLite database.
+
+    Tasks are stored with the time of their last change, in the format of Notion's
+    `last_edited_time`, so the board loads and syncs like a Notion database. The database runs in
+    WAL mode with indexes on title, status, priority and `last_edited_time`. Boards are imported
+    from a JSON or CSV export with `bulk_load`, bulk operations run in a single transaction.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._create_schema()
+
+    def get_by_id(self, id: str) -> Task:
+        with self._lock:
+            return self._get(id)
+
+    def add(self, task_to_create: CreateTaskRequest) -> Task:
+        return _unwrap(self.add_many([task_to_create])[0])
+
+    def update(self, task: Task) -> Task:
+        return _unwrap(self.update_many([task])[0])
+
+    def delete(self, task_id: str) -> Task:
+        return _unwrap(self.delete_many([task_id])[0])
+
+    # Local calls take less than a millisecond, a hop to the default executor would cost more.
+    async def aget_by_id(self, id: str) -> Task:
+        return self.get_by_id(id)
+
+    async def aadd(self, task_to_create: CreateTaskRequest) -> Task:
+        return self.add(task_to_create)
+
+    async def aupdate(self, task: Task) -> Task:
+        return self.update(task)
+
+    async def adelete(self, task_id: str) -> Task:
+        return self.delete(task_id)
+
+    def get_many(self, ids: Sequence[str]) -> list[TaskOperationResult]:
+        with self._lock:
+            return [self._result(id, self._get, id) for id in ids]
+
+    def add_many(self, tasks_to_create: Sequence[CreateTaskRequest]) -> list[TaskOperationResult]:
+        edited_at = _now()
+        tasks = [
+            Task(id=str(uuid4()), **task.dict()).with_last_edited_time(edited_at)
+            for task in tasks_to_create
+        ]
+        with self._lock, self._connection:
+            self._write(tasks, edited_at)
+        return [TaskOperationResult(target=task.title, task=task) for task in tasks]
+
+    def update_many(self, tasks: Sequence[Task]) -> list[TaskOperationResult]:
+        edited_at = _now()
+
+        def update(task: Task) -> Task:
+            cursor = self._connection.execute(
+                "UPDATE tasks SET title = ?, priority = ?, work_estimation = ?, status = ?,"
+                " last_edited_time = ? WHERE id = ?",
+                (*_row(task)[1:], edited_at, task.id),
+            )
+            if cursor.rowcount == 0:
+                raise KeyError(task.id)
+            return task.with_last_edited_time(edited_at)
+
+        with self._lock, self._connection:
+            return [self._result(task.id, update, task) for task in tasks]
+
+    def delete_many(self, task_ids: Sequence[str]) -> list[TaskOperationResult]:
+        def delete(task_id: str) -> Task:
+            task = self._get(task_id)
+            self._connection.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            return task
+
+        with self._lock, self._connection:
+            return [self._result(task_id, delete, task_id) for task_id in task_ids]
+
+    async def aget_many(self, ids: Sequence[str]) -> list[TaskOperationResult]:
+        return self.get_many(ids)
+
+    async def aadd_many(
+        self, tasks_to_create: Sequence[CreateTaskRequest]
+    ) -> list[TaskOperationResult]:
+        return self.add_many(tasks_to_create)
+
+    async def aupdate_many(self, tasks: Sequence[Task]) -> list[TaskOperationResult]:
+        return self.update_many(tasks)
+
+    async def adelete_many(self, task_ids: Sequence[str]) -> list[TaskOperationResult]:
+        return self.delete_many(task_ids)
+
+    def find(
+        self,
+        title: str | None = None,
+        status: TaskStatus | None = None,
+        priority: TaskPriority | None = None,
+    ) -> list[Task]:
+        """Tasks matching all given properties, titles are compared case-insensitively."""
+        conditions = {
+            "title = ? COLLATE NOCASE": title,
+            "status = ?": status.value if status is not None else None,
+            "priority = ?": priority.value if priority is not None else None,
+        }
+        conditions = {condition: value for condition, value in conditions.items() if value}
+        where = " AND ".join(conditions) if conditions else "1"
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {_COLUMNS} FROM tasks WHERE {where} ORDER BY title",
+                tuple(conditions.values()),
+            ).fetchall()
+        return [_task(row) for row in rows]
+
+    def list_tasks(self, edited_since: str | None = None) -> list[tuple[Task, str]]:
+        """Tasks with their `last_edited_time`, all or those edited at or after `edited_since`."""
+        query = f"SELECT {_COLUMNS}, last_edited_time FROM tasks"
+        parameters: tuple[str, ...] = ()
+        if edited_since is not None:
+            query += " WHERE last_edited_time >= ?"
+            parameters = (edited_since,)
+        with self._lock:
+            rows = self._connection.execute(query, parameters).fetchall()
+        return [(_task(row[:-1]).with_last_edited_time(row[-1]), row[-1]) for row in rows]
+
+    def iter_task_pages(
+        self, page_size: int = 500, edited_since: str | None = None
+    ) -> Iterator[list[tuple[Task, str]]]:
+        """Tasks with their `last_edited_time` in lists of `page_size`, like a paginated query."""
+        tasks = self.list_tasks(edited_since=edited_since)
+        for start in range(0, len(tasks), page_size):
+            yield tasks[start : start + page_size]
+
+    def page_versions(self) -> dict[str, str]:
+        with self._lock:
+            return dict(self._connection.execute("SELECT id, last_edited_time FROM tasks"))
+
+    def bulk_load(self, path: str | Path) -> int:
+        """Import the tasks of a JSON or CSV export, replacing tasks with the same id.
+
+        JSON exports hold a list of tasks, of Notion pages, or a Notion query response with the
+        pages under `results`. CSV exports have a header row with the task fields or the property
+        names of the Notion board, tasks without an `id` column get a new one.
+        """
+        path = Path(path)
+        tasks = _read_csv(path) if path.suffix.lower() == '.csv' else _read_json(path)
+        with self._lock, self._connection:
+            self._write(tasks, _now(), replace=True)
+        return len(tasks)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _create_schema(self) -> None:
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS tasks (id TEXT PRIMARY KEY, title TEXT NOT NULL,"
+                " priority TEXT NOT NULL, work_estimation INTEGER NOT NULL, status TEXT NOT NULL,"
+                " last_edited_time TEXT NOT NULL)"
+            )
+            for column in ('title', 'status', 'priority', 'last_edited_time'):
+                collation = " COLLATE NOCASE" if column == 'title' else ""
+                self._connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS tasks_{column} ON tasks ({column}{collation})"
+                )
+
+    def _get(self, task_id: str) -> Task:
+        row = self._connection.execute(
+            f"SELECT {_COLUMNS}, last_edited_time FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(task_id)
+        return _task(row[:-1]).with_last_edited_time(row[-1])
+
+    def _write(self, tasks: Iterable[Task], edited_at: str, replace: bool = False) -> None:
+        self._connection.executemany(
+            f"INSERT {'OR REPLACE ' if replace else ''}INTO tasks ({_COLUMNS}, last_edited_time)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            [(*_row(task), edited_at) for task in tasks],
+        )
+
+    @staticmethod
+    def _result(
+        target: str, operation: Callable[[_Item], Task], item: _Item
+    ) -> TaskOperationResult:
+        try:
+            return TaskOperationResult(target=target, task=operation(item))
+        except KeyError as error:
+            return TaskOperationResult(target=target, error=f"Task {error} not found")
+
+
+def _unwrap(result: TaskOperationResult) -> Task:
+    if result.task is None:
+        raise KeyError(result.target)
+    return result.task
+
+
+def _row(task: Task) -> tuple[str, str, str, int, str]:
+    return task.id, task.title, task.priority.value, task.work_estimation, task.status.value
+
+
+def _task(row: Sequence[Any]) -> Task:
+    id, title, priority, work_estimation, status = row
+    return Task(
+        id=id,
+        title=title,
+        priority=TaskPriority(priority),
+        work_estimation=work_estimation,
+        status=TaskStatus(status),
+    )
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='microseconds').replace('+00:00', 'Z')
+
+
+def _read_json(path: Path) -> list[Task]:
+    data = json.loads(path.read_text(encoding='utf-8'))
+    items = data['results'] if isinstance(data, dict) else data
+    return [
+        NotionDatabaseTaskAPIClient.task_from_page(item) if 'properties' in item else _parse(item)
+        for item in items
+    ]
+
+
+def _read_csv(path: Path) -> list[Task]:
+    with path.open(newline='', encoding='utf-8-sig') as file:
+        return [
+            _parse(
+                {
+                    _CSV_FIELDS[column.strip().lower()]: value
+                    for column, value in row.items()
+                    if column is not None and column.strip().lower() in _CSV_FIELDS
+                }
+            )
+            for row in csv.DictReader(file)
+        ]
+
+
+def _parse(item: dict[str, Any]) -> Task:
+    return Task.parse_obj({**item, 'id': item.get('id') or str(uuid4())})
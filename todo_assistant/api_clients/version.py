@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from typing import Mapping
+from uuid import uuid4
+
+
+class BoardVersion:
+    """Version of the board contents, changed by every mutation made through the API clients.
+
+    The version starts from a fingerprint of the page versions of the board, set by `reset` when
+    the board is loaded, so identical boards get identical versions across restarts. Until then it
+    starts from a random fingerprint matching nothing stored before.
+    """
+
+    def __init__(self) -> None:
+        self._fingerprint = uuid4().hex
+        self._mutations = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> str:
+        with self._lock:
+            return f"{self._fingerprint}:{self._mutations}"
+
+    def bump(self) -> None:
+        with self._lock:
+            self._mutations += 1
+
+    def reset(self, page_versions: Mapping[str, str | None]) -> None:
+        fingerprint = hashlib.sha256(
+            json.dumps(sorted(page_versions.items())).encode('utf-8')
+        ).hexdigest()
+        with self._lock:
+            self._fingerprint = fingerprint
+            self._mutations = 0
@@ -1,29 +1,44 @@
 from __future__ import annotations
 
-from typing import Any
-from uuid import uuid4
+import logging
+from typing import Any, Sequence
+from uuid import UUID, uuid4
 
-from langchain_community.chat_message_histories import ChatMessageHistory
+from langchain_core.callbacks import AsyncCallbackHandler, BaseCallbackHandler
 from langchain_core.chat_history import BaseChatMessageHistory
-from langchain_core.messages import AIMessage, HumanMessage
-from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import Runnable
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langsmith import traceable
 
+from todo_assistant.api_clients.scheduler import current_session_id
 from todo_assistant.assistant.callbacks import (
     BaseAssistantResponseCallback,
     StdOutAssistantResponseCallback,
 )
-from todo_assistant.assistant.response import TODOAssistantResponse
+from todo_assistant.assistant.history import TokenCounter
+from todo_assistant.assistant.response import TODOAssistantResponse, TurnUsage
+from todo_assistant.assistant.sessions import BaseSessionStore, LRUSessionStore
 from todo_assistant.prompts import STOP_INDICATOR, TODO_ASSISTANT_INTRODUCTION_MESSAGE
 
 _TODO_ASSISTANT_LLM_NAME = "TODOAssistant_llm"
 _TODO_ASSISTANT_AGENT_NAME = "TODOAssistant_agent"
 _TODO_ASSISTANT_NAME = "TODOAssistant"
 
+logger = logging.getLogger(__name__)
+
 
 class TODOAssistant:
-    def __init__(self, agent: Runnable, max_steps: int = 10, session_id: str | None = None) -> None:
+    def __init__(
+        self,
+        agent: Runnable,
+        max_steps: int = 10,
+        session_id: str | None = None,
+        session_store: BaseSessionStore | None = None,
+        token_counter: TokenCounter | None = None,
+        callbacks: Sequence[BaseCallbackHandler] = (),
+    ) -> None:
         agent_with_history = (
             self._insert_human_message
             | agent.with_config({"run_name": _TODO_ASSISTANT_AGENT_NAME})
@@ -40,7 +55,10 @@ class TODOAssistant:
             output_messages_key="messages",
         ).with_config({"configurable": {"session_id": self._session_id}})
         self._max_steps = max_steps
-        self._conversation_history_store: dict[str, ChatMessageHistory] = {}
+        self._session_store = session_store or LRUSessionStore()
+        self._token_counter = token_counter
+        self._callbacks = list(callbacks)
+        self.last_turn_usage: TurnUsage | None = None
 
     @traceable(
         run_type="chain",
@@ -54,7 +72,16 @@ class TODOAssistant:
         name="Step",
     )
     def step(self, human_input: str) -> TODOAssistantResponse:
-        response = self._agent.invoke({"input": human_input})
+        usage_handler = self._create_usage_handler()
+        session_token = current_session_id.set(self._session_id)
+        try:
+            response = self._agent.invoke(
+                {"input": human_input},
+                config={"callbacks": [*self._callbacks, *_handlers(usage_handler)]},
+            )
+        finally:
+            current_session_id.reset(session_token)
+        self._record_usage(usage_handler)
         return self._handle_raw_response(response)
 
     @traceable(
@@ -78,34 +105,52 @@ class TODOAssistant:
         if new_token_callback is None:
             new_token_callback = StdOutAssistantResponseCallback()
 
-        async for event in self._agent.astream_events(
-            {"input": human_input},
-            version="v1",
-        ):
-            name = event["name"]
-            kind = event["event"]
-
-            if kind == "on_chain_end" and name == _TODO_ASSISTANT_NAME:
-                if final_output := event['data']['output']:
-                    response = self._handle_raw_response(final_output)
-                    new_token_callback.on_response(response)
-                    return response
-            if kind == "on_chat_model_stream" and name == _TODO_ASSISTANT_LLM_NAME:
-                content = event["data"]["chunk"]
-                if content and content != STOP_INDICATOR:
-                    new_token_callback.on_stream_new_token(content)
-            if kind == "on_chat_model_end" and name == _TODO_ASSISTANT_LLM_NAME:
+        # Tokens are forwarded by a callback handler, `astream_events` would rebuild the whole run
+        # log on every event which dominates the cost of a step with many concurrent sessions.
+        streaming_handler = _AssistantStreamingCallbackHandler(new_token_callback)
+        usage_handler = self._create_usage_handler()
+        session_token = current_session_id.set(self._session_id)
+        try:
+            final_output = await self._agent.ainvoke(
+                {"input": human_input},
+                config={
+                    "callbacks": [streaming_handler, *self._callbacks, *_handlers(usage_handler)]
+                },
+            )
+        finally:
+            current_session_id.reset(session_token)
+        self._record_usage(usage_handler)
+
+        if final_output:
+            response = self._handle_raw_response(final_output)
+            if not streaming_handler.streamed:
+                # Responses of the fast path are not generated by the LLM, nothing was streamed.
+                new_token_callback.on_stream_new_token(response.content)
                 new_token_callback.on_stream_finish()
-
-        # No output, create final response
-        response = TODOAssistantResponse.create_final()
+        else:
+            # No output, create final response
+            response = TODOAssistantResponse.create_final()
         new_token_callback.on_response(response)
         return response
 
     def get_session_history(self, session_id: str) -> BaseChatMessageHistory:
-        if session_id not in self._conversation_history_store:
-            self._conversation_history_store[session_id] = ChatMessageHistory()
-        return self._conversation_history_store[session_id]
+        return self._session_store.get(session_id)
+
+    def _create_usage_handler(self) -> _PromptTokenCallbackHandler | None:
+        if self._token_counter is None:
+            return None
+        return _PromptTokenCallbackHandler(self._token_counter)
+
+    def _record_usage(self, usage_handler: _PromptTokenCallbackHandler | None) -> None:
+        if usage_handler is None:
+            return
+        history = self.get_session_history(self._session_id)
+        self.last_turn_usage = TurnUsage(
+            prompt_tokens=usage_handler.prompt_tokens,
+            llm_calls=usage_handler.llm_calls,
+            history_tokens=getattr(history, 'token_count', None),
+        )
+        logger.info("Session %s turn usage: %s", self._session_id, self.last_turn_usage)
 
     @staticmethod
     def _insert_human_message(input_message: dict[str, Any]) -> dict[str, Any]:
@@ -115,27 +160,24 @@ class TODOAssistant:
         return results
 
     @staticmethod
-    def _filter_response_messages(
-        result: dict[str, Any], config: RunnableConfig | None = None
-    ) -> dict[str, Any]:
+    def _filter_response_messages(result: dict[str, Any]) -> dict[str, Any]:
         if 'messages' in result:
             messages = result['messages']
         else:
             messages = result['__end__']['messages']
 
-        filtered_messages = []
-
-        for message in messages:
-            if isinstance(message, AIMessage | HumanMessage) and message.content:
-                filtered_messages.append(message)
-
-        if config:
-            message_history_len = 1 + len(config['configurable']['message_history'].messages)
-        else:
-            message_history_len = 0
-
-        messages = filtered_messages[message_history_len:]
-        return {'messages': messages}
+        # The response follows the human message of this turn, whatever the history replayed.
+        last_human_message_index = max(
+            (index for index, message in enumerate(messages) if isinstance(message, HumanMessage)),
+            default=-1,
+        )
+        return {
+            'messages': [
+                message
+                for message in messages[last_human_message_index + 1 :]
+                if isinstance(message, AIMessage) and message.content
+            ]
+        }
 
     @staticmethod
     def _handle_raw_response(response: dict[str, Any]) -> TODOAssistantResponse:
@@ -155,3 +197,59 @@ class TODOAssistant:
             raise ValueError("No message from TODOAssistant found")
         else:
             raise ValueError("Expected exactly one message from TODOAssistant")
+
+
+class _AssistantStreamingCallbackHandler(AsyncCallbackHandler):
+    """Forwards tokens of the TODOAssistant LLM runs to the response callback."""
+
+    def __init__(self, response_callback: BaseAssistantResponseCallback) -> None:
+        self._response_callback = response_callback
+        self._streamed_run_ids: set[UUID] = set()
+        self.streamed = False
+
+    async def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        *,
+        run_id: UUID,
+        name: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        if name == _TODO_ASSISTANT_LLM_NAME:
+            self._streamed_run_ids.add(run_id)
+            self.streamed = True
+
+    async def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        if run_id in self._streamed_run_ids and token and token != STOP_INDICATOR:
+            self._response_callback.on_stream_new_token(token)
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        if run_id in self._streamed_run_ids:
+            self._streamed_run_ids.discard(run_id)
+            self._response_callback.on_stream_finish()
+
+
+class _PromptTokenCallbackHandler(BaseCallbackHandler):
+    """Counts prompt tokens sent to the LLMs during one turn."""
+
+    run_inline = True
+
+    def __init__(self, token_counter: TokenCounter) -> None:
+        self._token_counter = token_counter
+        self.prompt_tokens = 0
+        self.llm_calls = 0
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        **kwargs: Any,
+    ) -> None:
+        for prompt in messages:
+            self.llm_calls += 1
+            self.prompt_tokens += self._token_counter.count_messages(prompt)
+
+
+def _handlers(*handlers: BaseCallbackHandler | None) -> list[BaseCallbackHandler]:
+    return [handler for handler in handlers if handler is not None]
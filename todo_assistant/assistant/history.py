@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import functools
+import logging
+import threading
+from typing import Sequence
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, SystemMessage, get_buffer_string
+
+from todo_assistant.prompts import HISTORY_SUMMARY_PROMPT
+
+logger = logging.getLogger(__name__)
+
+# Tokens OpenAI chat models spend on the role and separators of every message.
+_MESSAGE_OVERHEAD_TOKENS = 4
+_CHARACTERS_PER_TOKEN = 4
+_DEFAULT_CONTEXT_WINDOW = 4096
+_CONTEXT_WINDOWS = {
+    'gpt-3.5-turbo': 16385,
+    'gpt-3.5-turbo-16k': 16385,
+    'gpt-3.5-turbo-1106': 16385,
+    'gpt-3.5-turbo-0125': 16385,
+    'gpt-4': 8192,
+    'gpt-4-32k': 32768,
+    'gpt-4-1106-preview': 128000,
+    'gpt-4-0125-preview': 128000,
+    'gpt-4-turbo': 128000,
+    'gpt-4o': 128000,
+}
+_MIN_HISTORY_TOKEN_BUDGET = 1000
+_MAX_HISTORY_TOKEN_BUDGET = 4000
+_SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def history_token_budget(model_name: str) -> int:
+    """Share of the context window of `model_name` given to the conversation history."""
+    model_names = sorted(_CONTEXT_WINDOWS, key=len, reverse=True)
+    context_window = next(
+        (_CONTEXT_WINDOWS[name] for name in model_names if model_name.startswith(name)),
+        _DEFAULT_CONTEXT_WINDOW,
+    )
+    return min(max(context_window // 8, _MIN_HISTORY_TOKEN_BUDGET), _MAX_HISTORY_TOKEN_BUDGET)
+
+
+class TokenCounter:
+    """Counts prompt tokens with the tokenizer of the model, estimating when it's unavailable."""
+
+    def __init__(self, model_name: str):
+        self._model_name = model_name
+
+    def count_text(self, text: str) -> int:
+        if (encoding := _load_encoding(self._model_name)) is None:
+            return len(text) // _CHARACTERS_PER_TOKEN + 1
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def count_messages(self, messages: Sequence[BaseMessage]) -> int:
+        tokens = 0
+        for message in messages:
+            tokens += _MESSAGE_OVERHEAD_TOKENS + self.count_text(str(message.content))
+            if function_call := message.additional_kwargs.get('function_call'):
+                tokens += self.count_text(function_call.get('arguments', ''))
+        return tokens
+
+
+@functools.lru_cache(maxsize=None)
+def _load_encoding(model_name: str):  # type: ignore[no-untyped-def]
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as error:
+        logger.warning("No tokenizer for %s, estimating token counts: %r", model_name, error)
+        return None
+
+
+class TokenBudgetedChatMessageHistory(BaseChatMessageHistory):
+    """Chat history bounded by a token budget.
+
+    Recent messages are kept verbatim. Once they exceed `max_tokens`, the oldest turns are folded
+    by the LLM into a running summary, which is updated incrementally and replaces them in
+    `messages` as a system message. Folding runs in the background, so a turn never waits for a
+    summary, the folded messages stay in the history until their summary is ready.
+    """
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        token_counter: TokenCounter,
+        max_tokens: int,
+        min_recent_messages: int = 4,
+    ):
+        self._llm = llm
+        self._token_counter = token_counter
+        self._max_tokens = max_tokens
+        self._min_recent_messages = min_recent_messages
+        self._messages: list[tuple[BaseMessage, int]] = []
+        self._summary = ''
+        self._summary_tokens = 0
+        self._folded_message_count = 0
+        self._folding: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def messages(self) -> list[BaseMessage]:  # type: ignore[override]
+        with self._lock:
+            summary = (
+                [SystemMessage(content=_SUMMARY_PREFIX + self._summary)] if self._summary else []
+            )
+            return summary + [message for message, _ in self._messages]
+
+    @property
+    def token_count(self) -> int:
+        with self._lock:
+            return self._summary_tokens + sum(tokens for _, tokens in self._messages)
+
+    def add_message(self, message: BaseMessage) -> None:
+        tokens = self._token_counter.count_messages([message])
+        with self._lock:
+            self._messages.append((message, tokens))
+            self._start_folding()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._messages = []
+            self._summary = ''
+            self._summary_tokens = 0
+            self._folded_message_count = 0
+
+    def snapshot(self) -> tuple[str, int]:
+        """Running summary and the number of messages folded into it."""
+        with self._lock:
+            return self._summary, self._folded_message_count
+
+    def restore(self, summary: str, folded_message_count: int, messages: list[BaseMessage]) -> None:
+        tokens = [self._token_counter.count_messages([message]) for message in messages]
+        with self._lock:
+            self._summary = summary
+            self._summary_tokens = (
+                self._token_counter.count_messages(
+                    [SystemMessage(content=_SUMMARY_PREFIX + summary)]
+                )
+                if summary
+                else 0
+            )
+            self._folded_message_count = folded_message_count
+            self._messages = list(zip(messages, tokens))
+            self._start_folding()
+
+    def _start_folding(self) -> None:
+        if self._folding is not None:
+            return
+        verbatim_tokens = sum(tokens for _, tokens in self._messages)
+        if self._summary_tokens + verbatim_tokens <= self._max_tokens:
+            return
+
+        # Older messages are folded until the verbatim ones take at most half of the budget, so
+        # the summary is not rewritten on every turn.
+        fold_count = 0
+        foldable_count = len(self._messages) - self._min_recent_messages
+        while fold_count < foldable_count and verbatim_tokens > self._max_tokens // 2:
+            verbatim_tokens -= self._messages[fold_count][1]
+            fold_count += 1
+        if fold_count == 0:
+            return
+
+        messages_to_fold = [message for message, _ in self._messages[:fold_count]]
+        self._folding = threading.Thread(
+            target=self._fold,
+            args=(self._summary, messages_to_fold),
+            name="history-summary",
+            daemon=True,
+        )
+        self._folding.start()
+
+    def _fold(self, summary: str, messages: list[BaseMessage]) -> None:
+        try:
+            new_summary = self._llm.invoke(
+                HISTORY_SUMMARY_PROMPT.format(
+                    summary=summary or "(none)", new_lines=get_buffer_string(messages)
+                )
+            ).content
+        except Exception:
+            logger.warning("Summarizing conversation history failed", exc_info=True)
+            with self._lock:
+                self._folding = None
+            return
+
+        summary_tokens = self._token_counter.count_messages(
+            [SystemMessage(content=_SUMMARY_PREFIX + str(new_summary))]
+        )
+        with self._lock:
+            # Messages are only appended while folding, the folded ones are still the oldest.
+            if self._messages[: len(messages)] and all(
+                message is folded for (message, _), folded in zip(self._messages, messages)
+            ):
+                del self._messages[: len(messages)]
+                self._summary = str(new_summary).strip()
+                self._summary_tokens = summary_tokens
+                self._folded_message_count += len(messages)
+            self._folding = None
+            self._start_folding()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from langchain_core.load import Serializable
+from pydantic import BaseModel
 
 _FINAL_MESSAGE = "Assistant decided to end conversation"
 
@@ -15,3 +16,9 @@ class TODOAssistantResponse(Serializable):
             content=content or _FINAL_MESSAGE,
             is_final_response=True,
         )
+
+
+class TurnUsage(BaseModel):
+    prompt_tokens: int
+    llm_calls: int
+    history_tokens: int | None = None
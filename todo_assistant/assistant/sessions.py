@@ -0,0 +1,393 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from pydantic import BaseModel
+
+from todo_assistant.assistant.history import TokenBudgetedChatMessageHistory
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStoreStats(BaseModel):
+    hits: int = 0
+    created: int = 0
+    loaded: int = 0
+    evicted: int = 0
+    expired: int = 0
+    flushes: int = 0
+    flushed_messages: int = 0
+    pruned: int = 0
+    active_sessions: int = 0
+
+
+class BaseSessionStore(ABC):
+    @abstractmethod
+    def get(self, session_id: str) -> BaseChatMessageHistory:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+class StoredSession(NamedTuple):
+    summary: str
+    folded_message_count: int
+    messages: list[BaseMessage]
+    message_count: int
+
+
+class SQLiteSessionBackend:
+    """Persists session messages in SQLite.
+
+    Added messages are buffered and written in batches, by a background flusher every
+    `flush_interval` seconds or as soon as `batch_size` messages are pending. Every write records
+    the time of the last activity of its session, sessions idle for longer than `idle_ttl` seconds
+    are deleted by the flusher once per `prune_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 1.0,
+        batch_size: int = 500,
+        idle_ttl: float | None = None,
+        prune_interval: float = 600.0,
+    ):
+        self._connection = self._connect(path)
+        self._flush_interval = flush_interval
+        self._batch_size = batch_size
+        self._idle_ttl = idle_ttl
+        self._prune_interval = prune_interval
+        # Sessions stored before the first prune are idle since the backend started at the latest.
+        self._pruned_at = time.monotonic()
+        self._pending_messages: list[tuple[str, int, str]] = []
+        self._pending_snapshots: dict[str, tuple[str, int]] = {}
+        self._lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+        self.stats = SessionStoreStats()
+
+    def load(self, session_id: str) -> StoredSession:
+        # Pending writes are flushed first, a session can be reloaded right after its eviction.
+        self.flush()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT summary, folded_message_count FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            summary, folded_message_count = row if row else ('', 0)
+            rows = self._connection.execute(
+                "SELECT seq, message FROM messages WHERE session_id = ? ORDER BY seq",
+                (session_id,),
+            ).fetchall()
+
+        messages = messages_from_dict(
+            [json.loads(message) for seq, message in rows if seq >= folded_message_count]
+        )
+        return StoredSession(
+            summary=summary,
+            folded_message_count=folded_message_count,
+            messages=messages,
+            message_count=max(folded_message_count, rows[-1][0] + 1 if rows else 0),
+        )
+
+    def append(self, session_id: str, seq: int, message: BaseMessage) -> None:
+        with self._lock:
+            self._pending_messages.append((session_id, seq, json.dumps(message_to_dict(message))))
+            if len(self._pending_messages) >= self._batch_size:
+                self._flush_requested.set()
+
+    def save_snapshot(self, session_id: str, summary: str, folded_message_count: int) -> None:
+        with self._lock:
+            self._pending_snapshots[session_id] = (summary, folded_message_count)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._pending_messages = [
+                pending for pending in self._pending_messages if pending[0] != session_id
+            ]
+            self._pending_snapshots.pop(session_id, None)
+            with self._connection:
+                for table in ('messages', 'sessions', 'session_activity'):
+                    self._connection.execute(
+                        f"DELETE FROM {table} WHERE session_id = ?", (session_id,)
+                    )
+
+    def flush(self) -> None:
+        with self._lock:
+            messages, self._pending_messages = self._pending_messages, []
+            snapshots, self._pending_snapshots = self._pending_snapshots, {}
+            if not messages and not snapshots:
+                return
+
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO messages (session_id, seq, message) VALUES (?, ?, ?)",
+                    messages,
+                )
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO sessions (session_id, summary, folded_message_count)"
+                    " VALUES (?, ?, ?)",
+                    [(session_id, *snapshot) for session_id, snapshot in snapshots.items()],
+                )
+                # Messages folded into a summary are never loaded again.
+                self._connection.executemany(
+                    "DELETE FROM messages WHERE session_id = ? AND seq < ?",
+                    [(session_id, count) for session_id, (_, count) in snapshots.items()],
+                )
+                written_at = time.time()
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO session_activity (session_id, last_activity)"
+                    " VALUES (?, ?)",
+                    [
+                        (session_id, written_at)
+                        for session_id in {message[0] for message in messages} | snapshots.keys()
+                    ],
+                )
+            self.stats.flushes += 1
+            self.stats.flushed_messages += len(messages)
+
+    def prune(self) -> int:
+        """Delete the sessions idle for longer than `idle_ttl`, returns their number."""
+        if self._idle_ttl is None:
+            return 0
+        # Pending writes are flushed first, they mark their sessions as active.
+        self.flush()
+        cutoff = time.time() - self._idle_ttl
+        with self._lock, self._connection:
+            session_ids = [
+                session_id
+                for session_id, in self._connection.execute(
+                    "SELECT session_id FROM session_activity WHERE last_activity < ?", (cutoff,)
+                )
+            ]
+            for table in ('messages', 'sessions', 'session_activity'):
+                self._connection.executemany(
+                    f"DELETE FROM {table} WHERE session_id = ?",
+                    [(session_id,) for session_id in session_ids],
+                )
+            self.stats.pruned += len(session_ids)
+        return len(session_ids)
+
+    def close(self) -> None:
+        self._closed.set()
+        self._flush_requested.set()
+        self._flusher.join()
+        self.flush()
+        self._connection.close()
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.is_set():
+            self._flush_requested.wait(self._flush_interval)
+            self._flush_requested.clear()
+            try:
+                self.flush()
+                if time.monotonic() - self._pruned_at >= self._prune_interval:
+                    self._pruned_at = time.monotonic()
+                    if pruned := self.prune():
+                        logger.info("Pruned %d idle sessions", pruned)
+            except sqlite3.Error:
+                logger.warning("Flushing sessions failed", exc_info=True)
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS messages (session_id TEXT NOT NULL, seq INTEGER NOT NULL,"
+            " message TEXT NOT NULL, PRIMARY KEY (session_id, seq)) WITHOUT ROWID"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY,"
+            " summary TEXT NOT NULL, folded_message_count INTEGER NOT NULL)"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS session_activity (session_id TEXT PRIMARY KEY,"
+            " last_activity REAL NOT NULL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS session_activity_last_activity"
+            " ON session_activity (last_activity)"
+        )
+        # Sessions of databases written before activity was recorded count as active from now on.
+        with connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO session_activity (session_id, last_activity)"
+                " SELECT DISTINCT session_id, ? FROM messages",
+                (time.time(),),
+            )
+        return connection
+
+
+class _PersistentChatMessageHistory(BaseChatMessageHistory):
+    """Session history loading its messages on first access and writing new ones through."""
+
+    def __init__(
+        self, session_id: str, history: BaseChatMessageHistory, backend: SQLiteSessionBackend
+    ):
+        self._session_id = session_id
+        self._history = history
+        self._backend = backend
+        self._next_seq: int | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def history(self) -> BaseChatMessageHistory:
+        return self._history
+
+    @property
+    def messages(self) -> list[BaseMessage]:  # type: ignore[override]
+        self._ensure_loaded()
+        return self._history.messages
+
+    @property
+    def token_count(self) -> int | None:
+        return getattr(self._history, 'token_count', None)
+
+    def add_message(self, message: BaseMessage) -> None:
+        self._ensure_loaded()
+        with self._lock:
+            if self._next_seq is None:
+                raise RuntimeError(f"History of session {self._session_id} isn't loaded")
+            self._history.add_message(message)
+            self._backend.append(self._session_id, self._next_seq, message)
+            self._next_seq += 1
+        self.save_snapshot()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._history.clear()
+            self._backend.delete(self._session_id)
+            self._next_seq = 0
+
+    def save_snapshot(self) -> None:
+        if self._next_seq is not None and isinstance(
+            self._history, TokenBudgetedChatMessageHistory
+        ):
+            self._backend.save_snapshot(self._session_id, *self._history.snapshot())
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            if self._next_seq is not None:
+                return
+
+            stored = self._backend.load(self._session_id)
+            if isinstance(self._history, TokenBudgetedChatMessageHistory):
+                self._history.restore(stored.summary, stored.folded_message_count, stored.messages)
+            else:
+                self._history.add_messages(stored.messages)
+            self._next_seq = stored.message_count
+            if stored.message_count:
+                self._backend.stats.loaded += 1
+
+
+def _create_in_memory_history() -> BaseChatMessageHistory:
+    # Imported on first use, the chat histories package of LangChain community is slow to import.
+    from langchain_community.chat_message_histories.in_memory import ChatMessageHistory
+
+    return ChatMessageHistory()
+
+
+class _Session(NamedTuple):
+    history: BaseChatMessageHistory
+    last_access: float
+
+
+class LRUSessionStore(BaseSessionStore):
+    """Bounded in-memory tier of session histories, optionally backed by SQLite.
+
+    At most `max_sessions` histories are kept, least recently used ones are evicted first and any
+    idle for longer than `idle_ttl` seconds are expired. With a backend evicted sessions are
+    flushed to it and come back, lazily loaded, on their next access.
+    """
+
+    def __init__(
+        self,
+        history_factory: Callable[[], BaseChatMessageHistory] = _create_in_memory_history,
+        max_sessions: int = 1000,
+        idle_ttl: float | None = 3600.0,
+        backend: SQLiteSessionBackend | None = None,
+    ):
+        self._history_factory = history_factory
+        self._max_sessions = max_sessions
+        self._idle_ttl = idle_ttl
+        self._backend = backend
+        self._sessions: OrderedDict[str, _Session] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = SessionStoreStats()
+
+    @property
+    def stats(self) -> SessionStoreStats:
+        with self._lock:
+            stats = self._stats.copy(update={'active_sessions': len(self._sessions)})
+        if self._backend is not None:
+            stats.loaded = self._backend.stats.loaded
+            stats.flushes = self._backend.stats.flushes
+            stats.flushed_messages = self._backend.stats.flushed_messages
+            stats.pruned = self._backend.stats.pruned
+        return stats
+
+    def get(self, session_id: str) -> BaseChatMessageHistory:
+        now = time.monotonic()
+        with self._lock:
+            evicted = self._expire(now)
+            if (session := self._sessions.pop(session_id, None)) is not None:
+                self._stats.hits += 1
+                history = session.history
+            else:
+                self._stats.created += 1
+                history = self._create_history(session_id)
+
+            self._sessions[session_id] = _Session(history=history, last_access=now)
+            while len(self._sessions) > self._max_sessions:
+                evicted.append(self._sessions.popitem(last=False)[1].history)
+                self._stats.evicted += 1
+
+        for evicted_history in evicted:
+            if isinstance(evicted_history, _PersistentChatMessageHistory):
+                evicted_history.save_snapshot()
+        return history
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            if isinstance(session.history, _PersistentChatMessageHistory):
+                session.history.save_snapshot()
+        if self._backend is not None:
+            self._backend.close()
+
+    def _create_history(self, session_id: str) -> BaseChatMessageHistory:
+        if self._backend is None:
+            return self._history_factory()
+        return _PersistentChatMessageHistory(session_id, self._history_factory(), self._backend)
+
+    def _expire(self, now: float) -> list[BaseChatMessageHistory]:
+        expired: list[BaseChatMessageHistory] = []
+        if self._idle_ttl is None:
+            return expired
+        # Sessions are ordered by their last access, the idle ones are at the front.
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_access <= self._idle_ttl:
+                break
+            del self._sessions[session_id]
+            expired.append(session.history)
+            self._stats.expired += 1
+        return expired
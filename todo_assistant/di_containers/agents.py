@@ -1,5 +1,5 @@
 from dependency_injector import containers, providers
-from langchain_community.chat_models import ChatLiteLLM
+from langchain_core.language_models import BaseChatModel
 from langchain_core.runnables import Runnable
 from langgraph.pregel import Pregel
 
@@ -15,7 +15,7 @@ class AgentContainer(containers.DeclarativeContainer):
 class TODOAPIAssistantAgentContainer(AgentContainer):
     config = providers.Configuration()
     tools = providers.DependenciesContainer()
-    llm: providers.Dependency[ChatLiteLLM] = providers.Dependency()
+    llm: providers.Dependency[BaseChatModel] = providers.Dependency()
 
     agent = providers.Factory(
         TODOAPIAssistantAgent.from_llm_and_tools,
@@ -27,7 +27,7 @@ class TODOAPIAssistantAgentContainer(AgentContainer):
 
 class TODOAssistantAgentContainer(AgentContainer):
     config = providers.Configuration()
-    llm: providers.Dependency[ChatLiteLLM] = providers.Dependency()
+    llm: providers.Dependency[BaseChatModel] = providers.Dependency()
 
     agent = providers.Factory(
         TODOAssistantAgent.from_llm,
@@ -37,7 +37,7 @@ class TODOAssistantAgentContainer(AgentContainer):
 
 class TODOAPIAgentContainer(AgentContainer):
     config = providers.Configuration()
-    llm: providers.Dependency[ChatLiteLLM] = providers.Dependency()
+    llm: providers.Dependency[BaseChatModel] = providers.Dependency()
     todo_api_agent_graph = providers.Dependency(instance_of=Pregel)
 
     agent = providers.Factory(
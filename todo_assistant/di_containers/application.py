@@ -1,67 +1,284 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Sequence
+
 from dependency_injector import containers, providers
-from langchain_community.chat_models import ChatLiteLLM
-from langchain_community.document_loaders import NotionDBLoader
-from langchain_community.vectorstores.chroma import Chroma
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
 from langchain_core.vectorstores import VectorStore
-from langchain_openai import OpenAIEmbeddings
 from langgraph.pregel import Pregel
 
+from todo_assistant.api_clients.cached import CachedTaskAPIClient
+from todo_assistant.api_clients.change_feed import ChangeFeedSync
+from todo_assistant.api_clients.indexed import IndexedTaskAPIClient
 from todo_assistant.api_clients.notion import NotionDatabaseTaskAPIClient
+from todo_assistant.api_clients.scheduler import RequestScheduler
+from todo_assistant.api_clients.sqlite import SQLiteTaskAPIClient
+from todo_assistant.api_clients.version import BoardVersion
 from todo_assistant.assistant.assistant import TODOAssistant
+from todo_assistant.assistant.history import (
+    TokenBudgetedChatMessageHistory,
+    TokenCounter,
+    history_token_budget,
+)
+from todo_assistant.assistant.sessions import LRUSessionStore, SQLiteSessionBackend
 from todo_assistant.di_containers.agents import (
     TODOAPIAgentContainer,
     TODOAPIAssistantAgentContainer,
     TODOAssistantAgentContainer,
 )
+from todo_assistant.di_containers.features import feature_mode
 from todo_assistant.di_containers.graph_builders import (
     TODOApiAgentGraphBuilder,
     TODOAssistantGraphBuilderContainer,
 )
 from todo_assistant.di_containers.tools import Tools
+from todo_assistant.embeddings import CachedEmbeddings
 from todo_assistant.entities.task import Task
 from todo_assistant.graphs.base import BaseGraphBuilder
+from todo_assistant.llm_cache import CachedChatModel, LLMResponseCache
+from todo_assistant.metrics import MetricsCallbackHandler, MetricsRegistry
+from todo_assistant.server.pool import AssistantPool
+from todo_assistant.task_index import (
+    BM25Index,
+    EmbeddingPipeline,
+    EmbeddingProgress,
+    TaskIndex,
+    TaskNameIndex,
+    TaskTable,
+)
+
+logger = logging.getLogger(__name__)
+
+_TASK_INDEX_COLLECTION_NAME = "tasks"
+_TASK_INDEX_MANIFEST_NAME = "manifest.json"
+_FLAT_VECTOR_STORE_DIRECTORY = "flat"
+
+
+# LangChain community integrations and OpenAI are imported on first use, importing the container and
+# configuring it stays cheap.
+def _create_llm(**kwargs: Any) -> BaseChatModel:
+    from langchain_community.chat_models.litellm import ChatLiteLLM
+
+    return ChatLiteLLM(**kwargs)
+
+
+def _create_openai_embeddings(openai_api_key: str) -> Embeddings:
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(openai_api_key=openai_api_key)
 
 
-def _init_vectorstore(notion_api_key: str, notion_database_id: str) -> VectorStore:
-    loader = NotionDBLoader(
-        integration_token=notion_api_key,
-        database_id=notion_database_id,
+def _create_vectorstore(
+    vector_store: str, embeddings: Embeddings, persist_directory: Path | None
+) -> VectorStore:
+    if vector_store == "flat":
+        from todo_assistant.vectorstores import FlatVectorStore
+
+        # The task index saves the store at its checkpoints, not after every embedded batch.
+        return FlatVectorStore(
+            embedding=embeddings, persist_directory=persist_directory, autosave=False
+        )
+
+    from langchain_community.vectorstores.chroma import Chroma
+
+    return Chroma(
+        collection_name=_TASK_INDEX_COLLECTION_NAME,
+        embedding_function=embeddings,
+        persist_directory=str(persist_directory) if persist_directory else None,
     )
-    docs = loader.load()
 
-    texts = []
-    metadatas = []
-    for doc in docs:
-        task = Task.from_document(doc)
-        texts.append(task.as_text())
-        metadatas.append(doc.metadata)
 
-    if texts:
-        return Chroma.from_texts(texts=texts, metadatas=metadatas, embedding=OpenAIEmbeddings())
-    else:
-        return Chroma(embedding_function=OpenAIEmbeddings())
+class _Board(NamedTuple):
+    """Board as loaded at startup, `name` keeps the index of every board apart.
+
+    `iter_task_pages` streams the tasks with their `last_edited_time` page by page, so indexing
+    starts with the first page instead of after the whole board is downloaded.
+    """
+
+    name: str
+    iter_task_pages: Callable[..., Iterable[Sequence[tuple[Task, str | None]]]]
+
+
+def _load_notion_board(task_api_client: NotionDatabaseTaskAPIClient, database_id: str) -> _Board:
+    return _Board(name=database_id, iter_task_pages=task_api_client.iter_task_pages)
+
+
+def _load_sqlite_board(task_api_client: SQLiteTaskAPIClient, path: str) -> _Board:
+    return _Board(name=f"sqlite-{Path(path).stem}", iter_task_pages=task_api_client.iter_task_pages)
+
+
+def _init_notion_task_api_client(
+    api_key: str, database_id: str, scheduler: RequestScheduler
+) -> Iterator[NotionDatabaseTaskAPIClient]:
+    task_api_client = NotionDatabaseTaskAPIClient(
+        api_key=api_key, database_id=database_id, scheduler=scheduler
+    )
+    yield task_api_client
+    task_api_client.close()
+
+
+def _init_sqlite_task_api_client(
+    path: str, import_path: str | None
+) -> Iterator[SQLiteTaskAPIClient]:
+    task_api_client = SQLiteTaskAPIClient(path=path)
+    # Exports are imported into an empty database only, tasks exported without ids would
+    # otherwise be duplicated on every start.
+    if import_path is not None and not task_api_client.page_versions():
+        count = task_api_client.bulk_load(import_path)
+        logger.info("Imported %d tasks from %s", count, import_path)
+    yield task_api_client
+    task_api_client.close()
+
+
+def _log_embedding_progress(progress: EmbeddingProgress) -> None:
+    logger.info("Embedding tasks: %s", progress)
+
+
+def _init_task_index(
+    board: _Board,
+    index_directory: str | None,
+    embeddings: Embeddings,
+    embedding_pipeline: EmbeddingPipeline,
+    task_cache: CachedTaskAPIClient,
+    board_version: BoardVersion,
+    vector_store: str,
+) -> TaskIndex:
+    persist_directory = Path(index_directory) / board.name if index_directory else None
+    if persist_directory is not None and vector_store == "flat":
+        # Every store keeps its own manifest, switching stores never skips tasks it lacks.
+        persist_directory /= _FLAT_VECTOR_STORE_DIRECTORY
+    vectorstore = _create_vectorstore(vector_store, embeddings, persist_directory)
+    task_index = TaskIndex(
+        vectorstore=vectorstore,
+        manifest_path=persist_directory / _TASK_INDEX_MANIFEST_NAME if persist_directory else None,
+        embedding_pipeline=embedding_pipeline,
+    )
+    page_versions: dict[str, str | None] = {}
+
+    def iter_task_pages() -> Iterator[Sequence[tuple[Task, str | None]]]:
+        # Database query results carry all task properties, the board load fills the cache for free.
+        for page in board.iter_task_pages():
+            for task, last_edited_time in page:
+                task_cache.prime(task, last_edited_time=last_edited_time)
+                page_versions[task.id] = last_edited_time
+            yield page
+
+    summary = task_index.sync(iter_task_pages())
+    board_version.reset(page_versions)
+    logger.info("Task index synced: %s", summary)
+    if isinstance(embeddings, CachedEmbeddings):
+        logger.info("Embedding cache: %s", embeddings.stats)
+    return task_index
+
+
+def _get_vectorstore(task_index: TaskIndex) -> VectorStore:
+    return task_index.vectorstore
+
+
+def _get_task_name_index(task_index: TaskIndex) -> TaskNameIndex:
+    return task_index.name_index
+
+
+def _get_lexical_index(task_index: TaskIndex) -> BM25Index:
+    return task_index.lexical_index
+
+
+def _get_task_table(task_index: TaskIndex) -> TaskTable:
+    return task_index.task_table
 
 
 class ApiClients(containers.DeclarativeContainer):
     config = providers.Configuration()
+    metrics = providers.Dependency(instance_of=MetricsRegistry)
 
-    task_api_client = providers.Singleton(
-        NotionDatabaseTaskAPIClient,
+    request_scheduler = providers.Singleton(
+        RequestScheduler,
+        rate=config.NOTION_REQUESTS_PER_SECOND,
+        metrics=metrics,
+    )
+
+    notion_task_api_client = providers.Resource(
+        _init_notion_task_api_client,
         api_key=config.NOTION_API_KEY,
         database_id=config.NOTION_DATABASE_ID,
+        scheduler=request_scheduler,
     )
 
+    sqlite_task_api_client = providers.Resource(
+        _init_sqlite_task_api_client,
+        path=config.SQLITE_TASK_DB_PATH,
+        import_path=config.SQLITE_TASK_IMPORT_PATH,
+    )
 
-class Loaders(containers.DeclarativeContainer):
-    config = providers.Configuration()
+    backend_task_api_client = providers.Selector(
+        config.TASK_BACKEND,
+        notion=notion_task_api_client,
+        sqlite=sqlite_task_api_client,
+    )
 
-    db_loader = providers.Singleton(
-        NotionDBLoader,
-        integration_token=config.NOTION_API_KEY,
-        database_id=config.NOTION_DATABASE_ID,
+    board = providers.Selector(
+        config.TASK_BACKEND,
+        notion=providers.Singleton(
+            _load_notion_board,
+            task_api_client=notion_task_api_client,
+            database_id=config.NOTION_DATABASE_ID,
+        ),
+        sqlite=providers.Singleton(
+            _load_sqlite_board,
+            task_api_client=sqlite_task_api_client,
+            path=config.SQLITE_TASK_DB_PATH,
+        ),
+    )
+
+    board_version = providers.Singleton(BoardVersion)
+
+    task_api_client = providers.Singleton(
+        CachedTaskAPIClient,
+        task_api_client=backend_task_api_client,
+        ttl=config.TASK_CACHE_TTL,
+        board_version=board_version,
     )
 
 
+def _get_agent_llm(
+    llm: BaseChatModel, response_cache: LLMResponseCache | None, agent_name: str
+) -> BaseChatModel:
+    if response_cache is None:
+        return llm
+    return CachedChatModel(llm=llm, response_cache=response_cache, agent_name=agent_name)
+
+
+def _get_history_token_budget(model_name: str, token_budget: int | None) -> int:
+    return token_budget if token_budget is not None else history_token_budget(model_name)
+
+
+def _init_session_store(
+    history_factory: Callable[[], BaseChatMessageHistory],
+    max_sessions: int,
+    idle_ttl: float | None,
+    path: str | None,
+    flush_interval: float,
+    retention: float | None,
+) -> Iterator[LRUSessionStore]:
+    backend = (
+        SQLiteSessionBackend(path=path, flush_interval=flush_interval, idle_ttl=retention)
+        if path is not None
+        else None
+    )
+    session_store = LRUSessionStore(
+        history_factory=history_factory,
+        max_sessions=max_sessions,
+        idle_ttl=idle_ttl,
+        backend=backend,
+    )
+    yield session_store
+    session_store.close()
+
+
 def _build_graph(graph_builder: BaseGraphBuilder) -> Pregel:
     return graph_builder.build_graph()
 
@@ -69,38 +286,114 @@ def _build_graph(graph_builder: BaseGraphBuilder) -> Pregel:
 class Application(containers.DeclarativeContainer):
     config = providers.Configuration()
 
+    metrics = providers.Singleton(MetricsRegistry)
+
     api_clients = providers.Container(
         ApiClients,
         config=config,
+        metrics=metrics,
     )
 
     llm = providers.Singleton(
-        ChatLiteLLM,
+        _create_llm,
         model=config.MODEL_NAME,
         temperature=0,
         openai_api_key=config.OPENAI_API_KEY,
         streaming=True,
     )
 
-    vectorstore = providers.Factory(
-        _init_vectorstore,
-        notion_api_key=config.NOTION_API_KEY,
-        notion_database_id=config.NOTION_DATABASE_ID,
+    embeddings = providers.Singleton(
+        CachedEmbeddings,
+        embeddings=providers.Singleton(
+            _create_openai_embeddings, openai_api_key=config.OPENAI_API_KEY
+        ),
+        cache_path=config.EMBEDDING_CACHE_PATH,
+        max_memory_entries=config.EMBEDDING_CACHE_SIZE,
+        metrics=metrics,
+    )
+
+    embedding_pipeline = providers.Singleton(
+        EmbeddingPipeline,
+        embeddings=embeddings,
+        batch_size=config.EMBEDDING_BATCH_SIZE,
+        concurrency=config.EMBEDDING_CONCURRENCY,
+        max_retries=config.EMBEDDING_MAX_RETRIES,
+        progress_callback=_log_embedding_progress,
+    )
+
+    task_index = providers.Singleton(
+        _init_task_index,
+        board=api_clients.board,
+        index_directory=config.TASK_INDEX_DIRECTORY,
+        embeddings=embeddings,
+        embedding_pipeline=embedding_pipeline,
+        task_cache=api_clients.task_api_client,
+        board_version=api_clients.board_version,
+        vector_store=config.VECTOR_STORE,
+    )
+
+    vectorstore = providers.Factory(_get_vectorstore, task_index=task_index)
+    task_name_index = providers.Factory(_get_task_name_index, task_index=task_index)
+    lexical_index = providers.Factory(_get_lexical_index, task_index=task_index)
+    task_table = providers.Factory(_get_task_table, task_index=task_index)
+
+    task_api_client = providers.Singleton(
+        IndexedTaskAPIClient,
+        task_api_client=api_clients.task_api_client,
+        task_index=task_index,
+    )
+
+    # Polled by the server only, the CLI blocks its event loop while waiting for input.
+    change_feed_sync = providers.Selector(
+        providers.Callable(feature_mode, enabled=config.CHANGE_FEED_SYNC),
+        enabled=providers.Singleton(
+            ChangeFeedSync,
+            task_api_client=api_clients.backend_task_api_client,
+            task_index=task_index,
+            task_cache=api_clients.task_api_client,
+            board_version=api_clients.board_version,
+            min_interval=config.CHANGE_FEED_MIN_INTERVAL,
+            max_interval=config.CHANGE_FEED_MAX_INTERVAL,
+            reconcile_interval=config.CHANGE_FEED_RECONCILE_INTERVAL,
+            metrics=metrics,
+        ),
+        disabled=providers.Object(None),
+    )
+
+    llm_response_cache = providers.Selector(
+        providers.Callable(feature_mode, enabled=config.LLM_CACHE),
+        enabled=providers.Singleton(
+            LLMResponseCache,
+            board_version=api_clients.board_version,
+            cache_path=config.LLM_CACHE_PATH,
+            max_memory_entries=config.LLM_CACHE_SIZE,
+        ),
+        disabled=providers.Object(None),
     )
 
     tools = providers.Container(
         Tools,
         config=config,
-        llm=llm,
-        task_api_client=api_clients.task_api_client,
+        llm=providers.Singleton(
+            _get_agent_llm, llm=llm, response_cache=llm_response_cache, agent_name="TODORetrieval"
+        ),
+        task_api_client=task_api_client,
         vectorstore=vectorstore,
+        task_name_index=task_name_index,
+        lexical_index=lexical_index,
+        task_table=task_table,
     )
 
     todo_api_assistant_agent = providers.Container(
         TODOAPIAssistantAgentContainer,
         config=config,
         tools=tools,
-        llm=llm,
+        llm=providers.Singleton(
+            _get_agent_llm,
+            llm=llm,
+            response_cache=llm_response_cache,
+            agent_name="TODOAPIAssistant",
+        ),
     )
 
     todo_api_agent_graph_builder = providers.Container(
@@ -110,7 +403,7 @@ class Application(containers.DeclarativeContainer):
         todo_api_assistant_agent=todo_api_assistant_agent.agent,
     )
 
-    todo_api_agent_graph = providers.Factory(
+    todo_api_agent_graph = providers.Singleton(
         _build_graph,
         graph_builder=todo_api_agent_graph_builder.graph_builder,
     )
@@ -122,7 +415,9 @@ class Application(containers.DeclarativeContainer):
     todo_assistant_agent = providers.Container(
         TODOAssistantAgentContainer,
         config=config,
-        llm=llm,
+        llm=providers.Singleton(
+            _get_agent_llm, llm=llm, response_cache=llm_response_cache, agent_name="TODOAssistant"
+        ),
     )
 
     todo_assistant_graph_builder = providers.Container(
@@ -133,9 +428,53 @@ class Application(containers.DeclarativeContainer):
         todo_api_agent=todo_api_agent.agent,
     )
 
-    todo_assistant_graph = providers.Factory(
+    # One compiled graph serves every conversation, sessions only differ by their history.
+    todo_assistant_graph = providers.Singleton(
         _build_graph,
         graph_builder=todo_assistant_graph_builder.graph_builder,
     )
 
-    todo_assistant = providers.Factory(TODOAssistant, agent=todo_assistant_graph)
+    token_counter = providers.Singleton(TokenCounter, model_name=config.MODEL_NAME)
+
+    metrics_callback_handler = providers.Singleton(
+        MetricsCallbackHandler, metrics=metrics, token_counter=token_counter
+    )
+
+    conversation_history = providers.Factory(
+        TokenBudgetedChatMessageHistory,
+        llm=llm,
+        token_counter=token_counter,
+        max_tokens=providers.Callable(
+            _get_history_token_budget,
+            model_name=config.MODEL_NAME,
+            token_budget=config.HISTORY_TOKEN_BUDGET,
+        ),
+        min_recent_messages=config.HISTORY_MIN_RECENT_MESSAGES,
+    )
+
+    session_store = providers.Resource(
+        _init_session_store,
+        history_factory=conversation_history.provider,
+        max_sessions=config.SESSION_STORE_SIZE,
+        idle_ttl=config.SESSION_IDLE_TTL,
+        path=config.SESSION_STORE_PATH,
+        flush_interval=config.SESSION_FLUSH_INTERVAL,
+        retention=config.SESSION_STORE_RETENTION,
+    )
+
+    todo_assistant = providers.Factory(
+        TODOAssistant,
+        agent=todo_assistant_graph,
+        session_store=session_store,
+        token_counter=token_counter,
+        callbacks=providers.List(metrics_callback_handler),
+    )
+
+    assistant_pool = providers.Singleton(
+        AssistantPool,
+        assistant_factory=todo_assistant.provider,
+        max_concurrent_turns=config.SERVER_MAX_CONCURRENT_TURNS,
+        max_queued_turns=config.SERVER_MAX_QUEUED_TURNS,
+        max_session_turns=config.SERVER_MAX_SESSION_TURNS,
+        max_sessions=config.SESSION_STORE_SIZE,
+    )
@@ -0,0 +1,3 @@
+def feature_mode(enabled: bool) -> str:
+    """Key of a `providers.Selector` choosing between the enabled and disabled providers."""
+    return "enabled" if enabled else "disabled"
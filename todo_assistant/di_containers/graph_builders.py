@@ -1,7 +1,9 @@
 from dependency_injector import containers, providers
 from langchain_core.runnables import Runnable
 
+from todo_assistant.di_containers.features import feature_mode
 from todo_assistant.graphs.base import BaseGraphBuilder
+from todo_assistant.graphs.fast_path import FastPathRouter
 from todo_assistant.graphs.todo_api import TODOApiGraphBuilder
 from todo_assistant.graphs.todo_assistant import TODOAssistantGraphBuilder
 
@@ -31,9 +33,24 @@ class TODOAssistantGraphBuilderContainer(GraphBuilderContainer):
     todo_assistant_agent = providers.Dependency(instance_of=Runnable)  # type: ignore[type-abstract]
     todo_api_agent = providers.Dependency(instance_of=Runnable)  # type: ignore[type-abstract]
 
+    fast_path_router = providers.Selector(
+        providers.Callable(feature_mode, enabled=config.FAST_PATH),
+        enabled=providers.Singleton(
+            FastPathRouter,
+            add_task_tool=tools.add_task_tool,
+            update_task_tool=tools.update_task_tool,
+            delete_task_tool=tools.delete_task_tool,
+            task_name_index=tools.task_name_index,
+        ),
+        disabled=providers.Object(None),
+    )
+
     graph_builder = providers.Factory(
         TODOAssistantGraphBuilder,
         todo_assistant_agent=todo_assistant_agent,
         todo_api_agent=todo_api_agent,
         retrieval_tool=tools.retrieval_tool,
+        aggregate_tool=tools.aggregate_tool,
+        fast_path_router=fast_path_router,
+        max_parallel_tool_calls=config.MAX_PARALLEL_TOOL_CALLS,
     )
@@ -1,12 +1,17 @@
 from dependency_injector import containers, providers
-from langchain_community.chat_models import ChatLiteLLM
+from langchain_core.language_models import BaseChatModel
 from langchain_core.tools import BaseTool
 from langchain_core.vectorstores import VectorStore
 
 from todo_assistant.api_clients.base import BaseTaskAPIClient
+from todo_assistant.task_index import BM25Index, HybridTaskRetriever, TaskNameIndex, TaskTable
+from todo_assistant.tools.aggregate import TaskAggregateTool
 from todo_assistant.tools.api_calls.add import AddTaskTool
+from todo_assistant.tools.api_calls.add_many import AddTasksTool
 from todo_assistant.tools.api_calls.delete import DeleteTaskTool
+from todo_assistant.tools.api_calls.delete_many import DeleteTasksTool
 from todo_assistant.tools.api_calls.update import UpdateTaskTool
+from todo_assistant.tools.api_calls.update_many import UpdateTasksTool
 from todo_assistant.tools.retrieval import TODORetrievalTool
 from todo_assistant.tools.search_task_id_by_name import SearchTaskIDByNameTool
 
@@ -19,12 +24,14 @@ class Tools(containers.DeclarativeContainer):
     config = providers.Configuration()
     task_api_client: providers.Dependency[BaseTaskAPIClient] = providers.Dependency()
     vectorstore: providers.Dependency[VectorStore] = providers.Dependency()
-    llm: providers.Dependency[ChatLiteLLM] = providers.Dependency()
+    task_name_index: providers.Dependency[TaskNameIndex] = providers.Dependency()
+    lexical_index: providers.Dependency[BM25Index] = providers.Dependency()
+    task_table: providers.Dependency[TaskTable] = providers.Dependency()
+    llm: providers.Dependency[BaseChatModel] = providers.Dependency()
 
     add_task_tool = providers.Factory(
         AddTaskTool,
         task_api_client=task_api_client,
-        vectorstore=vectorstore,
     )
 
     update_task_tool = providers.Factory(
@@ -37,17 +44,55 @@ class Tools(containers.DeclarativeContainer):
         task_api_client=task_api_client,
     )
 
+    add_tasks_tool = providers.Factory(
+        AddTasksTool,
+        task_api_client=task_api_client,
+    )
+
+    update_tasks_tool = providers.Factory(
+        UpdateTasksTool,
+        task_api_client=task_api_client,
+        task_name_index=task_name_index,
+    )
+
+    delete_tasks_tool = providers.Factory(
+        DeleteTasksTool,
+        task_api_client=task_api_client,
+        task_name_index=task_name_index,
+    )
+
     search_task_id_by_name_tool = providers.Factory(
         SearchTaskIDByNameTool,
-        vectorstore=vectorstore,
+        task_name_index=task_name_index,
     )
 
     api_call_tools = providers.Factory(
-        _get_api_call_tools, tools=[add_task_tool, delete_task_tool, update_task_tool]
+        _get_api_call_tools,
+        tools=[
+            add_task_tool,
+            delete_task_tool,
+            update_task_tool,
+            add_tasks_tool,
+            delete_tasks_tool,
+            update_tasks_tool,
+        ],
+    )
+
+    aggregate_tool = providers.Factory(
+        TaskAggregateTool,
+        task_table=task_table,
+    )
+
+    retriever = providers.Factory(
+        HybridTaskRetriever,
+        lexical_index=lexical_index,
+        vectorstore=vectorstore,
+        k=config.RETRIEVAL_K,
+        mode=config.RETRIEVAL_MODE,
     )
 
     retrieval_tool = providers.Factory(
-        TODORetrievalTool.from_llm_and_vectorstore,
+        TODORetrievalTool.from_llm_and_retriever,
         llm=llm,
-        vectorstore=vectorstore,
+        retriever=retriever,
     )
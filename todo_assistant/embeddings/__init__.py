@@ -0,0 +1,3 @@
+from todo_assistant.embeddings.cache import CachedEmbeddings, EmbeddingCacheStats
+
+__all__ = ['CachedEmbeddings', 'EmbeddingCacheStats']
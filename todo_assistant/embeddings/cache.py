@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+from pydantic import BaseModel
+
+from todo_assistant.metrics.registry import MetricsRegistry
+
+
+class EmbeddingCacheStats(BaseModel):
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class CachedEmbeddings(Embeddings):
+    """Content addressed cache in front of an embedding model.
+
+    Vectors are keyed by the model name and a hash of the embedded text. Recently used vectors are
+    kept in a bounded in-memory LRU, all of them are persisted in an optional SQLite file, so the
+    same text is embedded only once across sessions, restarts and boards. Calls made to the
+    model are counted in the optional `metrics`.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str | None = None,
+        cache_path: str | None = None,
+        max_memory_entries: int = 10_000,
+        metrics: MetricsRegistry | None = None,
+    ):
+        self._embeddings = embeddings
+        self._model_name = model_name or getattr(embeddings, 'model', type(embeddings).__name__)
+        self._max_memory_entries = max_memory_entries
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = self._connect(cache_path) if cache_path else None
+        self.stats = EmbeddingCacheStats()
+        self._model_calls = (
+            metrics.counter("embedding_model_calls", "Calls to the embedding model.", ['method'])
+            if metrics is not None
+            else None
+        )
+        self._model_texts = (
+            metrics.counter("embedding_model_texts", "Texts embedded by the model.", ['method'])
+            if metrics is not None
+            else None
+        )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, cached = self._lookup(texts)
+        missing_texts = self._missing_texts(texts, keys, cached)
+        if missing_texts:
+            self._record_model_call('embed_documents', len(missing_texts))
+            vectors = self._embeddings.embed_documents(list(missing_texts.values()))
+            cached.update(self._store(missing_texts, vectors))
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        keys, cached = self._lookup([text])
+        if keys[0] not in cached:
+            self._record_model_call('embed_query', 1)
+            vector = self._embeddings.embed_query(text)
+            cached.update(self._store({keys[0]: text}, [vector]))
+        return cached[keys[0]]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, cached = self._lookup(texts)
+        missing_texts = self._missing_texts(texts, keys, cached)
+        if missing_texts:
+            self._record_model_call('embed_documents', len(missing_texts))
+            vectors = await self._embeddings.aembed_documents(list(missing_texts.values()))
+            cached.update(self._store(missing_texts, vectors))
+        return [cached[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        keys, cached = self._lookup([text])
+        if keys[0] not in cached:
+            self._record_model_call('embed_query', 1)
+            vector = await self._embeddings.aembed_query(text)
+            cached.update(self._store({keys[0]: text}, [vector]))
+        return cached[keys[0]]
+
+    def _record_model_call(self, method: str, texts: int) -> None:
+        if self._model_calls is not None and self._model_texts is not None:
+            self._model_calls.inc(method=method)
+            self._model_texts.inc(texts, method=method)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self._model_name}\0{text}".encode('utf-8')).hexdigest()
+
+    def _lookup(self, texts: list[str]) -> tuple[list[str], dict[str, list[float]]]:
+        keys = [self._key(text) for text in texts]
+        cached: dict[str, list[float]] = {}
+
+        with self._lock:
+            for key in keys:
+                if key in cached:
+                    continue
+                if (vector := self._memory.get(key)) is not None:
+                    self._memory.move_to_end(key)
+                    cached[key] = vector
+                    self.stats.memory_hits += 1
+
+            disk_keys = list({key for key in keys if key not in cached})
+            for key, vector in self._read_disk(disk_keys).items():
+                self._remember(key, vector)
+                cached[key] = vector
+                self.stats.disk_hits += 1
+
+            self.stats.misses += len({key for key in keys if key not in cached})
+
+        return keys, cached
+
+    @staticmethod
+    def _missing_texts(
+        texts: list[str], keys: list[str], cached: dict[str, list[float]]
+    ) -> dict[str, str]:
+        return {key: text for key, text in zip(keys, texts) if key not in cached}
+
+    def _store(self, texts: dict[str, str], vectors: list[list[float]]) -> dict[str, list[float]]:
+        stored = dict(zip(texts, vectors))
+        with self._lock:
+            for key, vector in stored.items():
+                self._remember(key, vector)
+            self._write_disk(stored)
+        return stored
+
+    def _remember(self, key: str, vector: list[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, keys: list[str]) -> dict[str, list[float]]:
+        if self._connection is None or not keys:
+            return {}
+
+        vectors = {}
+        # Chunked to stay below the SQLite host parameters limit.
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            rows = self._connection.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for key, blob in rows:
+                vectors[key] = array('d', blob).tolist()
+        return vectors
+
+    def _write_disk(self, vectors: dict[str, list[float]]) -> None:
+        if self._connection is None or not vectors:
+            return
+
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array('d', vector).tobytes()) for key, vector in vectors.items()],
+            )
+
+    @staticmethod
+    def _connect(cache_path: str) -> sqlite3.Connection:
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(cache_path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        return connection
@@ -4,7 +4,7 @@ from enum import Enum
 from typing import Any
 
 from langchain_core.documents import Document
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 
 class TaskStatus(Enum):
@@ -32,6 +32,17 @@ class Task(BaseModel):
     priority: TaskPriority
     work_estimation: int
     status: TaskStatus
+    # Version of the task in its backend, e.g. the `last_edited_time` of its Notion page.
+    _last_edited_time: str | None = PrivateAttr(default=None)
+
+    @property
+    def last_edited_time(self) -> str | None:
+        return self._last_edited_time
+
+    def with_last_edited_time(self, last_edited_time: str | None) -> Task:
+        task = self.copy()
+        task._last_edited_time = last_edited_time
+        return task
 
     @classmethod
     def from_document(cls, document: Document) -> Task:
@@ -58,3 +69,15 @@ class Task(BaseModel):
             'status': self.status.value,
             'priority': self.priority.value,
         }
+
+
+class TaskOperationResult(BaseModel):
+    """Outcome of a single item of a bulk operation, `target` is the task id or title."""
+
+    target: str
+    task: Task | None = None
+    error: str | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Generic, Optional, TypeVar
+from typing import Any, AsyncIterator, Generic, Optional, TypeVar
 
 from langchain_core.runnables import Runnable, RunnableConfig
 from langgraph.pregel import Pregel
@@ -20,6 +20,22 @@ class BaseNode(
         output: TRunnableOutput = self._runnable.invoke(self._build_input(input), config)
         return self._parse_output(state=input, output=output)
 
+    async def ainvoke(
+        self, input: TState, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> TOutput:
+        output: TRunnableOutput = await self._runnable.ainvoke(self._build_input(input), config)
+        return self._parse_output(state=input, output=output)
+
+    async def astream(
+        self, input: TState, config: Optional[RunnableConfig] = None, **kwargs: Optional[Any]
+    ) -> AsyncIterator[TOutput]:
+        # Node output is a state update, so the streamed runnable output is aggregated first.
+        final_output: Any = None
+        async for chunk in self._runnable.astream(self._build_input(input), config):
+            final_output = chunk if final_output is None else final_output + chunk
+
+        yield self._parse_output(state=input, output=final_output)
+
     @abstractmethod
     def _build_input(self, state: TState) -> TRunnableInput:
         pass
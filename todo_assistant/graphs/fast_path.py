@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+from typing import Any, Callable
+
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel
+
+from todo_assistant.entities.task import TaskPriority, TaskStatus
+from todo_assistant.task_index import TaskNameIndex
+
+_NAME = r"(?:the\s+)?(?:task\s+)?(?P<name>.+?)(?:\s+task)?"
+_STATUSES = {
+    'done': TaskStatus.DONE,
+    'complete': TaskStatus.DONE,
+    'completed': TaskStatus.DONE,
+    'finished': TaskStatus.DONE,
+    'in progress': TaskStatus.IN_PROGRESS,
+    'started': TaskStatus.IN_PROGRESS,
+    'not started': TaskStatus.NOT_STARTED,
+    'todo': TaskStatus.NOT_STARTED,
+    'to do': TaskStatus.NOT_STARTED,
+}
+_STATUS = "(?P<status>" + "|".join(sorted(map(re.escape, _STATUSES), key=len, reverse=True)) + ")"
+_PRIORITY = r"(?P<priority>low|medium|high)"
+_QUOTED_NAME = re.compile(r"\"[^\"]+\"|'[^']+'|“[^”]+”")
+# Unquoted names of new tasks are only trusted when short and naming nothing but the task, any
+# preposition, pronoun or date may belong to the request rather than to the name.
+_MAX_UNQUOTED_NAME_WORDS = 5
+_COMPOUND_NAME = re.compile(
+    r"\b(?:to|for|of|at|on|in|by|from|with|into|about|before|after|until|each|every|all|it|"
+    r"them|this|that|these|those|my|me|our|your|his|her|their|its|and|or|today|tomorrow|"
+    r"tonight|next|priority|estimation|due|status)\b|[,;:\"“”]",
+    re.I,
+)
+
+
+def _pattern(pattern: str) -> re.Pattern[str]:
+    return re.compile(rf"^\s*(?:please\s+)?{pattern}\s*[.!]?\s*$", re.IGNORECASE)
+
+
+_ADD_PREFIX = r"(?:add|create)\s+(?:a\s+)?(?:new\s+)?"
+_ADD_PATTERNS = [
+    _pattern(
+        rf"{_ADD_PREFIX}(?:task\s+)?(?:called\s+|named\s+)?(?P<name>{_QUOTED_NAME.pattern})"
+        r"(?:\s+to\s+(?:my\s+|the\s+)?(?:board|tasks|list))?"
+    ),
+    _pattern(rf"{_ADD_PREFIX}task\s+(?:called\s+|named\s+)?(?P<name>.+)"),
+]
+_DELETE_PATTERNS = [_pattern(rf"(?:delete|remove)\s+{_NAME}")]
+_STATUS_PATTERNS = [
+    _pattern(rf"(?:mark|set)\s+{_NAME}\s+(?:as\s+|to\s+)?{_STATUS}"),
+    _pattern(rf"(?:complete|finish)\s+{_NAME}"),
+    _pattern(rf"start\s+(?:working\s+on\s+)?{_NAME}"),
+]
+_PRIORITY_PATTERNS = [
+    _pattern(rf"set\s+(?:the\s+)?priority\s+of\s+{_NAME}\s+to\s+{_PRIORITY}"),
+    _pattern(rf"(?:mark|set)\s+{_NAME}\s+(?:as\s+|to\s+)?{_PRIORITY}\s+priority"),
+]
+
+
+class FastPathCommand(BaseModel):
+    tool_name: str
+    tool_input: dict[str, Any]
+    response: str
+
+
+class FastPathStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    fast_path_time: float = 0.0
+    llm_path_time: float = 0.0
+    llm_path_turns: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        turns = self.hits + self.misses
+        return self.hits / turns if turns else 0.0
+
+    @property
+    def estimated_time_saved(self) -> float:
+        """Time the matched commands would have taken on the LLM path, by its average latency."""
+        if not self.hits or not self.llm_path_turns:
+            return 0.0
+        return self.hits * self.llm_path_time / self.llm_path_turns - self.fast_path_time
+
+
+class FastPathRouter:
+    """Matches simple board commands on tasks known to the local name index.
+
+    Only inputs of a well known shape naming exactly one existing task (or a new one for adds) are
+    matched, anything else is left to the LLM path.
+    """
+
+    def __init__(
+        self,
+        add_task_tool: BaseTool,
+        update_task_tool: BaseTool,
+        delete_task_tool: BaseTool,
+        task_name_index: TaskNameIndex,
+    ):
+        self._add_task_tool = add_task_tool
+        self._update_task_tool = update_task_tool
+        self._delete_task_tool = delete_task_tool
+        self._task_name_index = task_name_index
+        self._lock = threading.Lock()
+        self.stats = FastPathStats()
+
+    @property
+    def tools(self) -> dict[str, BaseTool]:
+        return {
+            tool.name: tool
+            for tool in (self._add_task_tool, self._update_task_tool, self._delete_task_tool)
+        }
+
+    def match(self, human_input: str) -> FastPathCommand | None:
+        matchers: list[Callable[[str], FastPathCommand | None]] = [
+            self._match_add,
+            self._match_delete,
+            self._match_status,
+            self._match_priority,
+        ]
+        for matcher in matchers:
+            if command := matcher(human_input):
+                return command
+        return None
+
+    def record_hit(self, duration: float) -> None:
+        with self._lock:
+            self.stats.hits += 1
+            self.stats.fast_path_time += duration
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.stats.misses += 1
+
+    def record_llm_path(self, duration: float) -> None:
+        with self._lock:
+            self.stats.llm_path_turns += 1
+            self.stats.llm_path_time += duration
+
+    def _match_add(self, human_input: str) -> FastPathCommand | None:
+        if (match := _search(_ADD_PATTERNS, human_input)) is None:
+            return None
+        if _QUOTED_NAME.fullmatch(match['name']):
+            task_name = _strip_quotes(match['name'])
+        elif _is_simple_name(match['name']):
+            task_name = match['name'].strip()
+        else:
+            return None
+        return FastPathCommand(
+            tool_name=self._add_task_tool.name,
+            tool_input={'task_name': task_name, 'task_params': '{}'},
+            response=f"Added task \"{task_name}\" to the board.",
+        )
+
+    def _match_delete(self, human_input: str) -> FastPathCommand | None:
+        if (match := _search(_DELETE_PATTERNS, human_input)) is None:
+            return None
+        if (task := self._find_task(match['name'])) is None:
+            return None
+        task_id, task_name = task
+        return FastPathCommand(
+            tool_name=self._delete_task_tool.name,
+            tool_input={'task_id': task_id},
+            response=f"Deleted task \"{task_name}\".",
+        )
+
+    def _match_status(self, human_input: str) -> FastPathCommand | None:
+        if (match := _search(_STATUS_PATTERNS, human_input)) is None:
+            return None
+        if (task := self._find_task(match['name'])) is None:
+            return None
+        if status_name := match.groupdict().get('status'):
+            status = _STATUSES[status_name.lower()]
+        elif human_input.lstrip().lower().startswith('start'):
+            status = TaskStatus.IN_PROGRESS
+        else:
+            status = TaskStatus.DONE
+        return self._update_command(*task, param_name='status', param_value=status.value)
+
+    def _match_priority(self, human_input: str) -> FastPathCommand | None:
+        if (match := _search(_PRIORITY_PATTERNS, human_input)) is None:
+            return None
+        if (task := self._find_task(match['name'])) is None:
+            return None
+        priority = TaskPriority(match['priority'].capitalize())
+        return self._update_command(*task, param_name='priority', param_value=priority.value)
+
+    def _update_command(
+        self, task_id: str, task_name: str, param_name: str, param_value: str
+    ) -> FastPathCommand:
+        return FastPathCommand(
+            tool_name=self._update_task_tool.name,
+            tool_input={'task_id': task_id, 'task_params': json.dumps({param_name: param_value})},
+            response=f"Set {param_name} of task \"{task_name}\" to {param_value}.",
+        )
+
+    def _find_task(self, name: str) -> tuple[str, str] | None:
+        exact_matches = [
+            match for match in self._task_name_index.search(name, limit=2) if match.score == 1.0
+        ]
+        if len(exact_matches) != 1:
+            return None
+        return exact_matches[0].task_id, exact_matches[0].name
+
+
+def _search(patterns: list[re.Pattern[str]], human_input: str) -> re.Match[str] | None:
+    for pattern in patterns:
+        if match := pattern.match(human_input):
+            return match
+    return None
+
+
+def _is_simple_name(name: str) -> bool:
+    return len(name.split()) <= _MAX_UNQUOTED_NAME_WORDS and not _COMPOUND_NAME.search(name)
+
+
+def _strip_quotes(name: str) -> str:
+    return name.strip().strip("\"'“”").strip()
@@ -1,27 +1,58 @@
+import asyncio
 import json
+import logging
 import operator
+import time
 from abc import ABC, abstractmethod
-from typing import Annotated, Any, Generic, Sequence, TypedDict, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Annotated, Any, Generic, Optional, Sequence, TypedDict, TypeVar
 
-from langchain_core.messages import AIMessage, BaseMessage, FunctionMessage
+from langchain_core.messages import AIMessage, BaseMessage, FunctionMessage, HumanMessage
+from langchain_core.runnables import Runnable, RunnableConfig
 from langgraph.graph import END, StateGraph
 from langgraph.pregel import Pregel
 
 from todo_assistant.agents.base import BaseAgent
 from todo_assistant.agents.todo_api import TODOAPIAgentInput, TODOAPIAgentOutput
 from todo_assistant.agents.todo_assistant import (
+    PARALLEL_TOOL_CALLS,
+    TASK_AGGREGATE,
     TODOAssistantAgent,
     TODOAssistantAgentInput,
     TODOAssistantAgentOutput,
+    TODOAssistantToolCall,
 )
 from todo_assistant.graphs.base import BaseGraphBuilder, BaseNode
+from todo_assistant.graphs.fast_path import FastPathCommand, FastPathRouter
+from todo_assistant.tools.aggregate import TaskAggregateTool
 from todo_assistant.tools.retrieval import TODORetrievalTool
 
+logger = logging.getLogger(__name__)
+
+_TODO_API_CALL = "todo_api_call"
+_RESPOND = "RESPOND"
+_TODO_ASSISTANT_NODE = "TodoAssistant"
+
 
 class TODOAssistantGraphState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], operator.add]
     next: str
     input: str | None
+    calls: list[TODOAssistantToolCall]
+    started_at: float | None
+
+
+def _tool_call_message(tool: str, tool_input: str | None) -> AIMessage:
+    return AIMessage(
+        content='',
+        additional_kwargs={
+            'function_call': {
+                'arguments': json.dumps({'tool_input': tool_input, 'tool': tool}),
+                'name': 'tool_call',
+            }
+        },
+    )
 
 
 TRunnableInput = TypeVar('TRunnableInput')
@@ -43,17 +74,7 @@ class _BaseTODOAssistantToolNode(
         content = self._parse_content(output)
         return {
             'messages': [
-                AIMessage(
-                    content='',
-                    additional_kwargs={
-                        'function_call': {
-                            'arguments': json.dumps(
-                                {'tool_input': state['input'], 'tool': state['next']}
-                            ),
-                            'name': 'tool_call',
-                        }
-                    },
-                ),
+                _tool_call_message(tool=state['next'], tool_input=state['input']),
                 FunctionMessage(content=content, name=state['next']),
             ]
         }
@@ -81,6 +102,138 @@ class _TODOAssistantNode(
             'messages': messages,
             'next': output.next,
             'input': output.input,
+            'calls': output.calls,
+            'started_at': state.get('started_at'),
+        }
+
+
+class _FastPathNode(Runnable[TODOAssistantGraphState, dict[str, Any]]):
+    """Runs simple board commands matched by the router directly, skipping every LLM call."""
+
+    def __init__(self, router: FastPathRouter):
+        self._router = router
+
+    def invoke(
+        self, input: TODOAssistantGraphState, config: Optional[RunnableConfig] = None
+    ) -> dict[str, Any]:
+        start = time.perf_counter()
+        if (command := self._match(input)) is None:
+            return self._fall_back(start)
+        try:
+            output = self._router.tools[command.tool_name].invoke(command.tool_input, config)
+        except Exception:
+            logger.warning("Fast path %s failed, falling back", command.tool_name, exc_info=True)
+            return self._fall_back(start)
+        return self._respond(command, output, start)
+
+    async def ainvoke(
+        self, input: TODOAssistantGraphState, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> dict[str, Any]:
+        start = time.perf_counter()
+        if (command := self._match(input)) is None:
+            return self._fall_back(start)
+        try:
+            output = await self._router.tools[command.tool_name].ainvoke(command.tool_input, config)
+        except Exception:
+            logger.warning("Fast path %s failed, falling back", command.tool_name, exc_info=True)
+            return self._fall_back(start)
+        return self._respond(command, output, start)
+
+    def _match(self, state: TODOAssistantGraphState) -> FastPathCommand | None:
+        last_message = state['messages'][-1] if state['messages'] else None
+        if not isinstance(last_message, HumanMessage):
+            return None
+        return self._router.match(str(last_message.content))
+
+    def _fall_back(self, start: float) -> dict[str, Any]:
+        self._router.record_miss()
+        return {'messages': [], 'next': _TODO_ASSISTANT_NODE, 'started_at': start}
+
+    def _respond(self, command: FastPathCommand, output: str, start: float) -> dict[str, Any]:
+        self._router.record_hit(time.perf_counter() - start)
+        return {
+            'messages': [
+                _tool_call_message(tool=_TODO_API_CALL, tool_input=json.dumps(command.tool_input)),
+                FunctionMessage(content=output, name=_TODO_API_CALL),
+                AIMessage(content=command.response),
+            ],
+            'next': _RESPOND,
+            'input': command.response,
+        }
+
+
+class _ParallelToolCallsNode(Runnable[TODOAssistantGraphState, dict[str, Any]]):
+    """Runs the independent tool calls of one planning step concurrently and joins the results.
+
+    Every call runs through the node of its tool on a copy of the state, the function call and
+    result messages of all calls are added in one update, in the order the planner made them. A
+    failed call is reported to the planner as its result and doesn't fail the others.
+    """
+
+    def __init__(
+        self,
+        tool_nodes: dict[str, Runnable[TODOAssistantGraphState, dict[str, Any]]],
+        max_concurrency: int = 4,
+    ):
+        self._tool_nodes = tool_nodes
+        # A limit below one would never run a call, the calls then run one at a time.
+        self._max_concurrency = max(max_concurrency, 1)
+
+    def invoke(
+        self, input: TODOAssistantGraphState, config: Optional[RunnableConfig] = None
+    ) -> dict[str, Any]:
+        def run(call: TODOAssistantToolCall) -> list[BaseMessage]:
+            try:
+                return self._tool_nodes[call.tool].invoke(self._call_state(input, call), config)[
+                    'messages'
+                ]
+            except Exception as error:
+                return self._failed(call, error)
+
+        calls = input['calls']
+        with ThreadPoolExecutor(
+            max_workers=max(min(self._max_concurrency, len(calls)), 1)
+        ) as executor:
+            # Workers keep the context of the caller, e.g. the session requests are scheduled for.
+            futures = [executor.submit(copy_context().run, run, call) for call in calls]
+            return self._join([future.result() for future in futures])
+
+    async def ainvoke(
+        self, input: TODOAssistantGraphState, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> dict[str, Any]:
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def run(call: TODOAssistantToolCall) -> list[BaseMessage]:
+            async with semaphore:
+                try:
+                    output = await self._tool_nodes[call.tool].ainvoke(
+                        self._call_state(input, call), config
+                    )
+                    return output['messages']
+                except Exception as error:
+                    return self._failed(call, error)
+
+        return self._join(list(await asyncio.gather(*(run(call) for call in input['calls']))))
+
+    @staticmethod
+    def _call_state(
+        state: TODOAssistantGraphState, call: TODOAssistantToolCall
+    ) -> TODOAssistantGraphState:
+        return {**state, 'next': call.tool, 'input': call.tool_input, 'calls': []}
+
+    @staticmethod
+    def _failed(call: TODOAssistantToolCall, error: Exception) -> list[BaseMessage]:
+        logger.warning("Parallel call of %s failed", call.tool, exc_info=True)
+        return [
+            _tool_call_message(tool=call.tool, tool_input=call.tool_input),
+            FunctionMessage(content=f"Failed: {type(error).__name__}: {error}", name=call.tool),
+        ]
+
+    @staticmethod
+    def _join(call_messages: list[list[BaseMessage]]) -> dict[str, Any]:
+        return {
+            'messages': [message for messages in call_messages for message in messages],
+            'calls': [],
         }
 
 
@@ -107,40 +260,108 @@ class _TODORetrievalToolNode(
         return output
 
 
+class _TaskAggregateToolNode(
+    _BaseTODOAssistantToolNode[dict[str, Any], str],
+):
+    def _build_input(self, state: TODOAssistantGraphState) -> dict[str, Any]:
+        if aggregate_input := state['input']:
+            return json.loads(aggregate_input)
+        else:
+            raise ValueError("Cannot run aggregate query without arguments")
+
+    def _parse_content(self, output: str) -> str:
+        return output
+
+    def _parse_output(self, state: TODOAssistantGraphState, output: str) -> dict[str, Any]:
+        # The planner made a structured call of its own function, not a generic tool call.
+        return {
+            'messages': [
+                AIMessage(
+                    content='',
+                    additional_kwargs={
+                        'function_call': {'arguments': state['input'], 'name': TASK_AGGREGATE}
+                    },
+                ),
+                FunctionMessage(content=self._parse_content(output), name=TASK_AGGREGATE),
+            ]
+        }
+
+
 class TODOAssistantGraphBuilder(BaseGraphBuilder):
     def __init__(
         self,
         todo_assistant_agent: TODOAssistantAgent,
         todo_api_agent: BaseAgent[TODOAPIAgentInput, TODOAPIAgentOutput],
         retrieval_tool: TODORetrievalTool,
+        aggregate_tool: TaskAggregateTool,
+        fast_path_router: FastPathRouter | None = None,
+        max_parallel_tool_calls: int = 4,
     ):
         self._todo_assistant_agent = todo_assistant_agent
         self._todo_api_agent = todo_api_agent
         self._retrieval_tool = retrieval_tool
+        self._aggregate_tool = aggregate_tool
+        self._fast_path_router = fast_path_router
+        self._max_parallel_tool_calls = max_parallel_tool_calls
 
     def build_graph(self) -> Pregel:
         workflow = StateGraph(TODOAssistantGraphState)
 
         workflow.add_node(
-            "TodoAssistant",
+            _TODO_ASSISTANT_NODE,
             _TODOAssistantNode(self._todo_assistant_agent),
         )
 
-        workflow.add_node("APIAgent", _TODOAPIAgentNode(self._todo_api_agent))
-        workflow.add_node("RetrievalTool", _TODORetrievalToolNode(self._retrieval_tool))
+        api_agent_node = _TODOAPIAgentNode(self._todo_api_agent)
+        retrieval_tool_node = _TODORetrievalToolNode(self._retrieval_tool)
+        workflow.add_node("APIAgent", api_agent_node)
+        workflow.add_node("RetrievalTool", retrieval_tool_node)
+        workflow.add_node("AggregateTool", _TaskAggregateToolNode(self._aggregate_tool))
+        # Langgraph of this version routes to a single node per step, independent calls made at
+        # once fan out inside one node instead of parallel branches.
+        workflow.add_node(
+            "ParallelTools",
+            _ParallelToolCallsNode(
+                {_TODO_API_CALL: api_agent_node, "todo_query": retrieval_tool_node},
+                max_concurrency=self._max_parallel_tool_calls,
+            ),
+        )
 
         workflow.add_conditional_edges(
-            "TodoAssistant",
-            lambda state: state["next"],
+            _TODO_ASSISTANT_NODE,
+            self._route,
             {
-                "todo_api_call": "APIAgent",
+                _TODO_API_CALL: "APIAgent",
                 "todo_query": "RetrievalTool",
-                "RESPOND": END,
+                TASK_AGGREGATE: "AggregateTool",
+                PARALLEL_TOOL_CALLS: "ParallelTools",
+                _RESPOND: END,
             },
         )
-        workflow.add_edge("APIAgent", 'TodoAssistant')
-        workflow.add_edge("RetrievalTool", 'TodoAssistant')
+        workflow.add_edge("APIAgent", _TODO_ASSISTANT_NODE)
+        workflow.add_edge("RetrievalTool", _TODO_ASSISTANT_NODE)
+        workflow.add_edge("AggregateTool", _TODO_ASSISTANT_NODE)
+        workflow.add_edge("ParallelTools", _TODO_ASSISTANT_NODE)
 
-        workflow.set_entry_point("TodoAssistant")
+        if self._fast_path_router is not None:
+            workflow.add_node("FastPath", _FastPathNode(self._fast_path_router))
+            workflow.add_conditional_edges(
+                "FastPath",
+                lambda state: state["next"],
+                {_TODO_ASSISTANT_NODE: _TODO_ASSISTANT_NODE, _RESPOND: END},
+            )
+            workflow.set_entry_point("FastPath")
+        else:
+            workflow.set_entry_point(_TODO_ASSISTANT_NODE)
 
         return workflow.compile()
+
+    def _route(self, state: TODOAssistantGraphState) -> str:
+        if (
+            state["next"] == _RESPOND
+            and self._fast_path_router is not None
+            and (started_at := state.get("started_at")) is not None
+        ):
+            # Turns left to the LLM path give the baseline the fast path saves time against.
+            self._fast_path_router.record_llm_path(time.perf_counter() - started_at)
+        return state["next"]
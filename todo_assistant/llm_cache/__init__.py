@@ -0,0 +1,3 @@
+from todo_assistant.llm_cache.cache import CachedChatModel, LLMCacheStats, LLMResponseCache
+
+__all__ = ['CachedChatModel', 'LLMCacheStats', 'LLMResponseCache']
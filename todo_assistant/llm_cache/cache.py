@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator, NamedTuple, Sequence
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessageChunk,
+    BaseMessage,
+    BaseMessageChunk,
+    message_chunk_to_message,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import BaseModel
+
+from todo_assistant.api_clients.version import BoardVersion
+
+_FUNCTION_CALL_KEYS = ('function_call', 'tool_calls')
+
+
+class LLMCacheStats(BaseModel):
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stale: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class _CacheEntry(NamedTuple):
+    board_version: str
+    messages: list[BaseMessage]
+
+
+class LLMResponseCache:
+    """Cache of LLM responses, valid for one version of the board.
+
+    Responses are keyed by the LLM parameters, bound functions included, and the normalized prompt
+    messages. Every entry is tagged with the `board_version` current when its call started and is
+    served only while the board is still at that version, a write through the API clients makes
+    all cached answers stale. Recent entries are kept in a bounded in-memory LRU and all of them in
+    an optional SQLite file, entries of older versions are pruned from it on the next write.
+    """
+
+    def __init__(
+        self,
+        board_version: BoardVersion,
+        cache_path: str | None = None,
+        max_memory_entries: int = 1000,
+    ):
+        self._board_version = board_version
+        self._max_memory_entries = max_memory_entries
+        self._memory: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = self._connect(cache_path) if cache_path else None
+        self._pruned_version: str | None = None
+        self._stats: dict[str, LLMCacheStats] = {}
+
+    @property
+    def board_version(self) -> str:
+        return self._board_version.value
+
+    @property
+    def stats(self) -> dict[str, LLMCacheStats]:
+        """Statistics per agent name."""
+        with self._lock:
+            return {name: stats.copy() for name, stats in self._stats.items()}
+
+    @staticmethod
+    def key(llm_string: str, messages: Sequence[BaseMessage]) -> str:
+        normalized_messages = [
+            {
+                'type': message.type,
+                # Whitespace only differences don't change the answer.
+                'content': ' '.join(str(message.content).split()),
+                'name': getattr(message, 'name', None),
+                **{
+                    key: message.additional_kwargs[key]
+                    for key in _FUNCTION_CALL_KEYS
+                    if key in message.additional_kwargs
+                },
+            }
+            for message in messages
+        ]
+        payload = json.dumps([llm_string, normalized_messages], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def lookup(self, agent_name: str, key: str) -> list[BaseMessage] | None:
+        board_version = self.board_version
+        with self._lock:
+            stats = self._stats.setdefault(agent_name, LLMCacheStats())
+            entry = self._memory.get(key)
+            from_disk = entry is None
+            if from_disk:
+                entry = self._read_disk(key)
+
+            if entry is None:
+                stats.misses += 1
+                return None
+            if entry.board_version != board_version:
+                self._memory.pop(key, None)
+                stats.stale += 1
+                stats.misses += 1
+                return None
+
+            self._remember(key, entry)
+            if from_disk:
+                stats.disk_hits += 1
+            else:
+                stats.memory_hits += 1
+            return entry.messages
+
+    def update(self, key: str, board_version: str, messages: list[BaseMessage]) -> None:
+        """Store the response of a call started at `board_version`."""
+        entry = _CacheEntry(board_version=board_version, messages=messages)
+        with self._lock:
+            self._remember(key, entry)
+            self._write_disk(key, entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._connection is not None:
+                with self._connection:
+                    self._connection.execute("DELETE FROM llm_responses")
+
+    def _remember(self, key: str, entry: _CacheEntry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> _CacheEntry | None:
+        if self._connection is None:
+            return None
+        row = self._connection.execute(
+            "SELECT board_version, messages FROM llm_responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        board_version, messages = row
+        return _CacheEntry(
+            board_version=board_version, messages=messages_from_dict(json.loads(messages))
+        )
+
+    def _write_disk(self, key: str, entry: _CacheEntry) -> None:
+        if self._connection is None:
+            return
+
+        with self._connection:
+            if entry.board_version != self._pruned_version:
+                self._connection.execute(
+                    "DELETE FROM llm_responses WHERE board_version != ?", (entry.board_version,)
+                )
+                self._pruned_version = entry.board_version
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, board_version, messages)"
+                " VALUES (?, ?, ?)",
+                (
+                    key,
+                    entry.board_version,
+                    json.dumps([message_to_dict(message) for message in entry.messages]),
+                ),
+            )
+
+    @staticmethod
+    def _connect(cache_path: str) -> sqlite3.Connection:
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(cache_path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses (key TEXT PRIMARY KEY,"
+            " board_version TEXT NOT NULL, messages TEXT NOT NULL)"
+        )
+        return connection
+
+
+class CachedChatModel(BaseChatModel):
+    """Chat model answering from an `LLMResponseCache` before calling the wrapped `llm`.
+
+    Calls are accounted to `agent_name` in the cache statistics. Cached answers of streamed calls
+    are replayed as a single token.
+    """
+
+    llm: BaseChatModel
+    response_cache: LLMResponseCache
+    agent_name: str
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @property
+    def _llm_type(self) -> str:
+        return self.llm._llm_type
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return self.llm._identifying_params
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key, board_version = self._cache_key(messages, stop, **kwargs)
+        if (cached := self.response_cache.lookup(self.agent_name, key)) is not None:
+            if run_manager is not None:
+                for message in cached:
+                    run_manager.on_llm_new_token(str(message.content))
+            return _chat_result(cached)
+
+        result = self.llm._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        self._store(key, board_version, result)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key, board_version = self._cache_key(messages, stop, **kwargs)
+        if (cached := self.response_cache.lookup(self.agent_name, key)) is not None:
+            if run_manager is not None:
+                for message in cached:
+                    await run_manager.on_llm_new_token(str(message.content))
+            return _chat_result(cached)
+
+        result = await self.llm._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        self._store(key, board_version, result)
+        return result
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        if type(self.llm)._stream is BaseChatModel._stream:
+            yield from _chunks(self._generate(messages, stop, run_manager, **kwargs))
+            return
+
+        key, board_version = self._cache_key(messages, stop, **kwargs)
+        if (cached := self.response_cache.lookup(self.agent_name, key)) is not None:
+            for chunk in _chunks(_chat_result(cached)):
+                if run_manager is not None:
+                    run_manager.on_llm_new_token(str(chunk.message.content), chunk=chunk)
+                yield chunk
+            return
+
+        streamed: ChatGenerationChunk | None = None
+        for chunk in self.llm._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            streamed = chunk if streamed is None else streamed + chunk
+            yield chunk
+        if streamed is not None:
+            self._store(key, board_version, _chat_result([streamed.message]))
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if type(self.llm)._astream is BaseChatModel._astream:
+            for chunk in _chunks(await self._agenerate(messages, stop, run_manager, **kwargs)):
+                yield chunk
+            return
+
+        key, board_version = self._cache_key(messages, stop, **kwargs)
+        if (cached := self.response_cache.lookup(self.agent_name, key)) is not None:
+            for chunk in _chunks(_chat_result(cached)):
+                if run_manager is not None:
+                    await run_manager.on_llm_new_token(str(chunk.message.content), chunk=chunk)
+                yield chunk
+            return
+
+        streamed: ChatGenerationChunk | None = None
+        async for chunk in self.llm._astream(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        ):
+            streamed = chunk if streamed is None else streamed + chunk
+            yield chunk
+        if streamed is not None:
+            self._store(key, board_version, _chat_result([streamed.message]))
+
+    def _cache_key(
+        self, messages: list[BaseMessage], stop: list[str] | None, **kwargs: Any
+    ) -> tuple[str, str]:
+        # The version is taken before the call, an answer racing a write is stored as stale.
+        board_version = self.response_cache.board_version
+        llm_string = self.llm._get_llm_string(stop=stop, **kwargs)
+        return self.response_cache.key(llm_string, messages), board_version
+
+    def _store(self, key: str, board_version: str, result: ChatResult) -> None:
+        messages = [_as_message(generation.message) for generation in result.generations]
+        self.response_cache.update(key, board_version, messages)
+
+
+def _chat_result(messages: list[BaseMessage]) -> ChatResult:
+    return ChatResult(
+        generations=[ChatGeneration(message=_as_message(message)) for message in messages]
+    )
+
+
+def _as_message(message: BaseMessage) -> BaseMessage:
+    # Streamed answers are stored and replayed as whole messages.
+    if isinstance(message, BaseMessageChunk):
+        return message_chunk_to_message(message)
+    return message
+
+
+def _chunks(result: ChatResult) -> Iterator[ChatGenerationChunk]:
+    for generation in result.generations:
+        message = generation.message
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content=message.content, additional_kwargs=message.additional_kwargs
+            )
+        )
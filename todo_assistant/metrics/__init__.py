@@ -0,0 +1,11 @@
+from todo_assistant.metrics.callbacks import MetricsCallbackHandler
+from todo_assistant.metrics.registry import CONTENT_TYPE, Counter, Gauge, Histogram, MetricsRegistry
+
+__all__ = [
+    'CONTENT_TYPE',
+    'Counter',
+    'Gauge',
+    'Histogram',
+    'MetricsCallbackHandler',
+    'MetricsRegistry',
+]
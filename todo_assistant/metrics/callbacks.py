@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, NamedTuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from todo_assistant.assistant.history import TokenCounter
+from todo_assistant.metrics.registry import Histogram, MetricsRegistry
+
+_HIDDEN_TAG = 'langsmith:hidden'
+_GRAPH_STEP_TAG = 'graph:step:'
+
+
+class _LLMRun(NamedTuple):
+    name: str
+    started_at: float
+    prompt_tokens: int | None
+    streamed: bool = False
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Records the latency of graph nodes, tools and LLM calls of the assistant turns.
+
+    Nodes of the assistant graph and of the nested API graph are told apart from the internal
+    runs of langgraph by their step tag. LLM token counts come from the usage reported by the
+    model, or are estimated by the optional `token_counter` when the model streams without one.
+    """
+
+    run_inline = True
+
+    def __init__(self, metrics: MetricsRegistry, token_counter: TokenCounter | None = None):
+        self._token_counter = token_counter
+        self._node_duration = metrics.histogram(
+            "node_duration_seconds", "Duration of graph node runs.", ['node']
+        )
+        self._tool_duration = metrics.histogram(
+            "tool_duration_seconds", "Duration of tool runs.", ['tool']
+        )
+        self._errors = metrics.counter("run_errors", "Failed node, tool and LLM runs.", ['run'])
+        self._llm_duration = metrics.histogram(
+            "llm_duration_seconds", "Duration of LLM calls.", ['llm']
+        )
+        self._llm_first_token = metrics.histogram(
+            "llm_time_to_first_token_seconds", "Time to the first streamed LLM token.", ['llm']
+        )
+        self._prompt_tokens = metrics.counter(
+            "llm_prompt_tokens", "Prompt tokens sent to LLMs.", ['llm']
+        )
+        self._completion_tokens = metrics.counter(
+            "llm_completion_tokens", "Completion tokens generated by LLMs.", ['llm']
+        )
+        self._lock = threading.Lock()
+        self._runs: dict[UUID, tuple[str, float]] = {}
+        self._llm_runs: dict[UUID, _LLMRun] = {}
+
+    def on_chain_start(
+        self,
+        serialized: dict[str, Any],
+        inputs: dict[str, Any],
+        *,
+        run_id: UUID,
+        tags: list[str] | None = None,
+        name: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        tags = tags or []
+        if _HIDDEN_TAG in tags or not any(tag.startswith(_GRAPH_STEP_TAG) for tag in tags):
+            return
+        with self._lock:
+            self._runs[run_id] = (name or "unknown", time.perf_counter())
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_run(run_id, self._node_duration, 'node')
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_run(run_id, self._node_duration, 'node', failed=True)
+
+    def on_tool_start(
+        self,
+        serialized: dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        name: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        with self._lock:
+            self._runs[run_id] = (name or _serialized_name(serialized), time.perf_counter())
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_run(run_id, self._tool_duration, 'tool')
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_run(run_id, self._tool_duration, 'tool', failed=True)
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        *,
+        run_id: UUID,
+        name: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        prompt_tokens = None
+        if self._token_counter is not None:
+            prompt_tokens = sum(self._token_counter.count_messages(prompt) for prompt in messages)
+        with self._lock:
+            self._llm_runs[run_id] = _LLMRun(
+                name=name or _serialized_name(serialized),
+                started_at=time.perf_counter(),
+                prompt_tokens=prompt_tokens,
+            )
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            llm_run = self._llm_runs.get(run_id)
+            if llm_run is None or llm_run.streamed:
+                return
+            self._llm_runs[run_id] = llm_run._replace(streamed=True)
+        self._llm_first_token.observe(time.perf_counter() - llm_run.started_at, llm=llm_run.name)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            llm_run = self._llm_runs.pop(run_id, None)
+        if llm_run is None:
+            return
+
+        self._llm_duration.observe(time.perf_counter() - llm_run.started_at, llm=llm_run.name)
+        token_usage = (response.llm_output or {}).get('token_usage') or {}
+        prompt_tokens = token_usage.get('prompt_tokens', llm_run.prompt_tokens)
+        completion_tokens = token_usage.get('completion_tokens')
+        if completion_tokens is None:
+            completion_tokens = self._count_completion(response)
+        if prompt_tokens:
+            self._prompt_tokens.inc(prompt_tokens, llm=llm_run.name)
+        if completion_tokens:
+            self._completion_tokens.inc(completion_tokens, llm=llm_run.name)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            llm_run = self._llm_runs.pop(run_id, None)
+        if llm_run is not None:
+            self._llm_duration.observe(time.perf_counter() - llm_run.started_at, llm=llm_run.name)
+            self._errors.inc(run=llm_run.name)
+
+    def _end_run(
+        self, run_id: UUID, histogram: Histogram, label: str, failed: bool = False
+    ) -> None:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        name, started_at = run
+        histogram.observe(time.perf_counter() - started_at, **{label: name})
+        if failed:
+            self._errors.inc(run=name)
+
+    def _count_completion(self, response: LLMResult) -> int | None:
+        if self._token_counter is None:
+            return None
+        tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                tokens += self._token_counter.count_text(generation.text)
+                if isinstance(generation, ChatGeneration):
+                    function_call = generation.message.additional_kwargs.get('function_call')
+                    if function_call:
+                        tokens += self._token_counter.count_text(function_call.get('arguments', ''))
+        return tokens
+
+
+def _serialized_name(serialized: dict[str, Any]) -> str:
+    return serialized.get('name') or (serialized.get('id') or ["unknown"])[-1]
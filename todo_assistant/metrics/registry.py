@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Sequence, TypeVar
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_LabelValues = tuple[str, ...]
+_MetricT = TypeVar('_MetricT', bound='_Metric')
+
+
+class _Metric(ABC):
+    type: str
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {_escape_help(self.documentation)}",
+            f"# TYPE {self.name} {self.type}",
+            *self._render_samples(),
+        ]
+
+    def _label_values(self, labels: dict[str, str]) -> _LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def _render_samples(self) -> list[str]:
+        pass
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[_LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._label_values(labels), 0.0)
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}_total{_labels(self.labelnames, key)} {_number(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[_LabelValues, float | Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float], **labels: str) -> None:
+        """Computes the value with `function` whenever it is read, e.g. the age of something."""
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = function
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            value = self._values.get(self._label_values(labels), 0.0)
+        return value() if callable(value) else value
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_labels(self.labelnames, key)}"
+            f" {_number(value() if callable(value) else value)}"
+            for key, value in values
+        ]
+
+
+class _HistogramValues:
+    def __init__(self, bucket_count: int) -> None:
+        self.buckets = [0] * bucket_count
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._upper_bounds = sorted(buckets)
+        self._values: dict[_LabelValues, _HistogramValues] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            values = self._values.get(key)
+            if values is None:
+                values = self._values[key] = _HistogramValues(len(self._upper_bounds))
+            index = bisect.bisect_left(self._upper_bounds, value)
+            if index < len(values.buckets):
+                values.buckets[index] += 1
+            values.sum += value
+            values.count += 1
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            values = self._values.get(self._label_values(labels))
+            return values.count if values is not None else 0
+
+    def _render_samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, values in sorted(self._values.items()):
+                cumulative = 0
+                for upper_bound, bucket in zip(self._upper_bounds, values.buckets):
+                    cumulative += bucket
+                    bucket_labels = _labels((*self.labelnames, 'le'), (*key, _number(upper_bound)))
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                labels = _labels((*self.labelnames, 'le'), (*key, "+Inf"))
+                lines.append(f"{self.name}_bucket{labels} {values.count}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {values.sum!r}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {values.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text exposition format.
+
+    Metrics are created on first use and shared by every caller asking for the same name, so
+    components record into one registry without knowing about each other.
+    """
+
+    def __init__(self, namespace: str = "todo_assistant"):
+        self._namespace = namespace
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(
+            Counter,
+            name,
+            labelnames,
+            lambda full_name: Counter(full_name, documentation, labelnames),
+        )
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(
+            Gauge,
+            name,
+            labelnames,
+            lambda full_name: Gauge(full_name, documentation, labelnames),
+        )
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(
+            Histogram,
+            name,
+            labelnames,
+            lambda full_name: Histogram(full_name, documentation, labelnames, buckets=buckets),
+        )
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return "".join(f"{line}\n" for metric in metrics for line in metric.render())
+
+    def _get_or_create(
+        self,
+        metric_type: type[_MetricT],
+        name: str,
+        labelnames: Sequence[str],
+        create: Callable[[str], _MetricT],
+    ) -> _MetricT:
+        full_name = f"{self._namespace}_{name}" if self._namespace else name
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = create(full_name)
+            if not isinstance(metric, metric_type) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {full_name} is already registered differently")
+            return metric
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from pydantic import BaseModel
+
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(?P<self>\d+)\s+\|\s+\d+\s+\|\s+(?P<name>.+)$")
+_COLD_START_TARGET = 1.0
+
+
+class ImportProfile(BaseModel):
+    total_time: float
+    package_times: dict[str, float]
+
+
+class StartupPhase(BaseModel):
+    name: str
+    duration: float
+    before_first_notion_call: bool
+
+
+def profile_imports(module: str, cwd: Path | None = None) -> ImportProfile:
+    """Import `module` in a fresh interpreter and attribute the import time to top level packages.
+
+    Modules already imported by the current process are imported again from scratch, the profile
+    shows a cold start.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    package_times: defaultdict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        if match := _IMPORT_TIME_LINE.match(line):
+            package = match['name'].strip().split('.')[0]
+            package_times[package] += int(match['self']) / 1_000_000
+    return ImportProfile(
+        total_time=sum(package_times.values()),
+        package_times=dict(sorted(package_times.items(), key=lambda item: item[1], reverse=True)),
+    )
+
+
+class StartupProfiler:
+    """Times the initialization phases of an entry point."""
+
+    def __init__(self) -> None:
+        self.phases: list[StartupPhase] = []
+
+    @contextmanager
+    def phase(self, name: str, before_first_notion_call: bool = True) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append(
+                StartupPhase(
+                    name=name,
+                    duration=time.perf_counter() - started_at,
+                    before_first_notion_call=before_first_notion_call,
+                )
+            )
+
+    def report(self, import_profile: ImportProfile, top_packages: int = 10) -> str:
+        lines = [f"Imports: {import_profile.total_time:.3f}s"]
+        for package, duration in list(import_profile.package_times.items())[:top_packages]:
+            lines.append(f"  {package:<32} {duration:.3f}s")
+        lines.append("Initialization:")
+        for phase in self.phases:
+            lines.append(f"  {phase.name:<32} {phase.duration:.3f}s")
+
+        cold_start = import_profile.total_time + sum(
+            phase.duration for phase in self.phases if phase.before_first_notion_call
+        )
+        lines.append(
+            f"Cold start before the first Notion call: {cold_start:.3f}s"
+            f" (target {_COLD_START_TARGET:.1f}s)"
+        )
+        return "\n".join(lines)
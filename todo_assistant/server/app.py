@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine
+from uuid import uuid4
+
+from fastapi import FastAPI, HTTPException, Response, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+
+from todo_assistant.assistant.assistant import TODOAssistant
+from todo_assistant.assistant.callbacks import BaseAssistantResponseCallback
+from todo_assistant.assistant.response import TODOAssistantResponse
+from todo_assistant.assistant.sessions import LRUSessionStore
+from todo_assistant.llm_cache import LLMResponseCache
+from todo_assistant.metrics import CONTENT_TYPE, MetricsRegistry
+from todo_assistant.server.pool import AdmissionRejectedError, AssistantPool
+
+_RETRY_AFTER_SECONDS = 1
+_STREAM_END = object()
+
+
+class MessageRequest(BaseModel):
+    input: str
+    stream: bool = True
+
+
+class SessionResponse(BaseModel):
+    session_id: str
+
+
+class _QueueResponseCallback(BaseAssistantResponseCallback):
+    """Puts streamed tokens and the final response on a queue read by the streaming response."""
+
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue[Any] = asyncio.Queue()
+
+    def on_stream_new_token(self, token: str) -> None:
+        self.queue.put_nowait(_event('token', {'token': token}))
+
+    def on_stream_finish(self) -> None:
+        pass
+
+    def on_response(self, final_response: TODOAssistantResponse) -> None:
+        self.queue.put_nowait(_event('response', final_response.dict()))
+
+
+def create_app(
+    assistant_pool: AssistantPool,
+    session_store: LRUSessionStore | None = None,
+    llm_response_cache: LLMResponseCache | None = None,
+    metrics: MetricsRegistry | None = None,
+) -> FastAPI:
+    """ASGI app serving many conversations from one process.
+
+    Every session gets its assistant from `assistant_pool`, turns are admitted by the pool and
+    streamed back as server-sent events, or answered as JSON with `stream` disabled. `metrics`
+    are exposed for Prometheus at `/metrics`.
+    """
+    app = FastAPI(title="TODO Assistant")
+    # The event loop keeps only weak references to tasks, streamed turns are held here.
+    running_turns: set[asyncio.Task[TODOAssistantResponse]] = set()
+
+    @app.post("/sessions", response_model=SessionResponse)
+    async def create_session() -> SessionResponse:
+        return SessionResponse(session_id=uuid4().hex)
+
+    @app.post("/sessions/{session_id}/messages")
+    async def send_message(session_id: str, request: MessageRequest) -> Response:
+        if not request.stream:
+            # Tokens are not streamed, the queue of the callback is simply never read.
+            response = await _admit(
+                assistant_pool,
+                session_id,
+                lambda assistant: assistant.astep(
+                    request.input, new_token_callback=_QueueResponseCallback()
+                ),
+            )
+            return Response(content=response.json(), media_type="application/json")
+
+        callback = _QueueResponseCallback()
+        turn = _admit(
+            assistant_pool,
+            session_id,
+            lambda assistant: assistant.astep(request.input, new_token_callback=callback),
+        )
+        # The turn runs to completion even if the client goes away, its board changes and
+        # history must not be left half done.
+        task = asyncio.create_task(turn)
+        running_turns.add(task)
+        task.add_done_callback(running_turns.discard)
+        task.add_done_callback(lambda _: callback.queue.put_nowait(_STREAM_END))
+        return StreamingResponse(
+            _stream_events(callback.queue, task), media_type="text/event-stream"
+        )
+
+    @app.delete("/sessions/{session_id}")
+    async def delete_session(session_id: str) -> Response:
+        if not assistant_pool.remove(session_id):
+            raise HTTPException(status.HTTP_409_CONFLICT, "Session is unknown or has pending turns")
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    @app.get("/stats")
+    async def get_stats() -> dict[str, Any]:
+        stats: dict[str, Any] = {'pool': assistant_pool.stats.dict()}
+        if session_store is not None:
+            stats['sessions'] = session_store.stats.dict()
+        if llm_response_cache is not None:
+            stats['llm_cache'] = {
+                agent_name: {**agent_stats.dict(), 'hit_rate': agent_stats.hit_rate}
+                for agent_name, agent_stats in llm_response_cache.stats.items()
+            }
+        return stats
+
+    if metrics is not None:
+
+        @app.get("/metrics", response_class=PlainTextResponse)
+        async def get_metrics() -> Response:
+            # Set as a header, a text media type would get a second charset appended.
+            return Response(content=metrics.render(), headers={'Content-Type': CONTENT_TYPE})
+
+    return app
+
+
+def _admit(
+    assistant_pool: AssistantPool,
+    session_id: str,
+    turn: Callable[[TODOAssistant], Awaitable[TODOAssistantResponse]],
+) -> Coroutine[Any, Any, TODOAssistantResponse]:
+    try:
+        return assistant_pool.run_turn(session_id, turn)
+    except AdmissionRejectedError as error:
+        raise HTTPException(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            str(error),
+            headers={'Retry-After': str(_RETRY_AFTER_SECONDS)},
+        ) from error
+
+
+async def _stream_events(
+    queue: asyncio.Queue[Any], task: asyncio.Task[TODOAssistantResponse]
+) -> AsyncIterator[str]:
+    while (event := await queue.get()) is not _STREAM_END:
+        yield event
+    if not task.cancelled() and (error := task.exception()) is not None:
+        yield _event('error', {'detail': str(error)})
+
+
+def _event(name: str, data: dict[str, Any]) -> str:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
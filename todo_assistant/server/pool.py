@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Coroutine, TypeVar
+
+from pydantic import BaseModel
+
+from todo_assistant.assistant.assistant import TODOAssistant
+
+_T = TypeVar('_T')
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a turn can't be admitted, the server is at its queueing capacity."""
+
+
+class AssistantPoolStats(BaseModel):
+    admitted: int = 0
+    rejected: int = 0
+    running_turns: int = 0
+    queued_turns: int = 0
+    max_queued_turns: int = 0
+    total_queue_time: float = 0.0
+    active_sessions: int = 0
+
+    @property
+    def average_queue_time(self) -> float:
+        return self.total_queue_time / self.admitted if self.admitted else 0.0
+
+
+class _PooledSession:
+    def __init__(self, assistant: TODOAssistant, max_concurrent_turns: int):
+        self.assistant = assistant
+        self.semaphore = asyncio.Semaphore(max_concurrent_turns)
+        self.pending_turns = 0
+
+
+class AssistantPool:
+    """Conversations of a long running server, keyed by session id.
+
+    Assistants are created through `assistant_factory`, sharing whatever it shares (the compiled
+    graph, LLM client and task index), and kept for the `max_sessions` most recently used
+    sessions. At most `max_concurrent_turns` turns run at a time and at most `max_queued_turns`
+    wait for a slot, further turns are rejected with `AdmissionRejectedError`. Turns of one session
+    run at most `max_session_turns` at a time, in arrival order, as they share one history.
+    """
+
+    def __init__(
+        self,
+        assistant_factory: Callable[..., TODOAssistant],
+        max_concurrent_turns: int = 32,
+        max_queued_turns: int = 128,
+        max_session_turns: int = 1,
+        max_sessions: int = 1000,
+    ):
+        self._assistant_factory = assistant_factory
+        self._max_queued_turns = max_queued_turns
+        self._max_session_turns = max_session_turns
+        self._max_sessions = max_sessions
+        self._sessions: OrderedDict[str, _PooledSession] = OrderedDict()
+        self._semaphore: asyncio.Semaphore | None = None
+        self._max_concurrent_turns = max_concurrent_turns
+        self._stats = AssistantPoolStats()
+
+    @property
+    def stats(self) -> AssistantPoolStats:
+        return self._stats.copy(update={'active_sessions': len(self._sessions)})
+
+    def get(self, session_id: str) -> TODOAssistant:
+        return self._get_session(session_id).assistant
+
+    def remove(self, session_id: str) -> bool:
+        session = self._sessions.get(session_id)
+        if session is None or session.pending_turns:
+            return False
+        del self._sessions[session_id]
+        session.assistant.get_session_history(session_id).clear()
+        return True
+
+    def run_turn(
+        self, session_id: str, turn: Callable[[TODOAssistant], Awaitable[_T]]
+    ) -> Coroutine[Any, Any, _T]:
+        """Queue `turn` on the assistant of the session, returning a coroutine of its result.
+
+        Admission is decided right away, `AdmissionRejectedError` is raised here rather than when
+        awaiting, so callers can reject a request before starting a response. The returned
+        coroutine must be awaited, it holds the place of the turn in the queue.
+        """
+        if self._stats.queued_turns >= self._max_queued_turns:
+            self._stats.rejected += 1
+            raise AdmissionRejectedError(
+                f"{self._stats.queued_turns} turns are already waiting, try again later"
+            )
+
+        session = self._get_session(session_id)
+        session.pending_turns += 1
+        self._stats.queued_turns += 1
+        self._stats.max_queued_turns = max(self._stats.max_queued_turns, self._stats.queued_turns)
+        return self._run_turn(session, turn, enqueued_at=time.monotonic())
+
+    async def _run_turn(
+        self,
+        session: _PooledSession,
+        turn: Callable[[TODOAssistant], Awaitable[_T]],
+        enqueued_at: float,
+    ) -> _T:
+        admitted = False
+        try:
+            # The session slot is taken first, turns queued behind another turn of their own
+            # session don't hold server slots other sessions could use.
+            async with session.semaphore, self._server_semaphore():
+                admitted = True
+                self._stats.queued_turns -= 1
+                self._stats.admitted += 1
+                self._stats.total_queue_time += time.monotonic() - enqueued_at
+                self._stats.running_turns += 1
+                try:
+                    return await turn(session.assistant)
+                finally:
+                    self._stats.running_turns -= 1
+        finally:
+            if not admitted:
+                self._stats.queued_turns -= 1
+            session.pending_turns -= 1
+
+    def _server_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily, asyncio primitives belong to the loop running the server.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrent_turns)
+        return self._semaphore
+
+    def _get_session(self, session_id: str) -> _PooledSession:
+        if (session := self._sessions.pop(session_id, None)) is None:
+            session = _PooledSession(
+                assistant=self._assistant_factory(session_id=session_id),
+                max_concurrent_turns=self._max_session_turns,
+            )
+        self._sessions[session_id] = session
+        self._evict()
+        return session
+
+    def _evict(self) -> None:
+        # Histories live in the session store, dropping an idle assistant loses nothing. Sessions
+        # with pending turns are kept, their semaphore must stay the one their turns wait on.
+        excess = len(self._sessions) - self._max_sessions
+        for session_id in list(self._sessions)[:-1]:
+            if excess <= 0:
+                break
+            if not self._sessions[session_id].pending_turns:
+                del self._sessions[session_id]
+                excess -= 1
@@ -1,21 +1,72 @@
 import os
 from pathlib import Path
+from typing import Any, Literal
 
-from pydantic import BaseSettings
+from pydantic import BaseSettings, root_validator
 
 _ENV_FILE = os.getenv("_ENV_FILE", default=str(Path(__file__).parent.parent / ".env"))
 
 
 class Settings(BaseSettings):
     OPENAI_API_KEY: str
-    NOTION_API_KEY: str
-    NOTION_DATABASE_ID: str
+    TASK_BACKEND: Literal["notion", "sqlite"] = "notion"
+    NOTION_API_KEY: str = ""
+    NOTION_DATABASE_ID: str = ""
+    NOTION_REQUESTS_PER_SECOND: float = 3.0
+    SQLITE_TASK_DB_PATH: str = str(Path(__file__).parent.parent / ".cache" / "tasks.db")
+    SQLITE_TASK_IMPORT_PATH: str | None = None
     MODEL_NAME: str
     VERBOSE: bool = False
     DEBUG: bool = False
 
     VISUALIZE_RUN: bool = False
     MAX_STEPS: int = 10
+    FAST_PATH: bool = False
+    MAX_PARALLEL_TOOL_CALLS: int = 4
+    HISTORY_TOKEN_BUDGET: int | None = None
+    HISTORY_MIN_RECENT_MESSAGES: int = 4
+    SESSION_STORE_SIZE: int = 1000
+    SESSION_IDLE_TTL: float | None = 3600.0
+    SESSION_STORE_PATH: str | None = str(Path(__file__).parent.parent / ".cache" / "sessions.db")
+    SESSION_FLUSH_INTERVAL: float = 1.0
+    SESSION_STORE_RETENTION: float | None = 30 * 24 * 3600.0
+
+    SERVER_HOST: str = "127.0.0.1"
+    SERVER_PORT: int = 8000
+    SERVER_MAX_CONCURRENT_TURNS: int = 32
+    SERVER_MAX_QUEUED_TURNS: int = 128
+    SERVER_MAX_SESSION_TURNS: int = 1
+
+    RETRIEVAL_MODE: Literal["hybrid", "lexical", "vector"] = "hybrid"
+    RETRIEVAL_K: int = 4
+
+    TASK_INDEX_DIRECTORY: str | None = str(Path(__file__).parent.parent / ".task_index")
+    VECTOR_STORE: Literal["chroma", "flat"] = "chroma"
+    EMBEDDING_CACHE_PATH: str | None = str(
+        Path(__file__).parent.parent / ".cache" / "embeddings.db"
+    )
+    EMBEDDING_CACHE_SIZE: int = 10_000
+    EMBEDDING_BATCH_SIZE: int = 100
+    EMBEDDING_CONCURRENCY: int = 4
+    EMBEDDING_MAX_RETRIES: int = 3
+    TASK_CACHE_TTL: float | None = 300.0
+    CHANGE_FEED_SYNC: bool = True
+    CHANGE_FEED_MIN_INTERVAL: float = 5.0
+    CHANGE_FEED_MAX_INTERVAL: float = 60.0
+    CHANGE_FEED_RECONCILE_INTERVAL: float | None = 3600.0
+    LLM_CACHE: bool = True
+    LLM_CACHE_PATH: str | None = str(Path(__file__).parent.parent / ".cache" / "llm_responses.db")
+    LLM_CACHE_SIZE: int = 1000
+
+    @root_validator(skip_on_failure=True)
+    def _check_notion_credentials(cls, values: dict[str, Any]) -> dict[str, Any]:
+        if values['TASK_BACKEND'] == "notion" and not (
+            values['NOTION_API_KEY'] and values['NOTION_DATABASE_ID']
+        ):
+            raise ValueError(
+                "NOTION_API_KEY and NOTION_DATABASE_ID are required by the notion backend"
+            )
+        return values
 
     class Config:
         env_file = _ENV_FILE
@@ -0,0 +1,32 @@
+from todo_assistant.task_index.index import IndexSyncSummary, TaskIndex
+from todo_assistant.task_index.lexical import BM25Index
+from todo_assistant.task_index.names import TaskNameIndex, TaskNameMatch
+from todo_assistant.task_index.pipeline import (
+    EmbeddingPipeline,
+    EmbeddingPipelineError,
+    EmbeddingProgress,
+)
+from todo_assistant.task_index.retriever import HybridTaskRetriever, RetrievalMode
+from todo_assistant.task_index.table import (
+    TaskAggregateGroup,
+    TaskAggregateQuery,
+    TaskAggregateResult,
+    TaskTable,
+)
+
+__all__ = [
+    'BM25Index',
+    'EmbeddingPipeline',
+    'EmbeddingPipelineError',
+    'EmbeddingProgress',
+    'HybridTaskRetriever',
+    'IndexSyncSummary',
+    'RetrievalMode',
+    'TaskAggregateGroup',
+    'TaskAggregateQuery',
+    'TaskAggregateResult',
+    'TaskIndex',
+    'TaskNameIndex',
+    'TaskNameMatch',
+    'TaskTable',
+]
@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from contextvars import copy_context
+from pathlib import Path
+from queue import Full, Queue
+from typing import Any, Iterable, Iterator, Mapping, NamedTuple, Sequence, TypeVar
+
+from langchain_core.vectorstores import VectorStore
+from pydantic import BaseModel
+
+from todo_assistant.entities.task import Task, TaskPriority, TaskStatus
+from todo_assistant.task_index.lexical import BM25Index
+from todo_assistant.task_index.names import TaskNameIndex
+from todo_assistant.task_index.pipeline import EmbeddingPipeline, EmbeddingPipelineError
+from todo_assistant.task_index.table import TaskTable
+
+logger = logging.getLogger(__name__)
+
+_Page = TypeVar('_Page')
+
+_PREFETCH_POLL_INTERVAL = 0.1
+# Seconds between manifest saves while a sync writes batches.
+_CHECKPOINT_INTERVAL = 5.0
+
+
+class IndexEntry(BaseModel):
+    last_edited_time: str | None
+    content_hash: str
+    title: str | None = None
+    # Columns of the task table, missing in manifests written before the table existed.
+    status: str | None = None
+    priority: str | None = None
+    work_estimation: int | None = None
+
+    def to_task(self, task_id: str) -> Task | None:
+        if (
+            self.title is None
+            or self.status is None
+            or self.priority is None
+            or self.work_estimation is None
+        ):
+            return None
+        return Task(
+            id=task_id,
+            title=self.title,
+            status=TaskStatus(self.status),
+            priority=TaskPriority(self.priority),
+            work_estimation=self.work_estimation,
+        )
+
+
+class IndexSyncSummary(BaseModel):
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    skipped: int = 0
+    # Tasks of failed embedding batches, indexed again by the next sync.
+    failed: int = 0
+    duration: float = 0.0
+    # Time until the first batch of changed tasks was searchable.
+    first_batch_duration: float | None = None
+
+    def __str__(self) -> str:
+        first_batch = (
+            f", first batch in {self.first_batch_duration:.2f}s"
+            if self.first_batch_duration is not None
+            else ""
+        )
+        return (
+            f"added={self.added} updated={self.updated} removed={self.removed}"
+            f" skipped={self.skipped} failed={self.failed}"
+            f" in {self.duration:.2f}s{first_batch}"
+        )
+
+
+class _PendingTask(NamedTuple):
+    """Changed task waiting for its embedding, `replaced` when an older version is indexed."""
+
+    task: Task
+    entry: IndexEntry
+    replaced: bool
+
+
+class TaskIndex:
+    """Vector index over board tasks kept in sync with the task backend.
+
+    Every indexed task is stored under its id together with the `last_edited_time` reported by
+    the backend and a hash of its text, so a sync re-embeds only added or changed tasks. The index
+    is shared by all tools of a board and kept up to date by `upsert` and `remove` on every
+    mutation, together with the name index used for task lookups, the BM25 index used for lexical
+    retrieval and the task table answering aggregate queries.
+    """
+
+    def __init__(
+        self,
+        vectorstore: VectorStore,
+        manifest_path: Path | None = None,
+        embedding_pipeline: EmbeddingPipeline | None = None,
+    ):
+        self._vectorstore = vectorstore
+        self._manifest_path = manifest_path
+        if embedding_pipeline is None:
+            if vectorstore.embeddings is None:
+                raise ValueError(
+                    "The vector store has no embeddings, pass an embedding_pipeline to TaskIndex"
+                )
+            embedding_pipeline = EmbeddingPipeline(vectorstore.embeddings)
+        self._embedding_pipeline = embedding_pipeline
+        self._entries = self._load_manifest()
+        self._saved_at = time.monotonic()
+        self._name_index = TaskNameIndex()
+        self._lexical_index = BM25Index()
+        self._task_table = TaskTable()
+        for task_id, entry in self._entries.items():
+            if entry.title is not None:
+                self._name_index.add(task_id, entry.title)
+            if (task := entry.to_task(task_id)) is not None:
+                self._lexical_index.add(task.id, task.as_text(), task.as_metadata())
+                self._task_table.upsert(task)
+        self._lock = threading.RLock()
+        self.last_sync_summary: IndexSyncSummary | None = None
+
+    @property
+    def vectorstore(self) -> VectorStore:
+        return self._vectorstore
+
+    @property
+    def name_index(self) -> TaskNameIndex:
+        return self._name_index
+
+    @property
+    def lexical_index(self) -> BM25Index:
+        return self._lexical_index
+
+    @property
+    def task_table(self) -> TaskTable:
+        return self._task_table
+
+    def sync(
+        self,
+        pages: Iterable[Sequence[tuple[Task, str | None]]],
+        prefetch: int = 1,
+        remove_missing: bool = True,
+    ) -> IndexSyncSummary:
+        """Index the board streamed as pages of tasks with their `last_edited_time`.
+
+        Up to `prefetch` next pages are downloaded in a background thread while changed tasks are
+        embedded by the embedding pipeline. With `remove_missing` the pages are the whole board
+        and tasks missing from it are removed once every page is read, tasks with an unchanged
+        `last_edited_time` are skipped. Without it the pages are the changes since an earlier sync
+        and are compared by content, as Notion rounds `last_edited_time` to the minute. Tasks with
+        unchanged content are never embedded again. The manifest is checkpointed while batches are
+        written, a sync interrupted midway resumes with the tasks not yet indexed.
+        """
+        with self._lock:
+            return self._sync(pages=pages, prefetch=prefetch, remove_missing=remove_missing)
+
+    def last_edited_times(self) -> dict[str, str | None]:
+        """The `last_edited_time` every indexed task had when it was indexed."""
+        with self._lock:
+            return {task_id: entry.last_edited_time for task_id, entry in self._entries.items()}
+
+    def upsert(self, task: Task, last_edited_time: str | None = None) -> None:
+        self.upsert_many([task], last_edited_times={task.id: last_edited_time})
+
+    def upsert_many(
+        self,
+        tasks: Iterable[Task],
+        last_edited_times: Mapping[str, str | None] | None = None,
+    ) -> None:
+        """Index tasks written by one bulk operation, embedding changed texts in batches.
+
+        Raises `EmbeddingPipelineError` when some batches can't be embedded, the tasks of the
+        other batches are indexed.
+        """
+        last_edited_times = last_edited_times or {}
+        with self._lock:
+            pending_tasks = [
+                pending_task
+                for task in {task.id: task for task in tasks}.values()
+                if (
+                    pending_task := self._pending_task(
+                        task, last_edited_time=last_edited_times.get(task.id)
+                    )
+                )
+                is not None
+            ]
+            try:
+                self._embedding_pipeline.run(
+                    ((pending_task.task.as_text(), pending_task) for pending_task in pending_tasks),
+                    write=self._write_batch,
+                    total_texts=len(pending_tasks),
+                )
+            finally:
+                self._save_manifest()
+
+    def remove(self, task_id: str) -> None:
+        self.remove_many([task_id])
+
+    def remove_many(self, task_ids: Iterable[str]) -> None:
+        with self._lock:
+            removed_ids = [
+                task_id for task_id in task_ids if self._entries.pop(task_id, None) is not None
+            ]
+            if removed_ids:
+                self._vectorstore.delete(ids=removed_ids)
+                for task_id in removed_ids:
+                    self._name_index.remove(task_id)
+                    self._lexical_index.remove(task_id)
+                self._task_table.remove_many(removed_ids)
+                self._save_manifest()
+
+    def _sync(
+        self,
+        pages: Iterable[Sequence[tuple[Task, str | None]]],
+        prefetch: int,
+        remove_missing: bool,
+    ) -> IndexSyncSummary:
+        start = time.perf_counter()
+        summary = IndexSyncSummary()
+        board_ids: set[str] = set()
+
+        def changed_tasks() -> Iterator[tuple[str, _PendingTask]]:
+            for page in _prefetched(pages, size=prefetch):
+                for task, last_edited_time in page:
+                    board_ids.add(task.id)
+                    previous_entry = self._entries.get(task.id)
+                    if (
+                        remove_missing
+                        and previous_entry is not None
+                        and last_edited_time is not None
+                        and previous_entry.last_edited_time == last_edited_time
+                        and previous_entry.to_task(task.id) is not None
+                    ):
+                        summary.skipped += 1
+                    elif (
+                        pending_task := self._pending_task(task, last_edited_time=last_edited_time)
+                    ) is None:
+                        summary.skipped += 1
+                    else:
+                        yield task.as_text(), pending_task
+
+        def write_batch(pending_tasks: list[_PendingTask], vectors: list[list[float]]) -> None:
+            self._write_batch(pending_tasks, vectors)
+            summary.updated += sum(pending_task.replaced for pending_task in pending_tasks)
+            summary.added += sum(not pending_task.replaced for pending_task in pending_tasks)
+            if summary.first_batch_duration is None:
+                summary.first_batch_duration = time.perf_counter() - start
+
+        try:
+            self._embedding_pipeline.run(changed_tasks(), write=write_batch)
+        except EmbeddingPipelineError as error:
+            # Every page was read, the failed tasks are left for the next sync.
+            logger.warning("Task index sync incomplete: %s", error)
+            summary.failed = error.progress.failed_texts
+        except BaseException:
+            # Batches written before the failure stay recorded, the next sync skips them.
+            self._save_manifest()
+            raise
+
+        removed_ids = (
+            [task_id for task_id in self._entries if task_id not in board_ids]
+            if remove_missing
+            else []
+        )
+        if removed_ids:
+            self._vectorstore.delete(ids=removed_ids)
+            for task_id in removed_ids:
+                del self._entries[task_id]
+                self._name_index.remove(task_id)
+                self._lexical_index.remove(task_id)
+            self._task_table.remove_many(removed_ids)
+            summary.removed = len(removed_ids)
+
+        self._save_manifest()
+
+        summary.duration = time.perf_counter() - start
+        self.last_sync_summary = summary
+        return summary
+
+    def _pending_task(self, task: Task, last_edited_time: str | None) -> _PendingTask | None:
+        """The task to embed, None when its text is indexed already and only the entry changed."""
+        entry = self._create_entry(task, last_edited_time=last_edited_time)
+        previous_entry = self._entries.get(task.id)
+        if previous_entry is not None and previous_entry.content_hash == entry.content_hash:
+            self._record(task, entry)
+            return None
+        return _PendingTask(task=task, entry=entry, replaced=previous_entry is not None)
+
+    def _write_batch(self, pending_tasks: list[_PendingTask], vectors: list[list[float]]) -> None:
+        # Previous versions are removed explicitly as not every vectorstore supports upserts.
+        replaced_ids = [
+            pending_task.task.id for pending_task in pending_tasks if pending_task.replaced
+        ]
+        if replaced_ids:
+            self._vectorstore.delete(ids=replaced_ids)
+
+        tasks = [pending_task.task for pending_task in pending_tasks]
+        _add_embedded(self._vectorstore, tasks, vectors)
+        # Entries are recorded once their vectors are written, a checkpoint never skips a task
+        # that isn't searchable.
+        for pending_task in pending_tasks:
+            self._record(pending_task.task, pending_task.entry)
+        if time.monotonic() - self._saved_at >= _CHECKPOINT_INTERVAL:
+            self._save_manifest()
+
+    def _record(self, task: Task, entry: IndexEntry) -> None:
+        self._entries[task.id] = entry
+        self._name_index.add(task.id, task.title)
+        self._lexical_index.add(task.id, task.as_text(), task.as_metadata())
+        self._task_table.upsert(task)
+
+    def _load_manifest(self) -> dict[str, IndexEntry]:
+        if self._manifest_path is None or not self._manifest_path.exists():
+            return {}
+
+        raw_entries = json.loads(self._manifest_path.read_text(encoding='utf-8'))
+        return {task_id: IndexEntry.parse_obj(entry) for task_id, entry in raw_entries.items()}
+
+    def _save_manifest(self) -> None:
+        self._saved_at = time.monotonic()
+        # Stores saving their changes on demand, like the flat store, are saved first so the
+        # manifest never lists a task whose vector wasn't saved.
+        if (flush := getattr(self._vectorstore, 'flush', None)) is not None:
+            flush()
+        if self._manifest_path is None:
+            return
+
+        self._manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._manifest_path.with_suffix('.tmp')
+        tmp_path.write_text(
+            json.dumps({task_id: entry.dict() for task_id, entry in self._entries.items()}),
+            encoding='utf-8',
+        )
+        tmp_path.replace(self._manifest_path)
+
+    @staticmethod
+    def _create_entry(task: Task, last_edited_time: str | None) -> IndexEntry:
+        return IndexEntry(
+            last_edited_time=last_edited_time,
+            content_hash=hashlib.sha256(task.as_text().encode('utf-8')).hexdigest(),
+            title=task.title,
+            status=task.status.value,
+            priority=task.priority.value,
+            work_estimation=task.work_estimation,
+        )
+
+
+def _add_embedded(vectorstore: VectorStore, tasks: list[Task], vectors: list[list[float]]) -> None:
+    texts = [task.as_text() for task in tasks]
+    metadatas = [task.as_metadata() for task in tasks]
+    ids = [task.id for task in tasks]
+    # The flat store and FAISS add precomputed vectors.
+    if (add_embeddings := getattr(vectorstore, 'add_embeddings', None)) is not None:
+        add_embeddings(zip(texts, vectors), metadatas=metadatas, ids=ids)
+    elif (collection := getattr(vectorstore, '_collection', None)) is not None:
+        # Chroma has no public method adding precomputed vectors, its collection does.
+        collection.upsert(ids=ids, embeddings=vectors, documents=texts, metadatas=metadatas)
+    else:
+        # Other stores embed the texts again, a cache in front of the model makes it a lookup.
+        vectorstore.add_texts(texts=texts, metadatas=metadatas, ids=ids)
+
+
+def _prefetched(pages: Iterable[_Page], size: int) -> Iterator[_Page]:
+    """Iterates `pages` in a background thread, keeping up to `size` pages ready."""
+    if size < 1:
+        yield from pages
+        return
+
+    queue: Queue[Any] = Queue(maxsize=size)
+    stopped = threading.Event()
+
+    def put(item: Any) -> bool:
+        # Waits for room in the queue until the consumer stops reading.
+        while not stopped.is_set():
+            try:
+                queue.put(item, timeout=_PREFETCH_POLL_INTERVAL)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for page in pages:
+                if not put(page):
+                    return
+        except BaseException as error:
+            put(_PrefetchError(error))
+        else:
+            put(_END)
+
+    # The producer keeps the context of the caller, e.g. the session requests are scheduled for.
+    threading.Thread(target=copy_context().run, args=(produce,), daemon=True).start()
+    try:
+        while (item := queue.get()) is not _END:
+            if isinstance(item, _PrefetchError):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+
+
+class _PrefetchError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_END = object()
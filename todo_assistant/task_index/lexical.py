@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any
+
+from langchain_core.documents import Document
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class BM25Index:
+    """In-memory BM25 index over the texts of board tasks.
+
+    Postings hold the term frequencies of every document and are updated in place when a document
+    is added, replaced or removed, statistics of the collection are kept as running totals, so
+    changes never rebuild the index. Searches are answered without leaving the process.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self._k1 = k1
+        self._b = b
+        self._documents: dict[str, Document] = {}
+        self._term_frequencies: dict[str, Counter[str]] = {}
+        self._lengths: dict[str, int] = {}
+        self._postings: defaultdict[str, dict[str, int]] = defaultdict(dict)
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, document_id: str, text: str, metadata: dict[str, Any] | None = None) -> None:
+        tokens = tokenize(text)
+        term_frequencies = Counter(tokens)
+        with self._lock:
+            self._discard(document_id)
+            self._documents[document_id] = Document(page_content=text, metadata=metadata or {})
+            self._term_frequencies[document_id] = term_frequencies
+            self._lengths[document_id] = len(tokens)
+            for term, frequency in term_frequencies.items():
+                self._postings[term][document_id] = frequency
+            self._total_length += len(tokens)
+
+    def remove(self, document_id: str) -> None:
+        with self._lock:
+            self._discard(document_id)
+
+    def search(self, query: str, k: int = 4) -> list[tuple[Document, float]]:
+        """Documents sharing terms with `query`, best BM25 score first."""
+        terms = set(tokenize(query))
+        with self._lock:
+            if not self._documents:
+                return []
+
+            document_count = len(self._documents)
+            average_length = self._total_length / document_count
+            scores: defaultdict[str, float] = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for document_id, frequency in postings.items():
+                    length = self._lengths[document_id]
+                    norm = self._k1 * (1 - self._b + self._b * length / average_length)
+                    scores[document_id] += idf * frequency * (self._k1 + 1) / (frequency + norm)
+
+            best_ids = heapq.nlargest(k, scores, key=lambda document_id: scores[document_id])
+            return [(self._documents[document_id], scores[document_id]) for document_id in best_ids]
+
+    def _discard(self, document_id: str) -> None:
+        if (term_frequencies := self._term_frequencies.pop(document_id, None)) is None:
+            return
+
+        del self._documents[document_id]
+        for term in term_frequencies:
+            postings = self._postings[term]
+            del postings[document_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(document_id)
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_PATTERN.findall(text.casefold())
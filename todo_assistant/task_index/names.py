@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import re
+import threading
+from collections import Counter, defaultdict
+
+from pydantic import BaseModel
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_QUOTES = "\"'`“”‘’"
+_PREFIX_SCORE = 0.9
+
+
+class TaskNameMatch(BaseModel):
+    task_id: str
+    name: str
+    score: float
+
+
+class TaskNameIndex:
+    """In-memory index of task names supporting exact, prefix and fuzzy lookups.
+
+    Names are normalized (case, surrounding quotes and whitespace) before being indexed, lookups
+    never leave the process. Fuzzy lookups score only the names sharing enough character bigrams
+    with the query, found through an inverted index kept up to date as names are added and
+    removed, instead of every name of the board.
+    """
+
+    def __init__(self) -> None:
+        self._names: dict[str, str] = {}
+        self._ids_by_key: defaultdict[str, set[str]] = defaultdict(set)
+        self._sorted_keys: list[str] = []
+        self._bigrams: dict[str, Counter[str]] = {}
+        # Names by the bigrams they contain and their length.
+        self._postings: defaultdict[tuple[str, int], dict[str, int]] = defaultdict(dict)
+        self._keys_by_length: defaultdict[int, set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, task_id: str, name: str) -> None:
+        with self._lock:
+            self._discard(task_id)
+            key = normalize_task_name(name)
+            self._names[task_id] = name
+            if not self._ids_by_key[key]:
+                bisect.insort(self._sorted_keys, key)
+                self._bigrams[key] = _bigrams(key)
+                for bigram, count in self._bigrams[key].items():
+                    self._postings[bigram, len(key)][key] = count
+                self._keys_by_length[len(key)].add(key)
+            self._ids_by_key[key].add(task_id)
+
+    def remove(self, task_id: str) -> None:
+        with self._lock:
+            self._discard(task_id)
+
+    def search(self, name: str, limit: int = 5) -> list[TaskNameMatch]:
+        query = normalize_task_name(name)
+        if not query:
+            return []
+
+        with self._lock:
+            scores = self._exact_scores(query) or (
+                self._prefix_scores(query) | self._fuzzy_scores(query, limit)
+            )
+            best_keys = heapq.nsmallest(limit, scores, key=lambda key: (-scores[key], key))
+            matches = [
+                TaskNameMatch(task_id=task_id, name=self._names[task_id], score=scores[key])
+                for key in best_keys
+                for task_id in sorted(self._ids_by_key[key])
+            ]
+
+        return matches[:limit]
+
+    def _exact_scores(self, query: str) -> dict[str, float]:
+        return {query: 1.0} if self._ids_by_key.get(query) else {}
+
+    def _prefix_scores(self, query: str) -> dict[str, float]:
+        scores = {}
+        position = bisect.bisect_left(self._sorted_keys, query)
+        while position < len(self._sorted_keys) and self._sorted_keys[position].startswith(query):
+            key = self._sorted_keys[position]
+            scores[key] = _PREFIX_SCORE * len(query) / len(key)
+            position += 1
+        return scores
+
+    def _fuzzy_scores(self, query: str, limit: int) -> dict[str, float]:
+        max_distance = max(1, len(query) // 4)
+        lengths = range(max(1, len(query) - max_distance), len(query) + max_distance + 1)
+        shared_bigrams: defaultdict[str, int] = defaultdict(int)
+        for bigram, count in _bigrams(query).items():
+            for length in lengths:
+                for key, key_count in self._postings.get((bigram, length), {}).items():
+                    shared_bigrams[key] += min(count, key_count)
+        # Names too short to share any bigram are candidates by their length.
+        for length in lengths:
+            if max(len(query), length) - 1 - 2 * max_distance <= 0:
+                for key in self._keys_by_length.get(length, ()):
+                    shared_bigrams.setdefault(key, 0)
+
+        # Every edit breaks at most two bigrams, the shared ones bound the distance of a name.
+        # Names are scored from the best bound down until none left can beat the `limit` best.
+        bounds = []
+        for key, shared in shared_bigrams.items():
+            longest = max(len(query), len(key))
+            if shared < longest - 1 - 2 * max_distance:
+                continue
+            min_distance = max(abs(len(key) - len(query)), (longest - shared) // 2)
+            bounds.append((1.0 - min_distance / longest, key))
+        bounds.sort(key=lambda bound: (-bound[0], bound[1]))
+
+        scores: dict[str, float] = {}
+        best: list[tuple[float, str]] = []
+        for bound, key in bounds:
+            # Ties are ranked by name, like the results of `search`.
+            if len(best) >= limit and (-bound, key) > best[-1]:
+                break
+            distance = _bounded_edit_distance(query, key, max_distance)
+            if distance is None:
+                continue
+            scores[key] = 1.0 - distance / max(len(query), len(key))
+            bisect.insort(best, (-scores[key], key))
+            del best[limit:]
+        return scores
+
+    def _discard(self, task_id: str) -> None:
+        if (name := self._names.pop(task_id, None)) is None:
+            return
+
+        key = normalize_task_name(name)
+        self._ids_by_key[key].discard(task_id)
+        if not self._ids_by_key[key]:
+            del self._ids_by_key[key]
+            for bigram in self._bigrams.pop(key):
+                postings = self._postings[bigram, len(key)]
+                del postings[key]
+                if not postings:
+                    del self._postings[bigram, len(key)]
+            self._keys_by_length[len(key)].discard(key)
+            if not self._keys_by_length[len(key)]:
+                del self._keys_by_length[len(key)]
+            self._sorted_keys.pop(bisect.bisect_left(self._sorted_keys, key))
+
+
+def normalize_task_name(name: str) -> str:
+    return _WHITESPACE_PATTERN.sub(" ", name.strip().strip(_QUOTES).strip()).casefold()
+
+
+def _bigrams(text: str) -> Counter[str]:
+    return Counter(text[i : i + 2] for i in range(len(text) - 1))
+
+
+def _bounded_edit_distance(first: str, second: str, max_distance: int) -> int | None:
+    """Levenshtein distance between strings or None when it exceeds `max_distance`.
+
+    Only the diagonal band of width `2 * max_distance + 1` is computed.
+    """
+    if abs(len(first) - len(second)) > max_distance:
+        return None
+
+    out_of_band = max_distance + 1
+    previous_row = [min(j, out_of_band) for j in range(len(second) + 1)]
+    for i, first_char in enumerate(first, start=1):
+        start, end = max(1, i - max_distance), min(len(second), i + max_distance)
+        current_row = [out_of_band] * (len(second) + 1)
+        current_row[0] = min(i, out_of_band)
+        row_minimum = current_row[start - 1]
+        for j in range(start, end + 1):
+            cost = previous_row[j - 1] + (first_char != second[j - 1])
+            if previous_row[j] + 1 < cost:
+                cost = previous_row[j] + 1
+            if current_row[j - 1] + 1 < cost:
+                cost = current_row[j - 1] + 1
+            current_row[j] = cost
+            if cost < row_minimum:
+                row_minimum = cost
+        if row_minimum > max_distance:
+            return None
+        previous_row = current_row
+
+    distance = previous_row[-1]
+    return distance if distance <= max_distance else None
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import Callable, Generic, Iterable, Iterator, TypeVar
+
+from langchain_core.embeddings import Embeddings
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+_Item = TypeVar('_Item')
+
+
+class EmbeddingProgress(BaseModel):
+    """Progress of an embedding run, `total_texts` is unknown while the input is streamed."""
+
+    completed_batches: int = 0
+    failed_batches: int = 0
+    embedded_texts: int = 0
+    failed_texts: int = 0
+    total_texts: int | None = None
+    retries: int = 0
+    duration: float = 0.0
+
+    @property
+    def texts_per_second(self) -> float:
+        return self.embedded_texts / self.duration if self.duration else 0.0
+
+    def __str__(self) -> str:
+        total = f"/{self.total_texts}" if self.total_texts is not None else ""
+        return (
+            f"embedded={self.embedded_texts}{total} failed={self.failed_texts}"
+            f" batches={self.completed_batches} retries={self.retries}"
+            f" in {self.duration:.2f}s"
+        )
+
+
+class EmbeddingPipelineError(Exception):
+    """Raised after a run in which some batches failed, every other batch was written."""
+
+    def __init__(self, progress: EmbeddingProgress, errors: list[BaseException]):
+        super().__init__(
+            f"{progress.failed_batches} embedding batches failed"
+            f" ({progress.failed_texts} texts), last error: {errors[-1]!r}"
+        )
+        self.progress = progress
+        self.errors = errors
+
+
+class _Batch(Generic[_Item]):
+    def __init__(self, items: list[tuple[str, _Item]]):
+        self.texts = [text for text, _ in items]
+        self.items = [item for _, item in items]
+
+
+class EmbeddingPipeline:
+    """Embeds texts of index builds in batches, several batches at once.
+
+    Up to `concurrency` batches of `batch_size` texts are embedded by worker threads while the
+    input is still being read, so a streamed board is embedded as it downloads. Every embedded
+    batch is handed to `write` in the calling thread, the vector store never sees concurrent
+    writes and the caller can checkpoint after every batch to resume an interrupted build. A
+    failing batch is retried on its own with jittered exponential backoff, a batch failing
+    `max_retries` times doesn't stop the others and is reported by `EmbeddingPipelineError` once
+    the run finishes. `progress_callback` is called after every completed or failed batch.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        progress_callback: Callable[[EmbeddingProgress], None] | None = None,
+    ):
+        if batch_size < 1 or concurrency < 1:
+            raise ValueError("batch_size and concurrency must be at least 1")
+        self._embeddings = embeddings
+        self._batch_size = batch_size
+        self._concurrency = concurrency
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._backoff_cap = backoff_cap
+        self._progress_callback = progress_callback
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embeddings
+
+    def run(
+        self,
+        items: Iterable[tuple[str, _Item]],
+        write: Callable[[list[_Item], list[list[float]]], None],
+        total_texts: int | None = None,
+    ) -> EmbeddingProgress:
+        """Embed the text of every `(text, item)` pair and write the items with their vectors."""
+        start = time.perf_counter()
+        progress = EmbeddingProgress(total_texts=total_texts)
+        errors: list[BaseException] = []
+        retries_lock = threading.Lock()
+
+        def embed(texts: list[str]) -> list[list[float]]:
+            attempt = 0
+            while True:
+                try:
+                    return self._embeddings.embed_documents(texts)
+                except Exception as error:
+                    if attempt >= self._max_retries:
+                        raise
+                    delay = random.uniform(
+                        0, min(self._backoff_cap, self._backoff_base * 2**attempt)
+                    )
+                    logger.debug("Embedding batch failed (%r), retrying in %.2fs", error, delay)
+                    with retries_lock:
+                        progress.retries += 1
+                    time.sleep(delay)
+                    attempt += 1
+
+        def collect(futures: Iterable[Future[list[list[float]]]]) -> None:
+            for future in futures:
+                batch = pending.pop(future)
+                try:
+                    vectors = future.result()
+                except Exception as error:
+                    logger.warning(
+                        "Embedding batch of %d texts failed: %r", len(batch.texts), error
+                    )
+                    errors.append(error)
+                    progress.failed_batches += 1
+                    progress.failed_texts += len(batch.texts)
+                else:
+                    write(batch.items, vectors)
+                    progress.completed_batches += 1
+                    progress.embedded_texts += len(batch.texts)
+                progress.duration = time.perf_counter() - start
+                if self._progress_callback is not None:
+                    self._progress_callback(progress.copy())
+
+        pending: dict[Future[list[list[float]]], _Batch[_Item]] = {}
+        with ThreadPoolExecutor(
+            max_workers=self._concurrency, thread_name_prefix='embedding'
+        ) as executor:
+            try:
+                for batch in self._batches(items):
+                    # Batches done while the input was read are written right away.
+                    collect([future for future in pending if future.done()])
+                    if len(pending) >= self._concurrency:
+                        collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                    # Workers keep the context of the caller, e.g. its tracing callbacks.
+                    pending[executor.submit(copy_context().run, embed, batch.texts)] = batch
+                while pending:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        progress.duration = time.perf_counter() - start
+        if errors:
+            raise EmbeddingPipelineError(progress, errors)
+        return progress
+
+    def _batches(self, items: Iterable[tuple[str, _Item]]) -> Iterator[_Batch[_Item]]:
+        batch: list[tuple[str, _Item]] = []
+        for item in items:
+            batch.append(item)
+            if len(batch) == self._batch_size:
+                yield _Batch(batch)
+                batch = []
+        if batch:
+            yield _Batch(batch)
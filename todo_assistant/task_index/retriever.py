@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+
+from todo_assistant.task_index.lexical import BM25Index
+
+RetrievalMode = Literal['hybrid', 'lexical', 'vector']
+
+
+class HybridTaskRetriever(BaseRetriever):
+    """Retrieves tasks by fusing a BM25 ranking with a vector similarity ranking.
+
+    Both rankings contribute `fetch_k` candidates, which are merged with reciprocal-rank fusion
+    on the task id and cut to the best `k`. The `lexical` mode ranks with BM25 only and never
+    calls the embedding model, the `vector` mode keeps the plain similarity search.
+    """
+
+    lexical_index: BM25Index
+    vectorstore: VectorStore
+    k: int = 4
+    fetch_k: int = 10
+    mode: RetrievalMode = 'hybrid'
+    # Damps the weight of top ranks, 60 is the constant of the original fusion paper.
+    rrf_k: int = 60
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        lexical_documents = self._lexical_search(query)
+        if self.mode == 'lexical':
+            return lexical_documents[: self.k]
+        vector_documents = self.vectorstore.similarity_search(query, k=self._fetch_k)
+        return self._fuse(lexical_documents, vector_documents)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        lexical_documents = self._lexical_search(query)
+        if self.mode == 'lexical':
+            return lexical_documents[: self.k]
+        vector_documents = await self.vectorstore.asimilarity_search(query, k=self._fetch_k)
+        return self._fuse(lexical_documents, vector_documents)
+
+    @property
+    def _fetch_k(self) -> int:
+        return max(self.fetch_k, self.k)
+
+    def _lexical_search(self, query: str) -> list[Document]:
+        if self.mode == 'vector':
+            return []
+        return [document for document, _ in self.lexical_index.search(query, k=self._fetch_k)]
+
+    def _fuse(
+        self, lexical_documents: list[Document], vector_documents: list[Document]
+    ) -> list[Document]:
+        scores: dict[str, float] = {}
+        documents: dict[str, Document] = {}
+        for ranking in (lexical_documents, vector_documents):
+            for rank, document in enumerate(ranking, start=1):
+                task_id = document.metadata.get('id', document.page_content)
+                scores[task_id] = scores.get(task_id, 0.0) + 1.0 / (self.rrf_k + rank)
+                documents.setdefault(task_id, document)
+
+        best_ids = sorted(scores, key=lambda task_id: scores[task_id], reverse=True)[: self.k]
+        return [documents[task_id] for task_id in best_ids]
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import itertools
+import threading
+from array import array
+from enum import Enum
+from typing import Iterable, Literal, Sequence
+
+from pydantic import BaseModel, Field
+
+from todo_assistant.entities.task import Task, TaskPriority, TaskStatus
+
+_STATUSES = list(TaskStatus)
+_PRIORITIES = list(TaskPriority)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+_PRIORITY_CODES = {priority: code for code, priority in enumerate(_PRIORITIES)}
+
+AggregateOperation = Literal['count', 'sum', 'avg', 'min', 'max']
+GroupByColumn = Literal['status', 'priority']
+
+
+class TaskAggregateQuery(BaseModel):
+    """Aggregate over all tasks of the board matching every given filter."""
+
+    operation: AggregateOperation = Field(
+        'count',
+        description="count counts tasks, sum, avg, min and max aggregate their work estimation",
+    )
+    group_by: list[GroupByColumn] = Field(
+        default_factory=list, description="Columns to break the result down by"
+    )
+    status: list[TaskStatus] | None = Field(
+        None, description="Keep only tasks with one of these statuses"
+    )
+    priority: list[TaskPriority] | None = Field(
+        None, description="Keep only tasks with one of these priorities"
+    )
+    min_work_estimation: int | None = Field(
+        None, description="Keep only tasks with at least this work estimation"
+    )
+    max_work_estimation: int | None = Field(
+        None, description="Keep only tasks with at most this work estimation"
+    )
+
+
+class TaskAggregateGroup(BaseModel):
+    key: dict[str, str] = {}
+    count: int = 0
+    # Aggregated work estimation, None for `count` queries and for empty groups.
+    value: float | None = None
+
+
+class TaskAggregateResult(BaseModel):
+    query: TaskAggregateQuery
+    groups: list[TaskAggregateGroup]
+
+    def __str__(self) -> str:
+        filters = [
+            f"{column} in [{', '.join(value.value for value in values)}]"
+            for column, values in (('status', self.query.status), ('priority', self.query.priority))
+            if values is not None
+        ]
+        if self.query.min_work_estimation is not None:
+            filters.append(f"work estimation >= {self.query.min_work_estimation}")
+        if self.query.max_work_estimation is not None:
+            filters.append(f"work estimation <= {self.query.max_work_estimation}")
+
+        subject = "tasks" if self.query.operation == 'count' else "work estimation of tasks"
+        header = f"{self.query.operation} of {subject}"
+        if filters:
+            header += f" where {' and '.join(filters)}"
+
+        if not self.query.group_by:
+            return f"{header}: {self._format(self.groups[0])}"
+        lines = [f"{header}, by {', '.join(self.query.group_by)}:"]
+        for group in self.groups:
+            key = ", ".join(f"{column}={value}" for column, value in group.key.items())
+            lines.append(f"- {key}: {self._format(group)}")
+        return "\n".join(lines)
+
+    def _format(self, group: TaskAggregateGroup) -> str:
+        if self.query.operation == 'count':
+            return str(group.count)
+        value = "n/a" if group.value is None else f"{group.value:g}"
+        return f"{value} ({group.count} tasks)"
+
+
+class _Accumulator:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self.minimum: int | None = None
+        self.maximum: int | None = None
+
+    def add(self, work_estimation: int) -> None:
+        self.count += 1
+        self.total += work_estimation
+        if self.minimum is None or work_estimation < self.minimum:
+            self.minimum = work_estimation
+        if self.maximum is None or work_estimation > self.maximum:
+            self.maximum = work_estimation
+
+    def value(self, operation: AggregateOperation) -> float | None:
+        if operation == 'count':
+            return None
+        if operation == 'sum':
+            return self.total
+        if self.count == 0:
+            return None
+        if operation == 'avg':
+            return self.total / self.count
+        return self.minimum if operation == 'min' else self.maximum
+
+
+class TaskTable:
+    """In-memory columnar table of the status, priority and work estimation of board tasks.
+
+    Every column is a compact array indexed by row, status and priority are stored as codes of
+    their enum members. Aggregates scan only the columns a query filters, groups or aggregates
+    by, so board-wide questions are answered exactly and without leaving the process.
+    """
+
+    def __init__(self) -> None:
+        self._rows: dict[str, int] = {}
+        self._ids: list[str] = []
+        self._statuses = array('B')
+        self._priorities = array('B')
+        self._work_estimations = array('q')
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def upsert(self, task: Task) -> None:
+        self.upsert_many([task])
+
+    def upsert_many(self, tasks: Iterable[Task]) -> None:
+        with self._lock:
+            for task in tasks:
+                status, priority = _STATUS_CODES[task.status], _PRIORITY_CODES[task.priority]
+                row = self._rows.get(task.id)
+                if row is None:
+                    self._rows[task.id] = len(self._ids)
+                    self._ids.append(task.id)
+                    self._statuses.append(status)
+                    self._priorities.append(priority)
+                    self._work_estimations.append(task.work_estimation)
+                else:
+                    self._statuses[row] = status
+                    self._priorities[row] = priority
+                    self._work_estimations[row] = task.work_estimation
+
+    def remove(self, task_id: str) -> None:
+        self.remove_many([task_id])
+
+    def remove_many(self, task_ids: Iterable[str]) -> None:
+        with self._lock:
+            for task_id in task_ids:
+                if (row := self._rows.pop(task_id, None)) is None:
+                    continue
+                # The last row moves into the gap, the columns stay dense.
+                last_row = len(self._ids) - 1
+                if row != last_row:
+                    last_id = self._ids[last_row]
+                    self._ids[row] = last_id
+                    self._statuses[row] = self._statuses[last_row]
+                    self._priorities[row] = self._priorities[last_row]
+                    self._work_estimations[row] = self._work_estimations[last_row]
+                    self._rows[last_id] = row
+                self._ids.pop()
+                self._statuses.pop()
+                self._priorities.pop()
+                self._work_estimations.pop()
+
+    def aggregate(self, query: TaskAggregateQuery) -> TaskAggregateResult:
+        columns: dict[str, array[int]] = {'status': self._statuses, 'priority': self._priorities}
+        members: dict[str, Sequence[Enum]] = {'status': _STATUSES, 'priority': _PRIORITIES}
+        filters = {
+            'status': {_STATUS_CODES[status] for status in query.status or ()},
+            'priority': {_PRIORITY_CODES[priority] for priority in query.priority or ()},
+        }
+        filtered = {
+            'status': query.status is not None,
+            'priority': query.priority is not None,
+        }
+        group_by = list(dict.fromkeys(query.group_by))
+
+        # Every combination of group values allowed by the filters is reported, empty ones too.
+        group_codes = [
+            [
+                code
+                for code in range(len(members[column]))
+                if not filtered[column] or code in filters[column]
+            ]
+            for column in group_by
+        ]
+        accumulators = {key: _Accumulator() for key in itertools.product(*group_codes)}
+
+        with self._lock:
+            rows: Iterable[int] = range(len(self._ids))
+            for column in ('status', 'priority'):
+                if filtered[column]:
+                    codes, values = filters[column], columns[column]
+                    rows = [row for row in rows if values[row] in codes]
+            work_estimations = self._work_estimations
+            if query.min_work_estimation is not None:
+                minimum = query.min_work_estimation
+                rows = [row for row in rows if work_estimations[row] >= minimum]
+            if query.max_work_estimation is not None:
+                maximum = query.max_work_estimation
+                rows = [row for row in rows if work_estimations[row] <= maximum]
+
+            group_columns = [columns[column] for column in group_by]
+            for row in rows:
+                key = tuple(values[row] for values in group_columns)
+                accumulators[key].add(work_estimations[row])
+
+        return TaskAggregateResult(
+            query=query,
+            groups=[
+                TaskAggregateGroup(
+                    key={
+                        column: members[column][code].value for column, code in zip(group_by, key)
+                    },
+                    count=accumulator.count,
+                    value=accumulator.value(query.operation),
+                )
+                for key, accumulator in accumulators.items()
+            ],
+        )
@@ -0,0 +1,30 @@
+from typing import Any, Type
+
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel
+
+from todo_assistant.task_index import TaskAggregateQuery, TaskTable
+
+
+class TaskAggregateTool(BaseTool):
+    name = "todo_aggregate"
+    description = (
+        "Useful when you need exact numbers about the whole board or many tasks: counts of tasks,"
+        " total, average, minimum or maximum work estimation, optionally filtered and broken down"
+        " by status or priority"
+    )
+    args_schema: Type[BaseModel] = TaskAggregateQuery
+    task_table: TaskTable
+
+    def _run(self, run_manager: CallbackManagerForToolRun | None = None, **query: Any) -> str:
+        return self._aggregate(query)
+
+    async def _arun(
+        self, run_manager: AsyncCallbackManagerForToolRun | None = None, **query: Any
+    ) -> str:
+        # In-memory scan, cheaper than a hop to the executor.
+        return self._aggregate(query)
+
+    def _aggregate(self, query: dict[str, Any]) -> str:
+        return str(self.task_table.aggregate(TaskAggregateQuery.parse_obj(query)))
@@ -1,13 +1,12 @@
 from typing import Type
 
-from langchain.callbacks.manager import CallbackManagerForToolRun
-from langchain.tools import BaseTool
-from langchain_core.vectorstores import VectorStore
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_core.tools import BaseTool
 from pydantic.fields import Field
 from pydantic.main import BaseModel
 
 from todo_assistant.api_clients.base import BaseTaskAPIClient
-from todo_assistant.entities.task import CreateTaskRequest, TaskPriority, TaskStatus
+from todo_assistant.tools.api_calls.task_params import create_task_request
 
 
 class AddTaskInput(BaseModel):
@@ -23,18 +22,18 @@ class AddTaskTool(BaseTool):
     description = "Useful when you want to add new task to tasks board"
     args_schema: Type[BaseModel] = AddTaskInput
     task_api_client: BaseTaskAPIClient
-    vectorstore: VectorStore
 
     def _run(
         self, task_name: str, task_params: str, run_manager: CallbackManagerForToolRun | None = None
     ) -> str:
-        task = self.task_api_client.add(
-            task_to_create=CreateTaskRequest(
-                title=task_name,
-                priority=TaskPriority.MEDIUM,
-                work_estimation=1,
-                status=TaskStatus.NOT_STARTED,
-            )
-        )
-        self.vectorstore.add_texts(texts=[task.as_text()], metadatas=[task.as_metadata()])
+        task = self.task_api_client.add(task_to_create=create_task_request(task_name))
+        return f"Added \"{task_name}\" task to board with id=\"{task.id}\""
+
+    async def _arun(
+        self,
+        task_name: str,
+        task_params: str,
+        run_manager: AsyncCallbackManagerForToolRun | None = None,
+    ) -> str:
+        task = await self.task_api_client.aadd(task_to_create=create_task_request(task_name))
         return f"Added \"{task_name}\" task to board with id=\"{task.id}\""
@@ -0,0 +1,37 @@
+from typing import Type
+
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_core.tools import BaseTool
+from pydantic.fields import Field
+from pydantic.main import BaseModel
+
+from todo_assistant.api_clients.base import BaseTaskAPIClient
+from todo_assistant.tools.api_calls.bulk import format_results
+from todo_assistant.tools.api_calls.task_params import create_task_request
+
+
+class AddTasksInput(BaseModel):
+    task_names: list[str] = Field(description="The names of the tasks")
+
+
+class AddTasksTool(BaseTool):
+    name = "add_tasks"
+    description = "Useful when you want to add several new tasks to tasks board at once"
+    args_schema: Type[BaseModel] = AddTasksInput
+    task_api_client: BaseTaskAPIClient
+
+    def _run(
+        self, task_names: list[str], run_manager: CallbackManagerForToolRun | None = None
+    ) -> str:
+        results = self.task_api_client.add_many(
+            [create_task_request(task_name) for task_name in task_names]
+        )
+        return format_results("Added", results)
+
+    async def _arun(
+        self, task_names: list[str], run_manager: AsyncCallbackManagerForToolRun | None = None
+    ) -> str:
+        results = await self.task_api_client.aadd_many(
+            [create_task_request(task_name) for task_name in task_names]
+        )
+        return format_results("Added", results)
@@ -0,0 +1,45 @@
+from typing import Mapping, Sequence
+
+from todo_assistant.entities.task import TaskOperationResult
+from todo_assistant.task_index import TaskNameIndex
+
+
+def resolve_task_ids(
+    task_name_index: TaskNameIndex, task_names: Sequence[str]
+) -> tuple[dict[str, str], list[TaskOperationResult]]:
+    """Map task ids to the names they were found by, names without an exact match fail."""
+    task_names_by_id: dict[str, str] = {}
+    failures: list[TaskOperationResult] = []
+    for task_name in task_names:
+        exact_matches = [
+            match for match in task_name_index.search(task_name, limit=2) if match.score == 1.0
+        ]
+        if len(exact_matches) == 1:
+            task_names_by_id[exact_matches[0].task_id] = task_name
+        elif exact_matches:
+            failures.append(
+                TaskOperationResult(target=task_name, error="Several tasks have this name")
+            )
+        else:
+            failures.append(TaskOperationResult(target=task_name, error="No task with this name"))
+    return task_names_by_id, failures
+
+
+def format_results(
+    action: str,
+    results: Sequence[TaskOperationResult],
+    task_names_by_id: Mapping[str, str] | None = None,
+) -> str:
+    task_names_by_id = task_names_by_id or {}
+    succeeded = [result.task for result in results if result.task is not None]
+    failed = [result for result in results if result.task is None]
+
+    lines = [f"{action} {len(succeeded)} of {len(results)} tasks"]
+    lines += [f"- \"{task.title}\" id=\"{task.id}\"" for task in succeeded]
+    if failed:
+        lines.append("Failed:")
+        lines += [
+            f"- \"{task_names_by_id.get(result.target, result.target)}\": {result.error}"
+            for result in failed
+        ]
+    return "\n".join(lines)
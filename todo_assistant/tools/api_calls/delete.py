@@ -1,7 +1,7 @@
 from typing import Type
 
-from langchain.callbacks.manager import CallbackManagerForToolRun
-from langchain.tools import BaseTool
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 
 from todo_assistant.api_clients.base import BaseTaskAPIClient
@@ -20,3 +20,9 @@ class DeleteTaskTool(BaseTool):
     def _run(self, task_id: str, run_manager: CallbackManagerForToolRun | None = None) -> str:
         self.task_api_client.delete(task_id)
         return f"Removed task with id=\"{task_id}\""
+
+    async def _arun(
+        self, task_id: str, run_manager: AsyncCallbackManagerForToolRun | None = None
+    ) -> str:
+        await self.task_api_client.adelete(task_id)
+        return f"Removed task with id=\"{task_id}\""
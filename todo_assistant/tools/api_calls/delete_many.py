@@ -0,0 +1,35 @@
+from typing import Type
+
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from todo_assistant.api_clients.base import BaseTaskAPIClient
+from todo_assistant.task_index import TaskNameIndex
+from todo_assistant.tools.api_calls.bulk import format_results, resolve_task_ids
+
+
+class DeleteTasksInput(BaseModel):
+    task_names: list[str] = Field(description="The exact names of the tasks")
+
+
+class DeleteTasksTool(BaseTool):
+    name = "delete_tasks"
+    description = "useful when you want to delete several tasks from tasks board at once"
+    args_schema: Type[BaseModel] = DeleteTasksInput
+    task_api_client: BaseTaskAPIClient
+    task_name_index: TaskNameIndex
+
+    def _run(
+        self, task_names: list[str], run_manager: CallbackManagerForToolRun | None = None
+    ) -> str:
+        task_names_by_id, failures = resolve_task_ids(self.task_name_index, task_names)
+        results = self.task_api_client.delete_many(list(task_names_by_id))
+        return format_results("Removed", results + failures, task_names_by_id)
+
+    async def _arun(
+        self, task_names: list[str], run_manager: AsyncCallbackManagerForToolRun | None = None
+    ) -> str:
+        task_names_by_id, failures = resolve_task_ids(self.task_name_index, task_names)
+        results = await self.task_api_client.adelete_many(list(task_names_by_id))
+        return format_results("Removed", results + failures, task_names_by_id)
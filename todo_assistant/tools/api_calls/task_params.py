@@ -0,0 +1,31 @@
+import json
+
+from todo_assistant.entities.task import CreateTaskRequest, Task, TaskPriority, TaskStatus
+
+
+def create_task_request(task_name: str) -> CreateTaskRequest:
+    return CreateTaskRequest(
+        title=task_name,
+        priority=TaskPriority.MEDIUM,
+        work_estimation=1,
+        status=TaskStatus.NOT_STARTED,
+    )
+
+
+def update_task_params(task: Task, task_params: str) -> Task:
+    """Set the properties of the `task_params` json object on `task`.
+
+    Raises `ValueError` for invalid json, unknown properties and unknown statuses or priorities.
+    """
+    params = json.loads(task_params)
+    if not isinstance(params, dict):
+        raise ValueError("task_params must be a json object")
+    for param_name, param_value in params.items():
+        match param_name:
+            case 'status':
+                task.status = TaskStatus(str(param_value).capitalize())
+            case 'priority':
+                task.priority = TaskPriority(str(param_value).capitalize())
+            case _:
+                setattr(task, param_name, param_value)
+    return task
@@ -1,13 +1,12 @@
-import json
 from typing import Type
 
-from langchain.callbacks.manager import CallbackManagerForToolRun
-from langchain.tools import BaseTool
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_core.tools import BaseTool
 from pydantic.fields import Field
 from pydantic.main import BaseModel
 
 from todo_assistant.api_clients.base import BaseTaskAPIClient
-from todo_assistant.entities.task import TaskPriority, TaskStatus
+from todo_assistant.tools.api_calls.task_params import update_task_params
 
 
 class UpdateTaskInput(BaseModel):
@@ -30,14 +29,15 @@ class UpdateTaskTool(BaseTool):
         run_manager: CallbackManagerForToolRun | None = None,
     ) -> str:
         task = self.task_api_client.get_by_id(task_id)
-        for param_name, param_value in json.loads(task_params).items():
-            match param_name:
-                case 'status':
-                    task.status = TaskStatus(str(param_value).capitalize())
-                case 'priority':
-                    task.priority = TaskPriority(str(param_value).capitalize())
-                case _:
-                    setattr(task, param_name, param_value)
-
-        task = self.task_api_client.update(task)
+        task = self.task_api_client.update(update_task_params(task, task_params))
+        return f"Updated task with id=\"{task.id}\""
+
+    async def _arun(
+        self,
+        task_id: str,
+        task_params: str,
+        run_manager: AsyncCallbackManagerForToolRun | None = None,
+    ) -> str:
+        task = await self.task_api_client.aget_by_id(task_id)
+        task = await self.task_api_client.aupdate(update_task_params(task, task_params))
         return f"Updated task with id=\"{task.id}\""
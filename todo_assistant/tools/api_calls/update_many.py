@@ -0,0 +1,79 @@
+from typing import Type
+
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_core.tools import BaseTool
+from pydantic.fields import Field
+from pydantic.main import BaseModel
+
+from todo_assistant.api_clients.base import BaseTaskAPIClient
+from todo_assistant.entities.task import Task, TaskOperationResult
+from todo_assistant.task_index import TaskNameIndex
+from todo_assistant.tools.api_calls.bulk import format_results, resolve_task_ids
+from todo_assistant.tools.api_calls.task_params import update_task_params
+
+
+class UpdateTasksInput(BaseModel):
+    task_names: list[str] = Field(description="The exact names of the tasks")
+    task_params: str = Field(
+        description="Required json object containing properties to update for all of the tasks"
+    )
+
+
+class UpdateTasksTool(BaseTool):
+    name = "update_tasks"
+    description = (
+        "useful when you want to update the same properties of several tasks in tasks board at"
+        " once"
+    )
+    args_schema: Type[BaseModel] = UpdateTasksInput
+    task_api_client: BaseTaskAPIClient
+    task_name_index: TaskNameIndex
+
+    def _run(
+        self,
+        task_names: list[str],
+        task_params: str,
+        run_manager: CallbackManagerForToolRun | None = None,
+    ) -> str:
+        task_names_by_id, failures = resolve_task_ids(self.task_name_index, task_names)
+        fetched = self.task_api_client.get_many(list(task_names_by_id))
+        tasks, invalid = self._updated_tasks(fetched, task_params)
+        results = self.task_api_client.update_many(tasks)
+        return format_results(
+            "Updated", results + invalid + self._failed(fetched) + failures, task_names_by_id
+        )
+
+    async def _arun(
+        self,
+        task_names: list[str],
+        task_params: str,
+        run_manager: AsyncCallbackManagerForToolRun | None = None,
+    ) -> str:
+        task_names_by_id, failures = resolve_task_ids(self.task_name_index, task_names)
+        fetched = await self.task_api_client.aget_many(list(task_names_by_id))
+        tasks, invalid = self._updated_tasks(fetched, task_params)
+        results = await self.task_api_client.aupdate_many(tasks)
+        return format_results(
+            "Updated", results + invalid + self._failed(fetched) + failures, task_names_by_id
+        )
+
+    @staticmethod
+    def _updated_tasks(
+        fetched: list[TaskOperationResult], task_params: str
+    ) -> tuple[list[Task], list[TaskOperationResult]]:
+        tasks: list[Task] = []
+        invalid: list[TaskOperationResult] = []
+        for result in fetched:
+            if result.task is None:
+                continue
+            try:
+                tasks.append(update_task_params(result.task, task_params))
+            except ValueError as error:
+                invalid.append(
+                    TaskOperationResult(target=result.target, error=f"Invalid task_params: {error}")
+                )
+        return tasks, invalid
+
+    @staticmethod
+    def _failed(fetched: list[TaskOperationResult]) -> list[TaskOperationResult]:
+        return [result for result in fetched if result.task is None]
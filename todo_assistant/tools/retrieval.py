@@ -1,15 +1,17 @@
 from typing import Type
 
-from langchain import hub
-from langchain.callbacks.manager import CallbackManagerForToolRun
-from langchain.tools import BaseTool
-from langchain_community.chat_models import ChatLiteLLM
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_core.language_models import BaseChatModel
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.retrievers import BaseRetriever
 from langchain_core.runnables import Runnable, RunnablePassthrough
-from langchain_core.vectorstores import VectorStore
+from langchain_core.tools import BaseTool
 from pydantic.fields import Field
 from pydantic.main import BaseModel
 
+from todo_assistant.prompts import RAG_PROMPT
+
 
 class TODORetrievalInput(BaseModel):
     input: str = Field(description="Maximum one sentence, query you want to run with the task name")
@@ -25,19 +27,27 @@ class TODORetrievalTool(BaseTool):
     retrieval_chain: Runnable
 
     @classmethod
-    def from_llm_and_vectorstore(cls, llm: ChatLiteLLM, vectorstore: VectorStore):
-        retriever = vectorstore.as_retriever()
-        prompt = hub.pull("rlm/rag-prompt")
+    def from_llm_and_retriever(cls, llm: BaseChatModel, retriever: BaseRetriever):
+        prompt = ChatPromptTemplate.from_messages([("human", RAG_PROMPT.strip())])
 
-        retrieval_chain = (
+        retrieval_chain: Runnable = (
             {"context": retriever, "question": RunnablePassthrough()}
             | prompt
-            | llm
+            | llm.with_config({"run_name": "TODORetrieval_llm"})
             | StrOutputParser()
         )
 
         return TODORetrievalTool(retrieval_chain=retrieval_chain)
 
     def _run(self, input: str, run_manager: CallbackManagerForToolRun | None = None) -> str:
-        s = self.retrieval_chain.invoke(input)
+        s = self.retrieval_chain.invoke(
+            input, config={"callbacks": run_manager.get_child()} if run_manager else None
+        )
         return s
+
+    async def _arun(
+        self, input: str, run_manager: AsyncCallbackManagerForToolRun | None = None
+    ) -> str:
+        return await self.retrieval_chain.ainvoke(
+            input, config={"callbacks": run_manager.get_child()} if run_manager else None
+        )
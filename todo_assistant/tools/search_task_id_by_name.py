@@ -1,10 +1,13 @@
 from typing import Type
 
-from langchain_core.callbacks import CallbackManagerForToolRun
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
 from langchain_core.tools import BaseTool
-from langchain_core.vectorstores import VectorStore
 from pydantic import BaseModel, Field
 
+from todo_assistant.task_index import TaskNameIndex
+
+_MAX_CANDIDATES = 5
+
 
 class SearchTaskIDByNameInput(BaseModel):
     task_name: str = Field(description="The name of the task")
@@ -12,18 +15,44 @@ class SearchTaskIDByNameInput(BaseModel):
 
 class SearchTaskIDByNameTool(BaseTool):
     name = 'get_task_uuid'
-    description = "Useful when you want to find uuid of specific task"
+    description = (
+        "Useful when you want to find uuid of specific task. Returns the uuid of the task with"
+        " matching name, the ids of all tasks sharing the name or, when there is no exact match, the"
+        " best candidates with scores"
+    )
     args_schema: Type[BaseModel] = SearchTaskIDByNameInput
-    vectorstore: VectorStore
+    task_name_index: TaskNameIndex
 
     def _run(
         self, task_name: str, run_manager: CallbackManagerForToolRun | None = None
     ) -> str | None:
-        documents = self.vectorstore.search(
-            query='', search_type='similarity', k=1, filter={'name': {'$eq': task_name}}
-        )
+        return self._search(task_name)
+
+    async def _arun(
+        self, task_name: str, run_manager: AsyncCallbackManagerForToolRun | None = None
+    ) -> str | None:
+        # In-memory lookup, cheaper than a hop to the executor.
+        return self._search(task_name)
 
-        if documents:
-            return f"Task id: \"{documents[0].metadata['id']}\""
-        else:
+    def _search(self, task_name: str) -> str:
+        matches = self.task_name_index.search(task_name, limit=_MAX_CANDIDATES)
+
+        if not matches:
             return "<NO TASK FOUND>"
+
+        exact_matches = [match for match in matches if match.score == 1.0]
+        if len(exact_matches) == 1:
+            return f"Task id: \"{exact_matches[0].task_id}\""
+
+        if exact_matches:
+            # Tasks sharing the name are told apart by the user, not by the score.
+            candidates = "\n".join(
+                f"- \"{match.name}\" id=\"{match.task_id}\"" for match in exact_matches
+            )
+            return f"Several tasks are named \"{exact_matches[0].name}\":\n{candidates}"
+
+        candidates = "\n".join(
+            f"- \"{match.name}\" id=\"{match.task_id}\" score={match.score:.2f}"
+            for match in matches
+        )
+        return f"No exact match, candidate tasks:\n{candidates}"
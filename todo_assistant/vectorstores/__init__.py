@@ -0,0 +1,3 @@
+from todo_assistant.vectorstores.flat import FlatVectorStore
+
+__all__ = ['FlatVectorStore']
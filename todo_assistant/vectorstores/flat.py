@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping, Sequence
+from uuid import uuid4
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+_VECTORS_FILE = "vectors.npy"
+_DOCUMENTS_FILE = "documents.json"
+
+MetadataFilter = Mapping[str, Any]
+
+
+class FlatVectorStore(VectorStore):
+    """Vector store keeping normalized float32 embeddings in one contiguous matrix.
+
+    Searches score every row with a single matrix-vector product and select the top `k` with
+    `argpartition`, metadata is kept in columns so filters are vectorized comparisons. With a
+    `persist_directory` the matrix is saved as a `.npy` file and memory-mapped on load, pages are
+    copied only when the index changes. Other processes open the same directory with `read_only`
+    and share the mapped pages, every save replaces the files atomically so their snapshot stays
+    consistent. Every write saves the store unless `autosave` is disabled, then changes are
+    saved by `flush` only, e.g. once per checkpoint of an index build instead of once per batch.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        persist_directory: str | Path | None = None,
+        read_only: bool = False,
+        autosave: bool = True,
+    ):
+        self._embedding = embedding
+        self._directory = Path(persist_directory) if persist_directory is not None else None
+        self._read_only = read_only
+        self._autosave = autosave
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._texts: list[str] = []
+        # Rows beyond `len(self._ids)` are spare capacity of the matrix and the metadata columns.
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._columns: dict[str, np.ndarray] = {}
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: list[dict[str, Any]] | None = None,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        """Embed and store texts, texts with an id already in the store replace its row."""
+        self._check_writable()
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = self._embedding.embed_documents(texts)
+        return self.add_embeddings(zip(texts, vectors), metadatas=metadatas, ids=ids)
+
+    def add_embeddings(
+        self,
+        text_embeddings: Iterable[tuple[str, list[float]]],
+        metadatas: list[dict[str, Any]] | None = None,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        """Store texts with vectors embedded beforehand, e.g. by an embedding pipeline."""
+        self._check_writable()
+        text_embeddings = list(text_embeddings)
+        if not text_embeddings:
+            return []
+        texts = [text for text, _ in text_embeddings]
+        ids = list(ids) if ids is not None else [str(uuid4()) for _ in texts]
+        metadatas = metadatas or [{} for _ in texts]
+        vectors = _normalize(
+            np.asarray([vector for _, vector in text_embeddings], dtype=np.float32)
+        )
+
+        with self._lock:
+            self._reserve(len(self._ids) + len(texts), dimensions=vectors.shape[1])
+            for id, text, metadata, vector in zip(ids, texts, metadatas, vectors):
+                row = self._rows.get(id)
+                if row is None:
+                    row = self._rows[id] = len(self._ids)
+                    self._ids.append(id)
+                    self._texts.append(text)
+                else:
+                    self._texts[row] = text
+                self._vectors[row] = vector
+                self._set_metadata(row, metadata)
+            self._changed()
+        return ids
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> bool | None:
+        """Delete rows by id, unknown ids are ignored. Without ids every row is deleted."""
+        self._check_writable()
+        with self._lock:
+            deleted = False
+            for id in list(self._ids) if ids is None else ids:
+                if (row := self._rows.pop(id, None)) is None:
+                    continue
+                deleted = True
+                # The last row moves into the gap, the matrix stays contiguous.
+                last_row = len(self._ids) - 1
+                if row != last_row:
+                    last_id = self._ids[last_row]
+                    self._ids[row] = last_id
+                    self._texts[row] = self._texts[last_row]
+                    self._vectors[row] = self._vectors[last_row]
+                    for column in self._columns.values():
+                        column[row] = column[last_row]
+                    self._rows[last_id] = row
+                for column in self._columns.values():
+                    column[last_row] = None
+                self._ids.pop()
+                self._texts.pop()
+            if deleted:
+                self._changed()
+        return True
+
+    def flush(self) -> None:
+        """Save the changes made since the last save, if any."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+                self._dirty = False
+
+    def similarity_search(
+        self, query: str, k: int = 4, filter: MetadataFilter | None = None, **kwargs: Any
+    ) -> list[Document]:
+        return [
+            document for document, _ in self.similarity_search_with_score(query, k=k, filter=filter)
+        ]
+
+    async def asimilarity_search(
+        self, query: str, k: int = 4, filter: MetadataFilter | None = None, **kwargs: Any
+    ) -> list[Document]:
+        # Only the embedding call waits on the network, the search itself is a matrix product.
+        embedding = await self._embedding.aembed_query(query)
+        return [
+            document
+            for document, _ in self.similarity_search_by_vector_with_score(
+                embedding, k=k, filter=filter
+            )
+        ]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: MetadataFilter | None = None, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        """Documents most similar to `query` with their cosine similarity, highest first."""
+        return self.similarity_search_by_vector_with_score(
+            self._embedding.embed_query(query), k=k, filter=filter
+        )
+
+    def similarity_search_by_vector(
+        self,
+        embedding: list[float],
+        k: int = 4,
+        filter: MetadataFilter | None = None,
+        **kwargs: Any,
+    ) -> list[Document]:
+        return [
+            document
+            for document, _ in self.similarity_search_by_vector_with_score(
+                embedding, k=k, filter=filter
+            )
+        ]
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: Sequence[float], k: int = 4, filter: MetadataFilter | None = None
+    ) -> list[tuple[Document, float]]:
+        """Rows most similar to `embedding`, `filter` keeps rows whose metadata equals every value.
+
+        A filter value given as a list matches any of its items.
+        """
+        query = _normalize(np.asarray(embedding, dtype=np.float32))
+        with self._lock:
+            count = len(self._ids)
+            if count == 0 or k <= 0:
+                return []
+
+            rows = np.flatnonzero(self._mask(filter, count)) if filter else None
+            vectors = self._vectors[:count] if rows is None else self._vectors[rows]
+            scores = vectors @ query
+            k = min(k, len(scores))
+            if k == 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(k)
+            top = top[np.argsort(-scores[top], kind='stable')]
+            selected = top if rows is None else rows[top]
+
+            return [
+                (
+                    Document(page_content=self._texts[row], metadata=self._metadata(row)),
+                    float(scores[position]),
+                )
+                for row, position in zip(selected.tolist(), top.tolist())
+            ]
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings,
+        metadatas: list[dict[str, Any]] | None = None,
+        ids: list[str] | None = None,
+        persist_directory: str | Path | None = None,
+        **kwargs: Any,
+    ) -> FlatVectorStore:
+        vectorstore = cls(embedding=embedding, persist_directory=persist_directory)
+        vectorstore.add_texts(texts, metadatas=metadatas, ids=ids)
+        return vectorstore
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Scores are cosine similarities of normalized vectors, mapped onto [0, 1].
+        return lambda score: (score + 1.0) / 2.0
+
+    def _changed(self) -> None:
+        self._dirty = True
+        if self._autosave:
+            self.flush()
+
+    def _check_writable(self) -> None:
+        if self._read_only:
+            raise PermissionError(f"Vector store at {self._directory} is opened read-only")
+
+    def _reserve(self, size: int, dimensions: int) -> None:
+        if self._vectors.shape[1] not in (0, dimensions):
+            raise ValueError(
+                f"Expected embeddings of {self._vectors.shape[1]} dimensions, got {dimensions}"
+            )
+        capacity = self._vectors.shape[0]
+        if size <= capacity and self._vectors.shape[1] == dimensions:
+            return
+
+        # Capacity doubles, so appends are amortized constant time and the matrix stays contiguous.
+        new_capacity = max(size, 2 * capacity, 16)
+        vectors = np.zeros((new_capacity, dimensions), dtype=np.float32)
+        if self._ids:
+            vectors[: len(self._ids)] = self._vectors[: len(self._ids)]
+        self._vectors = vectors
+        for key, column in self._columns.items():
+            self._columns[key] = _grow(column, new_capacity)
+
+    def _set_metadata(self, row: int, metadata: Mapping[str, Any]) -> None:
+        for column in self._columns.values():
+            column[row] = None
+        for key, value in metadata.items():
+            if key not in self._columns:
+                self._columns[key] = np.full(self._vectors.shape[0], None, dtype=object)
+            self._columns[key][row] = value
+
+    def _metadata(self, row: int) -> dict[str, Any]:
+        return {
+            key: value
+            for key, column in self._columns.items()
+            if (value := column[row]) is not None
+        }
+
+    def _mask(self, filter: MetadataFilter, count: int) -> np.ndarray:
+        mask = np.ones(count, dtype=bool)
+        for key, expected in filter.items():
+            if (column := self._columns.get(key)) is None:
+                return np.zeros(count, dtype=bool)
+            values = column[:count]
+            if isinstance(expected, (list, tuple, set, frozenset)):
+                matches = np.zeros(count, dtype=bool)
+                for item in expected:
+                    matches |= values == item
+                mask &= matches
+            else:
+                mask &= values == expected
+        return mask
+
+    def _load(self) -> None:
+        if self._directory is None or not (self._directory / _DOCUMENTS_FILE).exists():
+            return
+
+        documents = json.loads((self._directory / _DOCUMENTS_FILE).read_text(encoding='utf-8'))
+        # Read-only views share the pages of the file, writers get private copies of the pages
+        # they change.
+        vectors = np.load(
+            self._directory / _VECTORS_FILE, mmap_mode='r' if self._read_only else 'c'
+        )
+        self._ids = documents['ids']
+        self._rows = {id: row for row, id in enumerate(self._ids)}
+        self._texts = documents['texts']
+        self._vectors = vectors
+        for key, values in documents['columns'].items():
+            column = np.empty(vectors.shape[0], dtype=object)
+            column[: len(values)] = values
+            self._columns[key] = column
+
+    def _save(self) -> None:
+        if self._directory is None:
+            return
+
+        count = len(self._ids)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        # Vectors first, a reader finding the new documents always finds at least as many rows.
+        tmp_path = self._directory / f"{_VECTORS_FILE}.tmp"
+        with tmp_path.open('wb') as file:
+            np.save(file, np.ascontiguousarray(self._vectors[:count]))
+        os.replace(tmp_path, self._directory / _VECTORS_FILE)
+
+        tmp_path = self._directory / f"{_DOCUMENTS_FILE}.tmp"
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    'ids': self._ids,
+                    'texts': self._texts,
+                    'columns': {
+                        key: column[:count].tolist() for key, column in self._columns.items()
+                    },
+                }
+            ),
+            encoding='utf-8',
+        )
+        os.replace(tmp_path, self._directory / _DOCUMENTS_FILE)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _grow(column: np.ndarray, capacity: int) -> np.ndarray:
+    grown = np.full(capacity, None, dtype=object)
+    grown[: len(column)] = column
+    return grown